@@ -0,0 +1,425 @@
+"""
+    File name: benchmark.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script measures how the agents scale with the size of generated
+    grids: sweeps or steps per second, peak memory, time to convergence, time
+    to re-plan after a small edit and the episodes q learning needs to find
+    the optimal policy with each exploration strategy. Every run is appended to a JSON lines file and
+    compared with the last stored run of each benchmark so regressions
+    between versions show up.
+"""
+from grid import Grid, Action, STORAGES, ACTION_COLUMNS
+from exploration import EXPLORATIONS, DECAYS, EXPLORATION_SETTINGS
+from grid_config import save_grid_binary
+from grid_generator import generate_grid, LAYOUTS
+from value_iteration_agent import ValueIterationAgent
+from policy_iteration_agent import PolicyIterationAgent
+from q_learning_agent import QLearningAgent
+from vectorized_q_learning_agent import VectorizedQLearningAgent
+import argparse
+import json
+import numpy as np
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+# agents that can be benchmarked, with the function that creates each one
+AGENTS = {
+    'value_iteration': lambda grid, args: ValueIterationAgent(grid, tolerance=args.tolerance),
+    'value_iteration_vectorized': lambda grid, args: ValueIterationAgent(
+        grid, 'vectorized', args.tolerance),
+    'value_iteration_sparse': lambda grid, args: ValueIterationAgent(
+        grid, 'sparse', args.tolerance),
+    'prioritized_sweeping': lambda grid, args: ValueIterationAgent(
+        grid, tolerance=args.tolerance, schedule='prioritized'),
+    'policy_iteration': lambda grid, args: PolicyIterationAgent(grid),
+    'policy_iteration_sweeps': lambda grid, args: PolicyIterationAgent(grid, 'sweeps'),
+    'q_learning': lambda grid, args: QLearningAgent(grid),
+    'q_learning_replay': lambda grid, args: QLearningAgent(
+        grid, learning='replay', backups_per_step=args.backups_per_step),
+    'q_learning_dyna_q': lambda grid, args: QLearningAgent(
+        grid, learning='dyna_q', backups_per_step=args.backups_per_step),
+    'q_learning_vectorized': lambda grid, args: VectorizedQLearningAgent(
+        grid, args.robots, args.seed),
+}
+
+# agents that learn by sweeping over the states, the others learn by steps
+MDP_AGENTS = ['value_iteration', 'value_iteration_vectorized', 'value_iteration_sparse',
+              'prioritized_sweeping', 'policy_iteration', 'policy_iteration_sweeps']
+
+# explorations each q learning agent supports
+AGENT_EXPLORATIONS = {'q_learning': EXPLORATIONS, 'q_learning_replay': EXPLORATIONS,
+                      'q_learning_dyna_q': EXPLORATIONS, 'q_learning_vectorized': ['epsilon_greedy']}
+
+
+def current_version():
+    """
+    :return: The short hash of the checked out git commit, 'unknown' if it
+             can't be found
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def make_grid(grid_file, args, exploration=None):
+    """
+    Load a grid with the exploration and learning rate settings to benchmark
+
+    :param grid_file: The grid file to load
+    :param args: The parsed command line arguments
+    :param exploration: The exploration to use (one of EXPLORATIONS), None
+                        for MDP agents
+    :return: The Grid
+    """
+    grid = Grid(grid_file, args.storage)
+    grid.exploration = exploration
+    for setting in EXPLORATION_SETTINGS:
+        if setting != 'exploration' and getattr(args, setting) is not None:
+            setattr(grid, setting, getattr(args, setting))
+    return grid
+
+
+def optimal_q_table(grid_file, args):
+    """
+    Find the optimal q values the q learning agents learn towards, with value
+    iteration on the same noisy moves their environment simulates
+
+    :param grid_file: The grid file to load
+    :param args: The parsed command line arguments
+    :return: (num_cells, 5) q values, columns are Q_ACTIONS and actions a cell
+             can't take are NaN
+    """
+    agent = ValueIterationAgent(Grid(grid_file, args.storage), 'vectorized', 1e-9)
+    agent.run(100 * args.max_iterations)
+    return agent.snapshot().q_table
+
+
+def is_policy_optimal(agent, optimal, tolerance):
+    """
+    Follow the greedy policy of a q learning agent from the start cell, along
+    the cells its actions are meant to lead to
+
+    :param agent: The q learning agent
+    :param optimal: The optimal q values returned by optimal_q_table
+    :param tolerance: How much lower than the best optimal q value the optimal
+                      q value of an action can be and still count as optimal,
+                      the noisy moves keep q learning from telling apart
+                      actions that are almost as good
+    :return: True if every action on the way is optimal and it exits the grid
+    """
+    grid = agent.grid
+    row, col = grid.robot_start_location
+    for _ in range(grid.num_rows * grid.num_cols):
+        action = agent.find_max_q_value(row, col)[1]
+        q_values = optimal[row * grid.num_cols + col]
+        if q_values[ACTION_COLUMNS[action]] < np.nanmax(q_values) - tolerance:
+            return False
+        if action == Action.exit_game:
+            return True
+        next_state = grid.find_possible_states(row, col)[action]
+        row, col = next_state.row, next_state.col
+    # going around in circles
+    return False
+
+
+def steps_to_convergence(name, grid_file, args, exploration, optimal):
+    """
+    Count the episodes and real steps a q learning agent needs until its
+    greedy policy from the start cell is optimal, checked every
+    args.check_every episodes. Replayed and planning backups aren't counted
+
+    :param name: The name of the agent in AGENTS
+    :param grid_file: The grid file to load
+    :param args: The parsed command line arguments
+    :param exploration: The exploration to use (one of EXPLORATIONS)
+    :param optimal: The optimal q values returned by optimal_q_table
+    :return: The number of episodes and the number of steps of all the
+             robots, both None if it took more than args.max_episodes
+    """
+    random.seed(args.seed)
+    agent = AGENTS[name](make_grid(grid_file, args, exploration), args)
+    steps = 0
+    while agent.curr_episode < args.max_episodes:
+        steps += agent.run_episodes(args.check_every)
+        if is_policy_optimal(agent, optimal, args.policy_tolerance):
+            if name == 'q_learning_vectorized':
+                # every step moves all of the robots
+                steps *= args.robots
+            return agent.curr_episode, steps
+    return None, None
+
+
+def edit_grid(grid):
+    """
+    Make a small edit to measure re-planning with, removing the first boulder
+    of the grid or, if it has none, placing one in the middle
+
+    :param grid: The Grid to edit
+    :return: True if the grid was edited
+    """
+    if grid.boulders:
+        row, col = grid.boulders[0]
+        grid.set_boulder(row, col, False)
+        return True
+    row, col = grid.num_rows // 2, grid.num_cols // 2
+    if grid.states[row][col].is_terminal or [row, col] == grid.robot_start_location:
+        return False
+    grid.set_boulder(row, col, True)
+    return True
+
+
+def advance(agent, name, count):
+    """
+    Run sweeps or steps of an agent
+
+    :param agent: The agent to run
+    :param name: The name of the agent in AGENTS
+    :param count: The number of sweeps or steps to run
+    """
+    if name not in MDP_AGENTS:
+        agent.run_steps(count)
+        return
+    for _ in range(count):
+        agent.iterate_values()
+
+
+def benchmark(name, grid_file, args, exploration=None, optimal=None):
+    """
+    Benchmark one agent on one grid
+
+    :param name: The name of the agent in AGENTS
+    :param grid_file: The grid file to load
+    :param args: The parsed command line arguments
+    :param exploration: The exploration of q learning agents (one of EXPLORATIONS)
+    :param optimal: The optimal q values for q learning agents, returned by
+                    optimal_q_table
+    :return: Dictionary of the measurements
+    """
+    random.seed(args.seed)
+    start = time.perf_counter()
+    grid = make_grid(grid_file, args, exploration)
+    agent = AGENTS[name](grid, args)
+    setup_seconds = time.perf_counter() - start
+
+    # throughput, a few sweeps/steps first so one-off work isn't counted
+    count = args.sweeps if name in MDP_AGENTS else args.steps
+    advance(agent, name, max(1, count // 10))
+    start = time.perf_counter()
+    advance(agent, name, count)
+    seconds = time.perf_counter() - start
+    if name == 'q_learning_vectorized':
+        # every call moves all of the robots
+        count *= args.robots
+    result = {'setup_seconds': setup_seconds,
+              'per_second': count / seconds if seconds > 0 else float('inf'),
+              'unit': 'sweeps' if name in MDP_AGENTS else 'steps'}
+
+    if name in MDP_AGENTS:
+        # time to convergence from scratch
+        agent = AGENTS[name](make_grid(grid_file, args), args)
+        start = time.perf_counter()
+        agent.run(args.max_iterations)
+        result['convergence_seconds'] = time.perf_counter() - start
+        result['convergence_iterations'] = agent.curr_iteration
+        result['converged'] = agent.has_converged()
+        if isinstance(agent, ValueIterationAgent) and edit_grid(agent.grid):
+            # repairing the converged values after a small edit
+            start = time.perf_counter()
+            result['replan_backups'] = agent.replan()
+            result['replan_seconds'] = time.perf_counter() - start
+    else:
+        result['convergence_episodes'], result['convergence_steps'] = steps_to_convergence(
+            name, grid_file, args, exploration, optimal)
+
+    # tracemalloc slows python code down, so memory is measured separately
+    tracemalloc.start()
+    grid = make_grid(grid_file, args, exploration)
+    agent = AGENTS[name](grid, args)
+    advance(agent, name, max(1, count // 10) if name in MDP_AGENTS else args.steps // 10)
+    result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def load_history(filename):
+    """
+    Load the stored benchmark runs
+
+    :param filename: The JSON lines file the runs are stored in
+    :return: A list of the stored records, oldest first
+    """
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r') as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def record_key(record):
+    """
+    :param record: A benchmark record
+    :return: What identifies the benchmark, records with the same key can be
+             compared
+    """
+    return (record['agent'], record.get('exploration'), record['layout'], record['size'],
+            record['storage'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the agents on generated grids of increasing size')
+
+    parser.add_argument(
+        '--sizes', help='Number of rows/columns of the grids (default: 10 30 60)',
+        type=int, nargs='+', default=[10, 30, 60])
+
+    parser.add_argument(
+        '--layouts', help='Layouts of the grids (default: open)', nargs='+', choices=LAYOUTS,
+        default=['open'])
+
+    parser.add_argument(
+        '--agents', help='Agents to benchmark (default: all)', nargs='+', choices=list(AGENTS),
+        default=list(AGENTS))
+
+    parser.add_argument(
+        '--storage', help='How the grid stores its states (default: objects)',
+        choices=STORAGES, default='objects')
+
+    parser.add_argument(
+        '--sweeps', help='Sweeps to time for the MDP agents (default: 20)', type=int, default=20)
+
+    parser.add_argument(
+        '--steps', help='Steps to time for the q learning agents (default: 20000)',
+        type=int, default=20000)
+
+    parser.add_argument(
+        '--tolerance', help='Tolerance value iteration converges at (default: 1e-4)',
+        type=float, default=1e-4)
+
+    parser.add_argument(
+        '--max_iterations', help='Iterations to give up converging after (default: 1000)',
+        type=int, default=1000)
+
+    parser.add_argument(
+        '--explorations', help='Explorations to benchmark the q learning agents with (default: all)',
+        nargs='+', choices=EXPLORATIONS, default=EXPLORATIONS)
+
+    parser.add_argument(
+        '--exploration_start', help='Epsilon, temperature or UCB bonus weight the explorations start with '
+                                    '(default: the noise for epsilon_greedy, 1 otherwise)', type=float)
+
+    parser.add_argument(
+        '--exploration_end', help='Value the explorations decay to', type=float)
+
+    parser.add_argument(
+        '--exploration_decay', help='How the explorations decay (default: constant)', choices=DECAYS)
+
+    parser.add_argument(
+        '--alpha_end', help='Value alpha decays to', type=float)
+
+    parser.add_argument(
+        '--alpha_decay', help='How alpha decays (default: constant)', choices=DECAYS)
+
+    parser.add_argument(
+        '--decay_episodes', help='Episodes the decays take (default: 1000)', type=int)
+
+    parser.add_argument(
+        '--max_episodes', help='Episodes to give up finding the optimal policy after (default: 20000)',
+        type=int, default=20000)
+
+    parser.add_argument(
+        '--backups_per_step', help='Replayed transitions or Dyna-Q planning backups after each step '
+                                   '(default: 16 for replay, 10 for dyna_q)', type=int)
+
+    parser.add_argument(
+        '--policy_tolerance', help='How far below the best optimal q value an action of the q learning '
+                                   'policy can be and still count as optimal (default: 0.05)',
+        type=float, default=0.05)
+
+    parser.add_argument(
+        '--check_every', help='Episodes between checks of the q learning policy (default: 10)',
+        type=int, default=10)
+
+    parser.add_argument(
+        '--robots', help='Robots of the vectorized q learning agent (default: 64)',
+        type=int, default=64)
+
+    parser.add_argument('--seed', help='Seed for the grids and agents (default: 0)',
+                        type=int, default=0)
+
+    parser.add_argument(
+        '--label', help='Version label stored with the results (default: the git commit)', type=str)
+
+    parser.add_argument(
+        '--output', help='JSON lines file the results are appended to (default: benchmark_results.jsonl)',
+        type=str, default='benchmark_results.jsonl')
+
+    args = parser.parse_args()
+
+    label = args.label or current_version()
+    history = load_history(args.output)
+    previous = {}
+    for record in history:
+        if record['label'] != label:
+            previous[record_key(record)] = record
+
+    print("{:<28} {:<14} {:>6} {:>6} {:>14} {:>12} {:>10} {:>12} {:>10}  {}".format(
+        'agent', 'exploration', 'layout', 'size', 'per second', 'converge', 'replan', 'peak MB',
+        'setup (s)', 'vs previous'))
+    with tempfile.TemporaryDirectory() as directory, open(args.output, 'a') as fp:
+        for layout in args.layouts:
+            for size in args.sizes:
+                grid_file = os.path.join(directory, '{}_{}.npz'.format(layout, size))
+                save_grid_binary(generate_grid(size, size, layout, seed=args.seed), grid_file)
+                optimal = None
+                for name in args.agents:
+                    if name in MDP_AGENTS:
+                        explorations = [None]
+                    else:
+                        explorations = [exploration for exploration in args.explorations
+                                        if exploration in AGENT_EXPLORATIONS[name]]
+                        if optimal is None:
+                            optimal = optimal_q_table(grid_file, args)
+                    for exploration in explorations:
+                        record = {'label': label, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                                  'python': platform.python_version(), 'agent': name,
+                                  'exploration': exploration, 'layout': layout, 'size': size,
+                                  'storage': args.storage}
+                        record.update(benchmark(name, grid_file, args, exploration, optimal))
+                        fp.write(json.dumps(record) + '\n')
+                        fp.flush()
+
+                        comparison = ''
+                        if record_key(record) in previous:
+                            old = previous[record_key(record)]
+                            comparison = "{:.2f}x speed of {}".format(
+                                record['per_second'] / old['per_second'], old['label'])
+                        if 'convergence_seconds' in record:
+                            converge = "{:.3f}s".format(record['convergence_seconds'])
+                        elif record['convergence_steps'] is not None:
+                            converge = "{} st".format(record['convergence_steps'])
+                        else:
+                            converge = "never"
+                        replan = "-"
+                        if 'replan_seconds' in record:
+                            replan = "{:.4f}s".format(record['replan_seconds'])
+                        print("{:<28} {:<14} {:>6} {:>6} {:>8.1f} {:<5} {:>12} {:>10} {:>12.2f} {:>10.3f}  {}".format(
+                            name, exploration or '-', layout, size, record['per_second'], record['unit'],
+                            converge, replan, record['peak_bytes'] / 1e6, record['setup_seconds'],
+                            comparison))
+
+    print("\nResults appended to {} with the label '{}'".format(args.output, label))
+
+
+if __name__ == '__main__':
+    main()
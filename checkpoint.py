@@ -0,0 +1,187 @@
+"""
+    File name: checkpoint.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script saves the learned tables of an agent, its iteration/episode
+    counters and the parameters of its grid to disk, and loads them back to
+    warm start an agent, also on a grid whose rewards or layout changed.
+"""
+import json
+import os
+import numpy as np
+from value_iteration_agent import ValueIterationAgent
+from policy_iteration_agent import PolicyIterationAgent
+from q_learning_agent import QLearningAgent
+from vectorized_q_learning_agent import VectorizedQLearningAgent
+
+# version of the checkpoint format, stored in every checkpoint
+CHECKPOINT_VERSION = 1
+
+# name each agent class is saved as
+AGENT_KINDS = {ValueIterationAgent: 'value_iteration', PolicyIterationAgent: 'policy_iteration',
+               QLearningAgent: 'q_learning', VectorizedQLearningAgent: 'q_learning_vectorized'}
+
+# counters of each kind of agent that are saved, and restored when resuming
+COUNTERS = {'value_iteration': ['curr_iteration', 'backups'],
+            'policy_iteration': ['curr_iteration'],
+            'q_learning': ['curr_episode'],
+            'q_learning_vectorized': ['curr_episode']}
+
+# grid parameters that are saved, to report what changed since
+PARAMETERS = ['discount', 'noise', 'alpha', 'transition_cost']
+
+# arrays of a checkpoint, written as <name>.npy in checkpoint directories
+ARRAYS = ['values', 'q_table', 'best_actions', 'terminals', 'boulders', 'residuals']
+
+
+class Checkpoint:
+    """
+    Representation of a Checkpoint, the saved state of an agent. Cells are
+    indexed by row * num_cols + col
+    Attributes
+        kind                The kind of agent it was saved from (see AGENT_KINDS)
+        counters            Dictionary of the agent's counters (see COUNTERS)
+        parameters          Dictionary of the grid's PARAMETERS
+        num_rows            Number of rows of the grid
+        num_cols            Number of columns of the grid
+        terminals           (num_terminals, 3) row, col and reward of each terminal
+        boulders            (num_boulders, 2) row and col of each boulder
+        values              The value of each cell
+        q_table             (num_cells, 5) q values, columns are Q_ACTIONS and
+                            actions a cell can't take are NaN
+        best_actions        Column of the best action per cell, NO_ACTION if
+                            there is none
+        residuals           The Bellman residual of every value iteration
+                            sweep, empty for the other agents
+    """
+
+    def __init__(self, meta, arrays):
+        """
+        Init function for the Checkpoint class
+
+        :param meta: Dictionary of the kind, counters, parameters and shape
+        :param arrays: Dictionary of the ARRAYS
+        """
+        if meta.get('version') != CHECKPOINT_VERSION:
+            raise ValueError("Unknown checkpoint version {}, expected {}".format(
+                meta.get('version'), CHECKPOINT_VERSION))
+        self.kind = meta['kind']
+        self.counters = meta['counters']
+        self.parameters = meta['parameters']
+        self.num_rows = meta['num_rows']
+        self.num_cols = meta['num_cols']
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def changes(self, grid):
+        """
+        Find what differs between the grid the checkpoint was saved on and
+        another grid of the same size
+
+        :param grid: The Grid to compare with
+        :return: List of the names of the parameters that differ, and
+                 'terminals' and 'boulders' if those changed
+        """
+        changed = [name for name in PARAMETERS
+                   if self.parameters[name] != getattr(grid, name)]
+        terminals = np.array(grid.terminals, dtype=float).reshape(-1, 3)
+        if sorted(map(tuple, terminals)) != sorted(map(tuple, self.terminals)):
+            changed.append('terminals')
+        boulders = np.array(grid.boulders, dtype=np.int64).reshape(-1, 2)
+        if sorted(map(tuple, boulders)) != sorted(map(tuple, self.boulders)):
+            changed.append('boulders')
+        return changed
+
+
+def agent_kind(agent):
+    """
+    :param agent: The agent
+    :return: The name the agent's class is saved as
+    """
+    if type(agent) not in AGENT_KINDS:
+        raise ValueError("Unknown agent '{}', expected one of {}".format(
+            type(agent).__name__, [cls.__name__ for cls in AGENT_KINDS]))
+    return AGENT_KINDS[type(agent)]
+
+
+def save_checkpoint(agent, filename):
+    """
+    Save an agent's tables, counters and grid parameters
+
+    :param agent: The agent to save
+    :param filename: A file ending with .npz to write one compressed file,
+                     any other name is written as a directory of .npy files
+                     that can be loaded memory-mapped
+    """
+    kind = agent_kind(agent)
+    grid = agent.grid
+    snapshot = agent.snapshot()
+    meta = {'version': CHECKPOINT_VERSION, 'kind': kind,
+            'counters': {name: int(getattr(agent, name)) for name in COUNTERS[kind]},
+            'parameters': {name: getattr(grid, name) for name in PARAMETERS},
+            'num_rows': grid.num_rows, 'num_cols': grid.num_cols}
+    arrays = {'values': snapshot.values, 'q_table': snapshot.q_table,
+              'best_actions': snapshot.best_actions,
+              'terminals': np.array(grid.terminals, dtype=float).reshape(-1, 3),
+              'boulders': np.array(grid.boulders, dtype=np.int64).reshape(-1, 2),
+              'residuals': np.array(getattr(agent, 'residuals', []), dtype=float)}
+
+    if filename.endswith('.npz'):
+        with open(filename, 'wb') as fp:
+            np.savez_compressed(fp, meta=np.array(json.dumps(meta)), **arrays)
+        return
+    os.makedirs(filename, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(filename, name + '.npy'), array)
+    with open(os.path.join(filename, 'meta.json'), 'w') as fp:
+        json.dump(meta, fp, indent=2)
+
+
+def load_checkpoint(filename, mmap=False):
+    """
+    Load a checkpoint written by save_checkpoint
+
+    :param filename: The .npz file or checkpoint directory
+    :param mmap: True to memory-map the arrays of a checkpoint directory
+                 instead of reading them, so only the parts that are used
+                 are read from disk. Compressed .npz files are always read
+    :return: The Checkpoint
+    """
+    if filename.endswith('.npz'):
+        with np.load(filename) as data:
+            meta = json.loads(str(data['meta']))
+            arrays = {name: data[name] for name in ARRAYS}
+        return Checkpoint(meta, arrays)
+    with open(os.path.join(filename, 'meta.json'), 'r') as fp:
+        meta = json.load(fp)
+    arrays = {name: np.load(os.path.join(filename, name + '.npy'), mmap_mode='r' if mmap else None)
+              for name in ARRAYS}
+    return Checkpoint(meta, arrays)
+
+
+def warm_start(agent, checkpoint, resume=True):
+    """
+    Load a checkpoint's tables into an agent. Any kind of agent can be warm
+    started from any checkpoint of a grid of the same size, for example q
+    learning from the q values of value iteration
+
+    :param agent: The agent to warm start
+    :param checkpoint: The Checkpoint
+    :param resume: True to also continue the counters of a checkpoint of the
+                   same kind of agent, false to count from zero
+    :return: True if the counters were resumed
+    """
+    grid = agent.grid
+    if (checkpoint.num_rows, checkpoint.num_cols) != (grid.num_rows, grid.num_cols):
+        raise ValueError("A checkpoint of a {}x{} grid can't warm start a {}x{} grid".format(
+            checkpoint.num_rows, checkpoint.num_cols, grid.num_rows, grid.num_cols))
+    agent.load_tables(checkpoint.values, checkpoint.q_table, checkpoint.best_actions)
+    if not resume or checkpoint.kind != agent_kind(agent):
+        return False
+    for name, value in checkpoint.counters.items():
+        setattr(agent, name, value)
+    if checkpoint.kind == 'value_iteration':
+        agent.residuals = checkpoint.residuals.tolist()
+    return True
@@ -0,0 +1,194 @@
+"""
+    File name: environment.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the GridEnvironment class, the simulation of a grid
+    the q learning agents learn against. Its moves slip to the neighbouring
+    directions the same way ValueIterationAgent models them.
+"""
+import random
+import numpy as np
+from grid import Grid, Action, ACTION_COLUMNS, EXIT_INDEX
+
+
+class GridEnvironment:
+    """
+    Representation of a GridEnvironment. A move action ends up where it is
+    going with probability 1 - noise and drifts to each of its
+    ACTION_NEIGHBOURS with probability noise / 2, receiving the reward of the
+    cell it lands in. Exiting from a terminal receives its terminal reward and
+    finishes the episode. step moves a single robot, step_batch moves many
+    robots given by their cells (row * num_cols + col) at once.
+    Attributes
+        grid                The grid being simulated
+        noise               The likelihood a move won't end up where it's going
+        location            (row, col) the single robot is at
+        start_location      (row, col) every episode starts at
+        start_cell          The cell every episode starts at
+        random              random.Random used by step, seeded for repeatable runs
+        rng                 numpy random generator used by step_batch
+        destinations        (num_cells, 4) cell each move action leads to,
+                            columns are MOVE_ACTIONS (the grid's successor table)
+        drift_first         (num_cells, 4) first cell each move can drift to
+        drift_second        (num_cells, 4) second cell each move can drift to
+        rewards             Reward for landing in each cell
+        terminal_rewards    Reward for exiting the game from each cell
+        outcomes            Per cell, None until step first moves from it, a
+                            dictionary of the (row, col, reward) each action
+                            can end up with: the intended one, then the drifts
+        num_edits           The number of the grid's edits read so far
+    """
+
+    def __init__(self, input_grid: Grid, noise=None, seed=None):
+        """
+        Init function for the GridEnvironment class
+
+        :param input_grid: The grid to simulate
+        :param noise: The likelihood a move won't end up where it's going,
+                      None for the grid's noise
+        :param seed: Seed of the random generators, None for a random seed
+        """
+        self.grid = input_grid
+        self.noise = input_grid.noise if noise is None else noise
+        self.start_location = tuple(input_grid.robot_start_location)
+        self.start_cell = self.start_location[0] * input_grid.num_cols + self.start_location[1]
+        self.location = self.start_location
+        self.random = random.Random(seed)
+        self.rng = np.random.default_rng(seed)
+        self.destinations = None
+        self.drift_first = None
+        self.drift_second = None
+        self.rewards = None
+        self.terminal_rewards = None
+        self.outcomes = None
+        self.num_edits = 0
+        self.build()
+
+    def build(self):
+        """
+        Read the layout and rewards of the grid
+        """
+        grid = self.grid
+        num_cells = grid.num_rows * grid.num_cols
+        if grid.storage == 'arrays':
+            self.rewards = grid.cell_rewards.copy()
+            self.terminal_rewards = grid.cell_terminal_rewards.copy()
+        else:
+            self.rewards = np.array([state.reward for row in grid.states for state in row])
+            self.terminal_rewards = np.array(
+                [state.terminal_reward for row in grid.states for state in row])
+        self.destinations = grid.destinations
+        self.drift_first = grid.drift_first
+        self.drift_second = grid.drift_second
+        self.outcomes = [None] * num_cells
+        self.num_edits = len(grid.edits)
+
+    def refresh(self):
+        """
+        Read the cells of the grid that were edited since it was last read
+        """
+        grid = self.grid
+        if self.num_edits == len(grid.edits):
+            return
+        cells = grid.changes_since(self.num_edits)
+        if cells is None or self.destinations is not grid.destinations:
+            self.build()
+            return
+        for cell in cells.tolist():
+            state = grid.states[cell // grid.num_cols][cell % grid.num_cols]
+            self.rewards[cell] = state.reward
+            self.terminal_rewards[cell] = state.terminal_reward
+            self.outcomes[cell] = None
+        self.num_edits = len(grid.edits)
+
+    def reset(self):
+        """
+        Put the single robot back at the start of an episode
+
+        :return: (row, col) of the start location
+        """
+        self.refresh()
+        self.location = self.start_location
+        return self.location
+
+    def build_outcomes(self, cell):
+        """
+        Look up where each action of a cell can end up
+
+        :param cell: The cell, row * num_cols + col
+        :return: Dictionary of the (row, col, reward) each action can end up
+                 with, the intended one followed by the drifts
+        """
+        num_cols = self.grid.num_cols
+        row, col = divmod(cell, num_cols)
+        outcomes = {}
+        for action in self.grid.states[row][col].get_actions():
+            if action == Action.exit_game:
+                outcomes[action] = ((row, col, float(self.terminal_rewards[cell])),)
+                continue
+            column = ACTION_COLUMNS[action]
+            landings = []
+            for table in (self.destinations, self.drift_first, self.drift_second):
+                dest = int(table[cell, column])
+                landings.append(divmod(dest, num_cols) + (float(self.rewards[dest]),))
+            outcomes[action] = tuple(landings)
+        self.outcomes[cell] = outcomes
+        return outcomes
+
+    def step(self, action):
+        """
+        Take an action with the single robot
+
+        :param action: The action to take, one of the actions of the robot's cell
+        :return: (row, col) the robot ends up at, the reward received and True
+                 if the action finished the episode. The robot stays at the
+                 terminal after exiting until reset is called
+        """
+        row, col = self.location
+        cell = row * self.grid.num_cols + col
+        outcomes = self.outcomes[cell] or self.build_outcomes(cell)
+        landings = outcomes[action]
+        if action == Action.exit_game:
+            return self.location, landings[0][2], True
+        landing = landings[0]
+        if self.noise:
+            sample = self.random.random()
+            if sample < self.noise:
+                # drift to one of the neighbours, each half of the time
+                landing = landings[1] if sample < self.noise / 2.0 else landings[2]
+        self.location = landing[:2]
+        return self.location, landing[2], False
+
+    def reset_batch(self, num_robots):
+        """
+        Put many robots at the start of an episode
+
+        :param num_robots: The number of robots
+        :return: Array of the cell each robot is at
+        """
+        self.refresh()
+        return np.full(num_robots, self.start_cell, dtype=np.intp)
+
+    def step_batch(self, cells, columns):
+        """
+        Take an action with each of many robots
+
+        :param cells: Array of the cell each robot is at
+        :param columns: Array of the column in Q_ACTIONS of the action each
+                        robot takes, one of the actions of its cell
+        :return: Array of the cell each robot ends up at, array of the reward
+                 each robot received and array that is True for the robots
+                 that exited. Robots that exited are back at the start cell
+        """
+        exited = columns == EXIT_INDEX
+        moves = np.where(exited, 0, columns)
+        next_cells = self.destinations[cells, moves]
+        if self.noise:
+            samples = self.rng.random(len(cells))
+            next_cells = np.where(samples < self.noise, self.drift_second[cells, moves], next_cells)
+            next_cells = np.where(samples < self.noise / 2.0, self.drift_first[cells, moves], next_cells)
+        rewards = np.where(exited, self.terminal_rewards[cells], self.rewards[next_cells])
+        next_cells = np.where(exited, self.start_cell, next_cells)
+        return next_cells, rewards, exited
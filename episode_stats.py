@@ -0,0 +1,82 @@
+"""
+    File name: episode_stats.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the EpisodeStats class, which records the length,
+    return and TD error of every finished q learning episode.
+"""
+from array import array
+import numpy as np
+
+
+class EpisodeStats:
+    """
+    Representation of EpisodeStats. The statistics are kept in typed arrays,
+    one entry per finished episode, in the order the episodes finished
+    Attributes
+        lengths             The number of steps of each episode
+        returns             The sum of the rewards received during each episode,
+                            the transition costs and the exit reward
+        td_errors           The mean absolute TD error of the updates made
+                            during each episode
+        truncated           1 for the episodes that were cut off at the most
+                            steps allowed per episode, 0 for the ones that exited
+    """
+
+    def __init__(self):
+        """
+        Init function for the EpisodeStats class
+        """
+        self.lengths = array('l')
+        self.returns = array('d')
+        self.td_errors = array('d')
+        self.truncated = array('b')
+
+    def record(self, length, episode_return, td_error_sum, truncated=False):
+        """
+        Record a finished episode
+
+        :param length: The number of steps of the episode
+        :param episode_return: The sum of the rewards received during the episode
+        :param td_error_sum: The sum of the absolute TD errors of its updates
+        :param truncated: True if the episode was cut off instead of exiting
+        """
+        self.lengths.append(length)
+        self.returns.append(episode_return)
+        self.td_errors.append(td_error_sum / length if length else 0.0)
+        self.truncated.append(truncated)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def as_arrays(self):
+        """
+        :return: Dictionary of numpy views of the statistics, they share
+                 memory with the recorded arrays
+        """
+        return {'lengths': np.frombuffer(self.lengths, dtype=self.lengths.typecode),
+                'returns': np.frombuffer(self.returns),
+                'td_errors': np.frombuffer(self.td_errors),
+                'truncated': np.frombuffer(self.truncated, dtype=np.int8)}
+
+    def summary(self, last=None):
+        """
+        Summarize the recorded episodes
+
+        :param last: Only summarize the last few episodes, None for all of them
+        :return: Dictionary of the number of episodes, their mean length,
+                 return and TD error and how many were cut off
+        """
+        arrays = self.as_arrays()
+        if last is not None:
+            arrays = {name: values[-last:] for name, values in arrays.items()}
+        if len(arrays['lengths']) == 0:
+            return {'episodes': 0, 'mean_length': 0.0, 'mean_return': 0.0,
+                    'mean_td_error': 0.0, 'truncated': 0}
+        return {'episodes': len(arrays['lengths']),
+                'mean_length': float(arrays['lengths'].mean()),
+                'mean_return': float(arrays['returns'].mean()),
+                'mean_td_error': float(arrays['td_errors'].mean()),
+                'truncated': int(arrays['truncated'].sum())}
@@ -0,0 +1,271 @@
+"""
+    File name: exploration.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the exploration strategies q learning picks its
+    actions with, and the schedules that decay their exploration and the
+    learning rate alpha over the episodes.
+"""
+import math
+import random
+
+# 'epsilon_greedy' takes a random action with probability epsilon,
+# 'boltzmann' picks actions with softmax probabilities of their q values at a
+# temperature and 'ucb' adds a bonus to actions that were rarely taken
+EXPLORATIONS = ['epsilon_greedy', 'boltzmann', 'ucb']
+
+# how a scheduled value goes from its start to its end value
+DECAYS = ['constant', 'linear', 'exponential']
+
+# grid file settings (and command line options) of the exploration and the
+# learning rate, named like the Grid attributes they are stored in
+EXPLORATION_SETTINGS = ['exploration', 'exploration_start', 'exploration_end',
+                        'exploration_decay', 'alpha_end', 'alpha_decay', 'decay_episodes']
+
+# what the exploration starts with when the grid doesn't say, None for the
+# grid's noise
+DEFAULT_STARTS = {'epsilon_greedy': None, 'boltzmann': 1.0, 'ucb': 1.0}
+
+# episodes the decays take when the grid doesn't say
+DEFAULT_DECAY_EPISODES = 1000
+
+
+class Schedule:
+    """
+    Representation of a Schedule, a value that decays over the episodes
+    Attributes
+        start               The value at episode 0
+        end                 The value reached after decay_episodes episodes
+        decay               How the value goes from start to end (one of DECAYS)
+        decay_episodes      The number of episodes it takes to reach end
+    """
+
+    def __init__(self, start, end=None, decay='constant', decay_episodes=DEFAULT_DECAY_EPISODES):
+        """
+        Init function for the Schedule class
+
+        :param start: The value at episode 0
+        :param end: The value to decay to, None to stay at start
+        :param decay: How the value goes from start to end (one of DECAYS)
+        :param decay_episodes: The number of episodes it takes to reach end
+        """
+        if decay not in DECAYS:
+            raise ValueError("Unknown decay '{}', expected one of {}".format(decay, DECAYS))
+        if decay == 'exponential' and end is not None and (start <= 0 or end <= 0):
+            raise ValueError("Exponential decays need positive start and end values, got {} and {}".format(
+                start, end))
+        self.start = start
+        self.end = start if end is None else end
+        self.decay = decay
+        self.decay_episodes = decay_episodes
+
+    def value(self, episode):
+        """
+        :param episode: The number of finished episodes
+        :return: The value of the schedule at that episode
+        """
+        if self.decay == 'constant' or self.end == self.start:
+            # also a schedule without an end value, which stays at start
+            return self.start
+        progress = min(episode / self.decay_episodes, 1.0)
+        if self.decay == 'linear':
+            return self.start + (self.end - self.start) * progress
+        return self.start * (self.end / self.start) ** progress
+
+
+class EpsilonGreedy:
+    """
+    Representation of EpsilonGreedy exploration, a random action with
+    probability epsilon and one of the best actions otherwise. The random
+    numbers are drawn the same way the QLearningAgent always has, so a
+    constant epsilon equal to the noise explores exactly like it used to.
+    Attributes
+        schedule            Schedule of epsilon
+        epsilon             The current epsilon
+    """
+
+    def __init__(self, schedule):
+        """
+        Init function for the EpsilonGreedy class
+
+        :param schedule: Schedule of epsilon
+        """
+        self.schedule = schedule
+        self.epsilon = schedule.value(0)
+
+    def start_episode(self, episode):
+        """
+        Update epsilon for the next episode
+
+        :param episode: The number of finished episodes
+        """
+        self.epsilon = self.schedule.value(episode)
+
+    def choose(self, row, col, q_values, possible_states):
+        """
+        Choose the action to take in a state
+
+        :param row: The row of the state
+        :param col: The column of the state
+        :param q_values: The q values of the state
+        :param possible_states: The states each of the state's actions lead to
+        :return: The action to take
+        """
+        action = random.choice(list(possible_states))
+        if random.random() >= self.epsilon:
+            max_q_value = max(q_values.values())
+            action = random.choice([key for key, value in q_values.items() if value == max_q_value])
+        return action
+
+
+class Boltzmann:
+    """
+    Representation of Boltzmann exploration, each action is picked with a
+    probability proportional to exp(q value / temperature), so higher
+    temperatures explore more and a temperature of 0 always picks one of the
+    best actions
+    Attributes
+        schedule            Schedule of the temperature
+        temperature         The current temperature
+    """
+
+    def __init__(self, schedule):
+        """
+        Init function for the Boltzmann class
+
+        :param schedule: Schedule of the temperature
+        """
+        self.schedule = schedule
+        self.temperature = schedule.value(0)
+
+    def start_episode(self, episode):
+        """
+        Update the temperature for the next episode
+
+        :param episode: The number of finished episodes
+        """
+        self.temperature = self.schedule.value(episode)
+
+    def choose(self, row, col, q_values, possible_states):
+        """
+        Choose the action to take in a state
+
+        :param row: The row of the state
+        :param col: The column of the state
+        :param q_values: The q values of the state
+        :param possible_states: The states each of the state's actions lead to
+        :return: The action to take
+        """
+        max_q_value = max(q_values.values())
+        if self.temperature <= 0:
+            return random.choice([key for key, value in q_values.items() if value == max_q_value])
+        # subtracting the max keeps exp from overflowing
+        weights = [math.exp((value - max_q_value) / self.temperature) for value in q_values.values()]
+        return random.choices(list(q_values), weights)[0]
+
+
+class UCB:
+    """
+    Representation of UCB exploration, every action of a state is tried once
+    and after that the action with the highest
+    q value + bonus * sqrt(ln(visits of the state) / times it was taken)
+    is picked
+    Attributes
+        schedule            Schedule of the bonus weight
+        bonus               The current bonus weight
+        counts              The number of times each action was taken in
+                            each state, keyed by (row, col) then action
+    """
+
+    def __init__(self, schedule):
+        """
+        Init function for the UCB class
+
+        :param schedule: Schedule of the bonus weight
+        """
+        self.schedule = schedule
+        self.bonus = schedule.value(0)
+        self.counts = {}
+
+    def start_episode(self, episode):
+        """
+        Update the bonus weight for the next episode
+
+        :param episode: The number of finished episodes
+        """
+        self.bonus = self.schedule.value(episode)
+
+    def choose(self, row, col, q_values, possible_states):
+        """
+        Choose the action to take in a state, counting it as taken
+
+        :param row: The row of the state
+        :param col: The column of the state
+        :param q_values: The q values of the state
+        :param possible_states: The states each of the state's actions lead to
+        :return: The action to take
+        """
+        counts = self.counts.setdefault((row, col), dict.fromkeys(q_values, 0))
+        untried = [action for action, count in counts.items() if count == 0]
+        if untried:
+            action = random.choice(untried)
+        else:
+            log_visits = math.log(sum(counts.values()))
+            scores = {action: value + self.bonus * math.sqrt(log_visits / counts[action])
+                      for action, value in q_values.items()}
+            max_score = max(scores.values())
+            action = random.choice([key for key, score in scores.items() if score == max_score])
+        counts[action] += 1
+        return action
+
+
+# exploration strategy classes, keyed by their name in EXPLORATIONS
+EXPLORATION_CLASSES = {'epsilon_greedy': EpsilonGreedy, 'boltzmann': Boltzmann, 'ucb': UCB}
+
+
+def make_exploration(name, start, end=None, decay='constant', decay_episodes=DEFAULT_DECAY_EPISODES):
+    """
+    Create an exploration strategy
+
+    :param name: The name of the strategy (one of EXPLORATIONS)
+    :param start: The epsilon, temperature or bonus weight to start with
+    :param end: The value to decay to, None to stay at start
+    :param decay: How the value decays (one of DECAYS)
+    :param decay_episodes: The number of episodes the decay takes
+    :return: The exploration strategy
+    """
+    if name not in EXPLORATION_CLASSES:
+        raise ValueError("Unknown exploration '{}', expected one of {}".format(name, EXPLORATIONS))
+    return EXPLORATION_CLASSES[name](Schedule(start, end, decay, decay_episodes))
+
+
+def exploration_from_grid(grid):
+    """
+    Create the exploration strategy set in a grid's settings, epsilon greedy
+    with the grid's noise as a constant epsilon if there are none
+
+    :param grid: The Grid
+    :return: The exploration strategy
+    """
+    name = grid.exploration or 'epsilon_greedy'
+    start = grid.exploration_start
+    if start is None:
+        start = DEFAULT_STARTS.get(name)
+    if start is None:
+        start = grid.noise
+    return make_exploration(name, start, grid.exploration_end, grid.exploration_decay or 'constant',
+                            grid.decay_episodes or DEFAULT_DECAY_EPISODES)
+
+
+def alpha_schedule_from_grid(grid):
+    """
+    Create the schedule of alpha set in a grid's settings, a constant alpha if
+    there are none
+
+    :param grid: The Grid
+    :return: The Schedule of alpha
+    """
+    return Schedule(grid.alpha, grid.alpha_end, grid.alpha_decay or 'constant',
+                    grid.decay_episodes or DEFAULT_DECAY_EPISODES)
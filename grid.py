@@ -1,12 +1,17 @@
 """
     File name: grid.py
     Author: Arsh Khokhar, Kiernan Wiese
-    Date last modified: 15 April, 2021
+    Date last modified: 17 October, 2026
     Python Version: 3.8
     This script contains the grid and state classes used to keep track of
     values for both q learning and value iteration as those algorithms run.
 """
+from collections.abc import MutableMapping
 from enum import Enum
+from types import MappingProxyType
+import numpy as np
+from grid_config import load_grid_config
+from exploration import EXPLORATION_SETTINGS
 
 
 class Action(Enum):
@@ -27,8 +32,49 @@ ACTION_NEIGHBOURS = {Action.north: [Action.west, Action.east],
                      Action.south: [Action.west, Action.east],
                      Action.exit_game: [Action.exit_game]}
 
+# column order of the array backed q values, same order State.q_values
+# iterates in, followed by the exit action
+MOVE_ACTIONS = [Action.north, Action.east, Action.west, Action.south]
+Q_ACTIONS = MOVE_ACTIONS + [Action.exit_game]
+ACTION_COLUMNS = {action: k for k, action in enumerate(Q_ACTIONS)}
 
-class State:
+# columns of MOVE_ACTIONS each move action can drift to, see ACTION_NEIGHBOURS
+DRIFT_FIRST = [MOVE_ACTIONS.index(ACTION_NEIGHBOURS[action][0]) for action in MOVE_ACTIONS]
+DRIFT_SECOND = [MOVE_ACTIONS.index(ACTION_NEIGHBOURS[action][1]) for action in MOVE_ACTIONS]
+
+# column stored as the best action for the exit action and for 'no action'
+EXIT_INDEX = len(MOVE_ACTIONS)
+NO_ACTION = -1
+
+# ways the grid can store its states, 'objects' keeps a State object with its
+# own q value dict per cell, 'arrays' keeps flat arrays indexed by cell
+STORAGES = ['objects', 'arrays']
+
+
+class BaseState:
+    """
+    Methods shared by State and StateView
+    """
+    __slots__ = ()
+
+    def get_actions(self):
+        """
+        :return: The actions that a state can take
+        """
+        return self.q_values.keys()
+
+    def print_state(self, print_qvals=False):
+        """
+        :param print_qvals: True to print q values, false to not
+        """
+        print("State {},{} \tValue: {:.2f} \tBest action: {}".format(
+            self.row, self.col, self.max_q_value, self.best_action))
+        if print_qvals:
+            for q in self.q_values:
+                print("\taction: {} q_value: {}".format(q, self.q_values[q]))
+
+
+class State(BaseState):
     """
     Representation of a state
     Attributes
@@ -43,6 +89,8 @@ class State:
         terminal_reward     The reward for exiting the game from this state
                             (non-zero only if is_terminal is true)
     """
+    __slots__ = ('row', 'col', 'q_values', 'max_q_value', 'is_terminal',
+                 'is_boulder', 'reward', 'best_action', 'terminal_reward')
 
     def __init__(self, row, col):
         """
@@ -61,21 +109,174 @@ class State:
         self.best_action = None
         self.terminal_reward = 0.0
 
-    def get_actions(self):
+
+class QValuesView(MutableMapping):
+    """
+    Dictionary-like view of the q values of one cell of an array backed grid.
+    Terminal cells only have the exit action, the others the move actions.
+    Attributes
+        grid                The grid holding the q values
+        cell                The index of the cell, row * num_cols + col
+    """
+    __slots__ = ('grid', 'cell')
+
+    def __init__(self, grid, cell):
         """
-        :return: The actions that a state can take
+        Init function for the QValuesView class
+
+        :param grid: The grid holding the q values
+        :param cell: The index of the cell
         """
-        return self.q_values.keys()
+        self.grid = grid
+        self.cell = cell
 
-    def print_state(self, print_qvals=False):
+    def actions(self):
         """
-        :param print_qvals: True to print q values, false to not
+        :return: The actions the cell can take
         """
-        print("State {},{} \tValue: {:.2f} \tBest action: {}".format(
-            self.row, self.col, self.max_q_value, self.best_action))
-        if print_qvals:
-            for q in self.q_values:
-                print("\taction: {} q_value: {}".format(q, self.q_values[q]))
+        return [Action.exit_game] if self.grid.cell_is_terminal[self.cell] else MOVE_ACTIONS
+
+    def __getitem__(self, action):
+        if action not in self.actions():
+            raise KeyError(action)
+        return float(self.grid.cell_q_values[self.cell, ACTION_COLUMNS[action]])
+
+    def __setitem__(self, action, value):
+        if action not in self.actions():
+            raise KeyError(action)
+        self.grid.cell_q_values[self.cell, ACTION_COLUMNS[action]] = value
+
+    def __delitem__(self, action):
+        raise TypeError("The actions of a cell can't be removed")
+
+    def __iter__(self):
+        return iter(self.actions())
+
+    def __len__(self):
+        return len(self.actions())
+
+
+class StateView(BaseState):
+    """
+    Lightweight view of one cell of an array backed grid, with the same
+    attributes as State. Views are created on access, so two views of the
+    same cell are equal but not identical.
+    Attributes
+        grid                The grid holding the cell's arrays
+        cell                The index of the cell, row * num_cols + col
+        row                 The row the state is located at
+        col                 The column the state is located at
+    """
+    __slots__ = ('grid', 'cell', 'row', 'col')
+
+    def __init__(self, grid, row, col):
+        """
+        Init function for the StateView class
+
+        :param grid: The grid holding the cell's arrays
+        :param row: The row the state is located at
+        :param col: The column the state is located at
+        """
+        self.grid = grid
+        self.cell = row * grid.num_cols + col
+        self.row = row
+        self.col = col
+
+    def __eq__(self, other):
+        return isinstance(other, StateView) and other.grid is self.grid and \
+            other.cell == self.cell
+
+    def __hash__(self):
+        return hash((id(self.grid), self.cell))
+
+    @property
+    def q_values(self):
+        return QValuesView(self.grid, self.cell)
+
+    @property
+    def max_q_value(self):
+        return float(self.grid.cell_values[self.cell])
+
+    @max_q_value.setter
+    def max_q_value(self, value):
+        self.grid.cell_values[self.cell] = value
+
+    @property
+    def best_action(self):
+        best_action = self.grid.cell_best_actions[self.cell]
+        return None if best_action == NO_ACTION else Q_ACTIONS[best_action]
+
+    @best_action.setter
+    def best_action(self, action):
+        self.grid.cell_best_actions[self.cell] = \
+            NO_ACTION if action is None else ACTION_COLUMNS[action]
+
+    @property
+    def is_terminal(self):
+        return bool(self.grid.cell_is_terminal[self.cell])
+
+    @property
+    def is_boulder(self):
+        return bool(self.grid.cell_is_boulder[self.cell])
+
+    @property
+    def reward(self):
+        return float(self.grid.cell_rewards[self.cell])
+
+    @reward.setter
+    def reward(self, value):
+        self.grid.cell_rewards[self.cell] = value
+
+    @property
+    def terminal_reward(self):
+        return float(self.grid.cell_terminal_rewards[self.cell])
+
+
+class StateRow:
+    """
+    Sequence of the StateViews of one row of an array backed grid
+    Attributes
+        grid                The grid holding the cells' arrays
+        row                 The index of the row
+    """
+    __slots__ = ('grid', 'row')
+
+    def __init__(self, grid, row):
+        self.grid = grid
+        self.row = row
+
+    def __getitem__(self, col):
+        return StateView(self.grid, self.row, range(self.grid.num_cols)[col])
+
+    def __len__(self):
+        return self.grid.num_cols
+
+    def __iter__(self):
+        for col in range(self.grid.num_cols):
+            yield StateView(self.grid, self.row, col)
+
+
+class StateRows:
+    """
+    Sequence of the rows of an array backed grid, used as Grid.states so
+    grid.states[row][col] works for both storages
+    Attributes
+        grid                The grid holding the cells' arrays
+    """
+    __slots__ = ('grid',)
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __getitem__(self, row):
+        return StateRow(self.grid, range(self.grid.num_rows)[row])
+
+    def __len__(self):
+        return self.grid.num_rows
+
+    def __iter__(self):
+        for row in range(self.grid.num_rows):
+            yield StateRow(self.grid, row)
 
 
 class Grid:
@@ -93,17 +294,56 @@ class Grid:
         discount                Discount value for learning
         transition_cost         Cost for trasitioning between states
         alpha                   Value of alpha
+        exploration             How q learning explores, None for the default
+                                (see exploration.EXPLORATION_SETTINGS for this
+                                and the other optional q learning settings
+                                below, None when the grid file doesn't set them)
+        exploration_start       Epsilon, temperature or bonus weight to start with
+        exploration_end         Value the exploration decays to
+        exploration_decay       How the exploration decays
+        alpha_end               Value alpha decays to
+        alpha_decay             How alpha decays
+        decay_episodes          Number of episodes the decays take
         states                  Multidimensional array of state objects, that
                                 represent the grid.
         max_terminal_val        keeps track of the maximum terminal value for 
                                 darker/lighter GUI colors
+        storage                 How the states are stored (one of STORAGES)
+        cell_rewards            With array storage, the reward of each cell.
+                                Cells are indexed by row * num_cols + col
+        cell_terminal_rewards   With array storage, the terminal reward of each cell
+        cell_is_terminal        With array storage, True for the terminal cells
+        cell_is_boulder         With array storage, True for the boulder cells
+        cell_values             With array storage, the max q value of each cell
+        cell_best_actions       With array storage, the column in Q_ACTIONS of
+                                each cell's best action, NO_ACTION for none
+        cell_q_values           With array storage, (num_cells, 5) q values of
+                                each cell, columns are Q_ACTIONS
+        destinations            Read-only (num_cells, 4) cell each move action
+                                leads to, columns are MOVE_ACTIONS. Moves into
+                                a wall or boulder stay in the same cell
+        drift_first             Read-only (num_cells, 4) first cell each move
+                                action can drift to (see ACTION_NEIGHBOURS)
+        drift_second            Read-only (num_cells, 4) second cell each move
+                                action can drift to
+        possible_states         Cache of the find_possible_states result of
+                                each cell, None until a cell is first looked up
+        edits                   The cell of every edit made with set_boulder,
+                                set_terminal and set_transition_cost, in order,
+                                None for edits of every cell. Agents catch up
+                                with them through changes_since
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, storage='objects'):
         """
         Init the grid class from a file
-        :param filename: The name of the file to load the grid from (gridConf.txt)
+        :param filename: The name of the file to load the grid from (gridConf.txt),
+                         .npz files are loaded in the binary format (see grid_config)
+        :param storage: How to store the states (one of STORAGES)
         """
+        if storage not in STORAGES:
+            raise ValueError("Unknown grid storage '{}', expected one of {}".format(
+                storage, STORAGES))
         self.num_rows = 0
         self.num_cols = 0
         self.terminals = []
@@ -115,78 +355,57 @@ class Grid:
         self.discount = None
         self.transition_cost = None
         self.alpha = None
+        self.noise = None
+        self.exploration = None
+        self.exploration_start = None
+        self.exploration_end = None
+        self.exploration_decay = None
+        self.alpha_end = None
+        self.alpha_decay = None
+        self.decay_episodes = None
         self.states = []
         self.max_terminal_val = 0
-
-        with open(filename, 'r') as fp:
-            lines = fp.readlines()
-
-        for line in lines:
-            line_contents = line.split('=', 1)
-
-            attr, value = line_contents[0], line_contents[1]
-
-            if attr.lower() == "horizontal":
-                self.num_rows = int(value.strip())
-
-            elif attr.lower() == "vertical":
-                self.num_cols = int(value.strip())
-
-            elif attr.lower() == "terminal":
-                value = value.strip()
-                if not value.endswith('}}\n'):
-                    value = value + '}'
-                value = value[1:-1]
-                while len(value) > 0:
-                    start_index = value.find('{', 1)
-                    end_index = value.find('}') + 1
-                    terminal_values = value[start_index:end_index][1:-1]
-                    unpacked = terminal_values.split(',')
-                    hor, vert, cost = int(
-                        unpacked[0]), int(unpacked[1]), float(unpacked[2])
-                    self.terminals.append([hor, vert, cost])
-                    value = value[end_index + 1:]
-
-            elif attr.lower() == "boulder":
-                value = value.strip()
-                if not value.endswith('}}\n'):
-                    value = value + '}'
-                value = value[1:-1]
-                while len(value) > 0:
-                    start_index = value.find('{', 1)
-                    end_index = value.find('}') + 1
-                    terminal_values = value[start_index:end_index][1:-1]
-                    unpacked = terminal_values.split(',')
-                    hor, vert = int(unpacked[0]), int(unpacked[1])
-                    self.boulders.append([hor, vert])
-                    value = value[end_index + 1:]
-
-            elif attr.lower() == "robotstartstate":
-                value = value.strip()[1:-1]
-                unpacked = value.split(',')
-                self.robot_start_location = [
-                    int(unpacked[0]), int(unpacked[1])]
-                self.robot_curr_location = [
-                    int(unpacked[0]), int(unpacked[1])]
-
-            elif attr.lower() == "k":
-                self.iterations = int(value.strip())
-
-            elif attr.lower() == "episodes":
-                self.episodes = int(value.strip())
-
-            elif attr.lower() == "alpha":
-                self.alpha = float(value.strip())
-
-            elif attr.lower() == "discount":
-                self.discount = float(value.strip())
-
-            elif attr.lower() == "noise":
-                self.noise = float(value.strip())
-
-            elif attr.lower() == "transitioncost":
-                self.transition_cost = float(value.strip())
-
+        self.storage = storage
+        self.cell_rewards = None
+        self.cell_terminal_rewards = None
+        self.cell_is_terminal = None
+        self.cell_is_boulder = None
+        self.cell_values = None
+        self.cell_best_actions = None
+        self.cell_q_values = None
+        self.destinations = None
+        self.drift_first = None
+        self.drift_second = None
+        self.possible_states = None
+        self.edits = []
+
+        config = load_grid_config(filename)
+        self.num_rows = config.num_rows
+        self.num_cols = config.num_cols
+        self.terminals = config.terminals
+        self.boulders = config.boulders
+        self.robot_start_location = config.robot_start_location[:]
+        self.robot_curr_location = config.robot_start_location[:]
+        self.iterations = config.iterations
+        self.episodes = config.episodes
+        self.discount = config.discount
+        self.alpha = config.alpha
+        self.noise = config.noise
+        self.transition_cost = config.transition_cost
+        for setting in EXPLORATION_SETTINGS:
+            setattr(self, setting, getattr(config, setting))
+
+        if storage == 'arrays':
+            self.build_arrays()
+        else:
+            self.build_states()
+        self.build_transitions()
+
+    def build_states(self):
+        """
+        Build the State objects of the object storage from the terminals and
+        boulders read from the file
+        """
         for i in range(self.num_rows):
             new_row = []
             for j in range(self.num_cols):
@@ -207,6 +426,224 @@ class Grid:
         for boulder in self.boulders:
             self.states[boulder[0]][boulder[1]].is_boulder = True
 
+    def boulder_mask(self):
+        """
+        :return: Array that is True for the boulder cells
+        """
+        if self.storage == 'arrays':
+            return self.cell_is_boulder
+        is_boulder = np.zeros(self.num_rows * self.num_cols, dtype=bool)
+        boulders = np.array(self.boulders, dtype=np.intp).reshape(-1, 2)
+        is_boulder[boulders[:, 0] * self.num_cols + boulders[:, 1]] = True
+        return is_boulder
+
+    def build_transitions(self):
+        """
+        Build the successor table used by find_possible_states and the array
+        backed agents. It only depends on the grid's layout, set_boulder and
+        set_terminal keep it up to date and other changes of the boulders or
+        terminals have to rebuild it (see invalidate_transitions)
+        """
+        num_cells = self.num_rows * self.num_cols
+        destinations = self.find_destinations(np.arange(num_cells), self.boulder_mask())
+        self.destinations = destinations
+        self.drift_first = destinations[:, DRIFT_FIRST]
+        self.drift_second = destinations[:, DRIFT_SECOND]
+        for table in (self.destinations, self.drift_first, self.drift_second):
+            table.flags.writeable = False
+        self.possible_states = [None] * num_cells
+
+    def find_destinations(self, cells, is_boulder):
+        """
+        Find the cell each move action of some cells leads to
+
+        :param cells: Array of the cells
+        :param is_boulder: Array that is True for the boulder cells
+        :return: (len(cells), 4) destinations, columns are MOVE_ACTIONS
+        """
+        rows, cols = np.divmod(cells, self.num_cols)
+        destinations = np.empty((len(cells), len(MOVE_ACTIONS)), dtype=np.intp)
+        for k, action in enumerate(MOVE_ACTIONS):
+            dest_rows = rows + action.value[0]
+            dest_cols = cols + action.value[1]
+            inside = (dest_rows >= 0) & (dest_rows < self.num_rows) & \
+                (dest_cols >= 0) & (dest_cols < self.num_cols)
+            dest = np.where(inside, dest_rows * self.num_cols + dest_cols, cells)
+            # moving into a wall or a boulder leaves the robot where it is
+            destinations[:, k] = np.where(is_boulder[dest], cells, dest)
+        return destinations
+
+    def neighbourhood(self, cells):
+        """
+        Find the cells whose moves can lead to some cells, the cells
+        themselves and the ones next to them
+
+        :param cells: Array of the cells
+        :return: Sorted array of the cells and their neighbours
+        """
+        rows, cols = np.divmod(np.asarray(cells, dtype=np.intp), self.num_cols)
+        region = [rows * self.num_cols + cols]
+        for action in MOVE_ACTIONS:
+            dest_rows = rows + action.value[0]
+            dest_cols = cols + action.value[1]
+            inside = (dest_rows >= 0) & (dest_rows < self.num_rows) & \
+                (dest_cols >= 0) & (dest_cols < self.num_cols)
+            region.append(dest_rows[inside] * self.num_cols + dest_cols[inside])
+        return np.unique(np.concatenate(region))
+
+    def update_transitions(self, cells):
+        """
+        Update the successor table in place after the layout of some cells
+        changed, only the rows of those cells and their neighbours are
+        recomputed. Arrays sharing the table see the update
+
+        :param cells: Array of the changed cells
+        """
+        region = self.neighbourhood(cells)
+        destinations = self.find_destinations(region, self.boulder_mask())
+        for table, columns in ((self.destinations, slice(None)), (self.drift_first, DRIFT_FIRST),
+                               (self.drift_second, DRIFT_SECOND)):
+            table.flags.writeable = True
+            table[region] = destinations[:, columns]
+            table.flags.writeable = False
+        for cell in region.tolist():
+            self.possible_states[cell] = None
+
+    def invalidate_transitions(self):
+        """
+        Rebuild the successor table after the grid's layout changed in ways
+        not made with the edit methods
+        """
+        self.build_transitions()
+        self.edits.append(None)
+
+    def changes_since(self, num_edits):
+        """
+        Find the cells whose transitions or rewards changed since the first
+        num_edits edits
+
+        :param num_edits: The number of edits already caught up with
+        :return: Sorted array of the cells, None if every cell changed
+        """
+        edits = self.edits[num_edits:]
+        if None in edits:
+            return None
+        return self.neighbourhood(edits)
+
+    def set_boulder(self, row, col, is_boulder=True):
+        """
+        Add or remove a boulder, keeping the successor table up to date
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :param is_boulder: True to place a boulder, false to remove it
+        """
+        if is_boulder and [row, col] not in self.boulders:
+            self.boulders.append([row, col])
+        elif not is_boulder and [row, col] in self.boulders:
+            self.boulders.remove([row, col])
+        cell = row * self.num_cols + col
+        if self.storage == 'arrays':
+            self.cell_is_boulder[cell] = is_boulder
+        else:
+            self.states[row][col].is_boulder = is_boulder
+        self.update_transitions([cell])
+        self.edits.append(cell)
+
+    def set_terminal(self, row, col, terminal_reward=None):
+        """
+        Turn a cell into a terminal, or back into a regular cell, keeping the
+        successor table up to date. The cell's q values are reset
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :param terminal_reward: The reward for exiting from the cell, None to
+                                make it a regular cell
+        """
+        self.terminals = [terminal for terminal in self.terminals
+                          if terminal[:2] != [row, col]]
+        is_terminal = terminal_reward is not None
+        if is_terminal:
+            self.terminals.append([row, col, terminal_reward])
+            # updating the max_termial for GUI colors
+            self.max_terminal_val = max(self.max_terminal_val, abs(terminal_reward))
+
+        cell = row * self.num_cols + col
+        if self.storage == 'arrays':
+            self.cell_is_terminal[cell] = is_terminal
+            self.cell_terminal_rewards[cell] = terminal_reward if is_terminal else 0.0
+            self.cell_q_values[cell] = 0.0
+        else:
+            state = self.states[row][col]
+            state.is_terminal = is_terminal
+            state.terminal_reward = terminal_reward if is_terminal else 0.0
+            state.q_values = {Action.exit_game: 0.0} if is_terminal else {
+                action: 0.0 for action in MOVE_ACTIONS}
+        self.update_transitions([cell])
+        self.edits.append(cell)
+
+    def build_arrays(self):
+        """
+        Build the flat cell arrays of the array storage from the terminals and
+        boulders read from the file
+        """
+        num_cells = self.num_rows * self.num_cols
+        self.cell_rewards = np.full(num_cells, self.transition_cost, dtype=float)
+        self.cell_terminal_rewards = np.zeros(num_cells)
+        self.cell_is_terminal = np.zeros(num_cells, dtype=bool)
+        self.cell_is_boulder = np.zeros(num_cells, dtype=bool)
+        self.cell_values = np.zeros(num_cells)
+        self.cell_best_actions = np.full(num_cells, NO_ACTION, dtype=np.int8)
+        self.cell_q_values = np.zeros((num_cells, len(Q_ACTIONS)))
+
+        terminals = np.array(self.terminals, dtype=float).reshape(-1, 3)
+        cells = terminals[:, 0].astype(np.intp) * self.num_cols + \
+            terminals[:, 1].astype(np.intp)
+        self.cell_terminal_rewards[cells] = terminals[:, 2]
+        self.cell_is_terminal[cells] = True
+        # updating the max_termial for GUI colors
+        self.max_terminal_val = max(
+            self.max_terminal_val, float(np.abs(terminals[:, 2]).max(initial=0.0)))
+
+        boulders = np.array(self.boulders, dtype=np.intp).reshape(-1, 2)
+        self.cell_is_boulder[boulders[:, 0] * self.num_cols + boulders[:, 1]] = True
+
+        self.states = StateRows(self)
+
+    def set_parameters(self, discount=None, alpha=None, noise=None, transition_cost=None):
+        """
+        Override the learning parameters read from the grid file, None keeps
+        the value from the file
+
+        :param discount: The discount value
+        :param alpha: The value of alpha
+        :param noise: The likelihood the robot won't end up where it's going
+        :param transition_cost: The cost for transitioning between states
+        """
+        if discount is not None:
+            self.discount = discount
+        if alpha is not None:
+            self.alpha = alpha
+        if noise is not None:
+            self.noise = noise
+        if transition_cost is not None:
+            self.set_transition_cost(transition_cost)
+
+    def set_transition_cost(self, transition_cost):
+        """
+        Change the cost for transitioning between states, the reward of every cell
+
+        :param transition_cost: The new cost
+        """
+        self.transition_cost = transition_cost
+        if self.storage == 'arrays':
+            self.cell_rewards[:] = transition_cost
+        else:
+            for row in self.states:
+                for state in row:
+                    state.reward = transition_cost
+        self.edits.append(None)
+
     def print_states(self):
         """
         Print all states
@@ -217,22 +654,35 @@ class Grid:
 
     def find_possible_states(self, row, col):
         """
-        Find the states the robot can move to from another state
+        Find the states the robot can move to from another state, looked up
+        in the successor table and cached per cell
 
         :param row: The row of the state to check
         :param col: The column of the state to check
-        :return: A dictionary containing which actions lead to which states
-        """
-        state = self.states[row][col]
-        possible_states = {}
-        for action in state.get_actions():
-            # getting the destination cell corresponding to an action
-            dest_row = row + action.value[0]
-            dest_col = col + action.value[1]
-            if 0 <= dest_row < self.num_rows and \
-                    0 <= dest_col < self.num_cols and not \
-                    self.states[dest_row][dest_col].is_boulder:
+        :return: A read-only dictionary containing which actions lead to which states
+        """
+        cell = row * self.num_cols + col
+        possible_states = self.possible_states[cell]
+        if possible_states is None:
+            state = self.states[row][col]
+            possible_states = {}
+            for action in state.get_actions():
+                if action == Action.exit_game:
+                    possible_states[action] = state
+                    continue
+                dest_row, dest_col = divmod(
+                    int(self.destinations[cell, ACTION_COLUMNS[action]]), self.num_cols)
                 possible_states[action] = self.states[dest_row][dest_col]
-            else:
-                possible_states[action] = state
+            possible_states = MappingProxyType(possible_states)
+            self.possible_states[cell] = possible_states
         return possible_states
+
+    def __getstate__(self):
+        # the cached lookups can't be pickled, they are rebuilt on demand
+        state = self.__dict__.copy()
+        state['possible_states'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.possible_states = [None] * (self.num_rows * self.num_cols)
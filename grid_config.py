@@ -0,0 +1,417 @@
+"""
+    File name: grid_config.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the GridConfig class with the functions used to read
+    and write grid files, either in the text format of gridConf.txt or in a
+    compact binary .npz format, and a converter between the two.
+"""
+from exploration import EXPLORATIONS, DECAYS
+import argparse
+import re
+import numpy as np
+
+# settings of the text format, keyed by their lower case name, with the
+# GridConfig attribute each one is stored in
+SCALAR_SETTINGS = {'horizontal': 'num_rows', 'vertical': 'num_cols', 'k': 'iterations',
+                   'episodes': 'episodes', 'discount': 'discount', 'alpha': 'alpha',
+                   'noise': 'noise', 'transitioncost': 'transition_cost',
+                   'explorationstart': 'exploration_start', 'explorationend': 'exploration_end',
+                   'alphaend': 'alpha_end', 'decayepisodes': 'decay_episodes'}
+INT_SETTINGS = ['horizontal', 'vertical', 'k', 'episodes', 'decayepisodes']
+
+# optional q learning settings written as a name, with the GridConfig
+# attribute each one is stored in and the names it can take
+STRING_SETTINGS = {'exploration': ('exploration', EXPLORATIONS),
+                   'explorationdecay': ('exploration_decay', DECAYS),
+                   'alphadecay': ('alpha_decay', DECAYS)}
+
+# names the settings are written with
+SETTING_NAMES = {'horizontal': 'Horizontal', 'vertical': 'Vertical', 'terminal': 'Terminal',
+                 'boulder': 'Boulder', 'robotstartstate': 'RobotStartState', 'k': 'K',
+                 'episodes': 'Episodes', 'discount': 'Discount', 'alpha': 'Alpha',
+                 'noise': 'Noise', 'transitioncost': 'TransitionCost',
+                 'exploration': 'Exploration', 'explorationstart': 'ExplorationStart',
+                 'explorationend': 'ExplorationEnd', 'explorationdecay': 'ExplorationDecay',
+                 'alphaend': 'AlphaEnd', 'alphadecay': 'AlphaDecay',
+                 'decayepisodes': 'DecayEpisodes'}
+
+# settings written after the robot start state, in this order
+WRITTEN_SETTINGS = ['k', 'episodes', 'discount', 'alpha', 'noise', 'transitioncost',
+                    'exploration', 'explorationstart', 'explorationend', 'explorationdecay',
+                    'alphaend', 'alphadecay', 'decayepisodes']
+
+# one 'N={a,b,...}' entry of a Terminal or Boulder list, and what may separate them
+ENTRY_PATTERN = re.compile(r'\s*\w+\s*=\s*\{([^{}]*)\}\s*')
+SEPARATOR_PATTERN = re.compile(r'\s*,?\s*')
+
+# settings every grid file has to have, besides its size
+REQUIRED_SETTINGS = ['robotstartstate', 'k', 'episodes', 'discount', 'alpha', 'noise',
+                     'transitioncost']
+
+# version of the binary format, stored in every .npz grid file
+BINARY_VERSION = 1
+
+
+class GridConfigError(ValueError):
+    """
+    Error raised for a malformed or invalid grid file
+    """
+
+    def __init__(self, filename, line_number, message):
+        """
+        :param filename: The name of the grid file
+        :param line_number: The line the error is on, None if it isn't on a line
+        :param message: What is wrong
+        """
+        location = filename if line_number is None else "{}:{}".format(
+            filename, line_number)
+        super().__init__("{}: {}".format(location, message))
+        self.filename = filename
+        self.line_number = line_number
+
+
+class GridConfig:
+    """
+    Representation of the contents of a grid file
+    Attributes
+        num_rows                Number of rows in the grid
+        num_cols                Number of columns in the grid
+        terminals               [row, col, reward] of all terminal states
+        boulders                [row, col] of all boulder states
+        robot_start_location    Start location of the robot
+        iterations              Number of times to do value iteration
+        episodes                Number of episodes to do q learning on
+        discount                Discount value for learning
+        alpha                   Value of alpha
+        noise                   The likelihood the robot won't end up where it's going
+        transition_cost         Cost for trasitioning between states
+        exploration             How q learning explores (one of EXPLORATIONS)
+        exploration_start       Epsilon, temperature or bonus weight the
+                                exploration starts with
+        exploration_end         Value the exploration decays to
+        exploration_decay       How the exploration decays (one of DECAYS)
+        alpha_end               Value alpha decays to
+        alpha_decay             How alpha decays (one of DECAYS)
+        decay_episodes          Number of episodes the decays take
+    """
+
+    def __init__(self):
+        """
+        Init an empty grid config, settings missing from a file stay None
+        """
+        self.num_rows = None
+        self.num_cols = None
+        self.terminals = []
+        self.boulders = []
+        self.robot_start_location = [None, None]
+        self.iterations = None
+        self.episodes = None
+        self.discount = None
+        self.alpha = None
+        self.noise = None
+        self.transition_cost = None
+        self.exploration = None
+        self.exploration_start = None
+        self.exploration_end = None
+        self.exploration_decay = None
+        self.alpha_end = None
+        self.alpha_decay = None
+        self.decay_episodes = None
+
+
+def parse_number(text, number_type, filename, line_number, what):
+    """
+    Parse a number, raising a GridConfigError if it is malformed
+
+    :param text: The text to parse
+    :param number_type: int or float
+    :param filename: The name of the grid file
+    :param line_number: The line the number is on
+    :param what: Description of the number for the error message
+    :return: The number
+    """
+    try:
+        return number_type(text.strip())
+    except ValueError:
+        raise GridConfigError(filename, line_number, "Invalid {} '{}', expected {}".format(
+            what, text.strip(), 'an integer' if number_type is int else 'a number')) from None
+
+
+def parse_entries(value, size, filename, line_number, what):
+    """
+    Parse a list of entries written as {1={a,b,...},2={a,b,...}} in a single
+    pass over the text
+
+    :param value: The text after the '='
+    :param size: The number of values in each entry
+    :param filename: The name of the grid file
+    :param line_number: The line the list is on
+    :param what: Name of the setting for the error messages
+    :return: A list with the text of the values of each entry
+    """
+    value = value.strip()
+    if not (value.startswith('{') and value.endswith('}')):
+        raise GridConfigError(filename, line_number, "Expected {} to be written as "
+                              "{{1={{...}},2={{...}}}}".format(what))
+    body = value[1:-1]
+    entries = []
+    position = 0
+    while position < len(body):
+        match = ENTRY_PATTERN.match(body, position)
+        if not match:
+            raise GridConfigError(filename, line_number, "Invalid {} entry at '{}'".format(
+                what, body[position:position + 20]))
+        values = match.group(1).split(',')
+        if len(values) != size:
+            raise GridConfigError(filename, line_number, "{} entry '{}' has {} values, expected {}".format(
+                what, match.group(0).strip(), len(values), size))
+        entries.append(values)
+        position = SEPARATOR_PATTERN.match(body, match.end()).end()
+    return entries
+
+
+def validate(config, filename, line_numbers):
+    """
+    Check the settings of a grid config make sense together
+
+    :param config: The GridConfig to check
+    :param filename: The name of the grid file
+    :param line_numbers: The line each setting was read from, keyed by the
+                         lower case setting name
+    """
+    def fail(setting, message):
+        raise GridConfigError(filename, line_numbers.get(setting), message)
+
+    for setting in ('horizontal', 'vertical'):
+        value = getattr(config, SCALAR_SETTINGS[setting])
+        if value is None:
+            fail(setting, "Missing the {} setting".format(SETTING_NAMES[setting]))
+        if value <= 0:
+            fail(setting, "{} must be positive, got {}".format(SETTING_NAMES[setting], value))
+    for setting in REQUIRED_SETTINGS:
+        if setting == 'robotstartstate':
+            value = config.robot_start_location[0]
+        else:
+            value = getattr(config, SCALAR_SETTINGS[setting])
+        if value is None:
+            fail(setting, "Missing the {} setting".format(SETTING_NAMES[setting]))
+    for setting in ('k', 'episodes'):
+        value = getattr(config, SCALAR_SETTINGS[setting])
+        if value is not None and value < 0:
+            fail(setting, "{} can't be negative, got {}".format(SETTING_NAMES[setting], value))
+    for setting in ('discount', 'alpha', 'noise', 'alphaend'):
+        value = getattr(config, SCALAR_SETTINGS[setting])
+        if value is not None and not 0.0 <= value <= 1.0:
+            fail(setting, "{} must be between 0 and 1, got {}".format(SETTING_NAMES[setting], value))
+    for setting in ('explorationstart', 'explorationend'):
+        value = getattr(config, SCALAR_SETTINGS[setting])
+        if value is not None and value < 0:
+            fail(setting, "{} can't be negative, got {}".format(SETTING_NAMES[setting], value))
+    if config.decay_episodes is not None and config.decay_episodes <= 0:
+        fail('decayepisodes', "DecayEpisodes must be positive, got {}".format(config.decay_episodes))
+    for setting, (attr, choices) in STRING_SETTINGS.items():
+        value = getattr(config, attr)
+        if value is not None and value not in choices:
+            fail(setting, "Unknown {} '{}', expected one of {}".format(
+                SETTING_NAMES[setting], value, choices))
+
+    def check_cell(setting, row, col):
+        if not (0 <= row < config.num_rows and 0 <= col < config.num_cols):
+            fail(setting, "{} cell {{{},{}}} is outside of the {}x{} grid".format(
+                SETTING_NAMES[setting], row, col, config.num_rows, config.num_cols))
+
+    terminal_cells = set()
+    for terminal in config.terminals:
+        cell = (terminal[0], terminal[1])
+        check_cell('terminal', *cell)
+        if cell in terminal_cells:
+            fail('terminal', "Terminal cell {{{},{}}} is listed twice".format(*cell))
+        terminal_cells.add(cell)
+    boulder_cells = set()
+    for boulder in config.boulders:
+        cell = (boulder[0], boulder[1])
+        check_cell('boulder', *cell)
+        if cell in boulder_cells:
+            fail('boulder', "Boulder cell {{{},{}}} is listed twice".format(*cell))
+        if cell in terminal_cells:
+            fail('boulder', "Boulder cell {{{},{}}} is also a terminal".format(*cell))
+        boulder_cells.add(cell)
+    start = tuple(config.robot_start_location)
+    check_cell('robotstartstate', *start)
+    if start in boulder_cells or start in terminal_cells:
+        fail('robotstartstate', "RobotStartState {{{},{}}} is on a {}".format(
+            start[0], start[1], 'boulder' if start in boulder_cells else 'terminal'))
+
+
+def parse_grid_config(filename: str):
+    """
+    Parse a grid file in the text format (gridConf.txt)
+
+    :param filename: The name of the file to parse
+    :return: The GridConfig
+    """
+    config = GridConfig()
+    line_numbers = {}
+    with open(filename, 'r') as fp:
+        for line_number, line in enumerate(fp, 1):
+            if not line.strip():
+                continue
+            if '=' not in line:
+                raise GridConfigError(filename, line_number, "Expected a 'Setting=value' line, got '{}'".format(
+                    line.strip()))
+            attr, value = line.split('=', 1)
+            attr = attr.strip().lower()
+            if attr not in SETTING_NAMES:
+                raise GridConfigError(filename, line_number, "Unknown setting '{}'".format(attr))
+            if attr in line_numbers:
+                raise GridConfigError(filename, line_number, "{} is set twice, first on line {}".format(
+                    SETTING_NAMES[attr], line_numbers[attr]))
+            line_numbers[attr] = line_number
+
+            if attr == 'terminal':
+                config.terminals = [
+                    [parse_number(row, int, filename, line_number, 'terminal row'),
+                     parse_number(col, int, filename, line_number, 'terminal column'),
+                     parse_number(reward, float, filename, line_number, 'terminal reward')]
+                    for row, col, reward in parse_entries(value, 3, filename, line_number, 'Terminal')]
+            elif attr == 'boulder':
+                config.boulders = [
+                    [parse_number(row, int, filename, line_number, 'boulder row'),
+                     parse_number(col, int, filename, line_number, 'boulder column')]
+                    for row, col in parse_entries(value, 2, filename, line_number, 'Boulder')]
+            elif attr == 'robotstartstate':
+                value = value.strip()
+                if not (value.startswith('{') and value.endswith('}')) or value.count(',') != 1:
+                    raise GridConfigError(filename, line_number,
+                                          "Expected RobotStartState to be written as {row,col}")
+                row, col = value[1:-1].split(',')
+                config.robot_start_location = [
+                    parse_number(row, int, filename, line_number, 'robot start row'),
+                    parse_number(col, int, filename, line_number, 'robot start column')]
+            elif attr in STRING_SETTINGS:
+                setattr(config, STRING_SETTINGS[attr][0], value.strip().lower())
+            else:
+                number_type = int if attr in INT_SETTINGS else float
+                setattr(config, SCALAR_SETTINGS[attr], parse_number(
+                    value, number_type, filename, line_number, SETTING_NAMES[attr]))
+
+    validate(config, filename, line_numbers)
+    return config
+
+
+def load_grid_binary(filename: str):
+    """
+    Load a grid file in the binary .npz format
+
+    :param filename: The name of the file to load
+    :return: The GridConfig
+    """
+    config = GridConfig()
+    with np.load(filename) as data:
+        if 'version' not in data or int(data['version']) != BINARY_VERSION:
+            raise GridConfigError(filename, None, "Not a version {} binary grid file".format(
+                BINARY_VERSION))
+        config.num_rows, config.num_cols = (int(value) for value in data['shape'])
+        config.terminals = [[int(row), int(col), reward]
+                            for row, col, reward in data['terminals'].tolist()]
+        config.boulders = data['boulders'].tolist()
+        if 'robot_start' in data:
+            config.robot_start_location = data['robot_start'].tolist()
+        for setting, attr in SCALAR_SETTINGS.items():
+            if setting not in ('horizontal', 'vertical') and setting in data:
+                number_type = int if setting in INT_SETTINGS else float
+                setattr(config, attr, number_type(data[setting]))
+        for setting, (attr, _) in STRING_SETTINGS.items():
+            if setting in data:
+                setattr(config, attr, str(data[setting]))
+    validate(config, filename, {})
+    return config
+
+
+def load_grid_config(filename: str):
+    """
+    Load a grid file, .npz files are read in the binary format and any other
+    file in the text format
+
+    :param filename: The name of the file to load
+    :return: The GridConfig
+    """
+    if filename.endswith('.npz'):
+        return load_grid_binary(filename)
+    return parse_grid_config(filename)
+
+
+def write_grid_config(config, filename: str):
+    """
+    Write a grid config in the text format
+
+    :param config: The GridConfig to write
+    :param filename: The name of the file to write
+    """
+    lines = ["Horizontal={}".format(config.num_rows), "Vertical={}".format(config.num_cols),
+             "Terminal={{{}}}".format(','.join(
+                 "{}={{{},{},{!r}}}".format(k + 1, row, col, float(reward))
+                 for k, (row, col, reward) in enumerate(config.terminals))),
+             "Boulder={{{}}}".format(','.join(
+                 "{}={{{},{}}}".format(k + 1, row, col)
+                 for k, (row, col) in enumerate(config.boulders)))]
+    if config.robot_start_location[0] is not None:
+        lines.append("RobotStartState={{{},{}}}".format(*config.robot_start_location))
+    for setting in WRITTEN_SETTINGS:
+        attr = STRING_SETTINGS[setting][0] if setting in STRING_SETTINGS else SCALAR_SETTINGS[setting]
+        value = getattr(config, attr)
+        if value is not None:
+            lines.append("{}={}".format(SETTING_NAMES[setting], value))
+    with open(filename, 'w') as fp:
+        fp.write('\n'.join(lines) + '\n')
+
+
+def save_grid_binary(config, filename: str):
+    """
+    Write a grid config in the binary .npz format
+
+    :param config: The GridConfig to write
+    :param filename: The name of the file to write, should end with .npz
+    """
+    data = {'version': BINARY_VERSION,
+            'shape': np.array([config.num_rows, config.num_cols]),
+            'terminals': np.array(config.terminals, dtype=float).reshape(-1, 3),
+            'boulders': np.array(config.boulders, dtype=np.int64).reshape(-1, 2)}
+    if config.robot_start_location[0] is not None:
+        data['robot_start'] = np.array(config.robot_start_location)
+    for setting, attr in SCALAR_SETTINGS.items():
+        if setting not in ('horizontal', 'vertical') and getattr(config, attr) is not None:
+            data[setting] = getattr(config, attr)
+    for setting, (attr, _) in STRING_SETTINGS.items():
+        if getattr(config, attr) is not None:
+            data[setting] = np.array(getattr(config, attr))
+    with open(filename, 'wb') as fp:
+        np.savez_compressed(fp, **data)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert a grid file between the text and the binary .npz format')
+
+    parser.add_argument('input', help='Grid file to read', type=str)
+
+    parser.add_argument('output', help='Grid file to write, in the binary format if it ends '
+                                       'with .npz and in the text format otherwise', type=str)
+
+    args = parser.parse_args()
+
+    config = load_grid_config(args.input)
+    if args.output.endswith('.npz'):
+        save_grid_binary(config, args.output)
+    else:
+        write_grid_config(config, args.output)
+    print("Wrote the {}x{} grid with {} terminals and {} boulders to {}".format(
+        config.num_rows, config.num_cols, len(config.terminals), len(config.boulders),
+        args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+    File name: grid_generator.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script generates reproducible grids of any size in the grid file
+    format, with open room, maze or cliff layouts.
+"""
+from grid_config import GridConfig, write_grid_config, save_grid_binary
+import argparse
+import numpy as np
+
+# 'open' scatters boulders and traps over an open room, 'maze' carves a
+# maze out of boulders and 'cliff' lines the bottom row with a cliff of
+# negative terminals between the start and the goal, like valley.txt
+LAYOUTS = ['open', 'maze', 'cliff']
+
+# reward for reaching the goal and for falling into a trap or off the cliff
+GOAL_REWARD = 10.0
+TRAP_REWARD = -10.0
+CLIFF_REWARD = -100.0
+
+
+def carve_maze(rows, cols, rng):
+    """
+    Carve a maze with a randomized depth first search. The passages are the
+    cells with even coordinates and the walls between them that got knocked
+    down, every passage can be reached from every other one
+
+    :param rows: The number of rows of the grid
+    :param cols: The number of columns of the grid
+    :param rng: numpy random generator
+    :return: (rows, cols) array that is True for the open cells
+    """
+    is_open = np.zeros((rows, cols), dtype=bool)
+    is_open[0, 0] = True
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        neighbours = [(row + d_row, col + d_col) for d_row, d_col in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                      if 0 <= row + d_row < rows and 0 <= col + d_col < cols and
+                      not is_open[row + d_row, col + d_col]]
+        if not neighbours:
+            stack.pop()
+            continue
+        next_row, next_col = neighbours[rng.integers(len(neighbours))]
+        # knock down the wall in between
+        is_open[(row + next_row) // 2, (col + next_col) // 2] = True
+        is_open[next_row, next_col] = True
+        stack.append((next_row, next_col))
+    return is_open
+
+
+def generate_grid(rows, cols, layout='open', boulder_density=0.1, trap_density=0.0, seed=None,
+                  iterations=1000, episodes=3500, discount=0.9, alpha=0.2, noise=0.2,
+                  transition_cost=-0.1):
+    """
+    Generate a grid, the robot starts in cell (0, 0) and the goal terminal
+    is in the cell furthest from it
+
+    :param rows: The number of rows of the grid
+    :param cols: The number of columns of the grid
+    :param layout: The layout of the grid (one of LAYOUTS)
+    :param boulder_density: Fraction of the free cells that get a boulder,
+                            unused for mazes, which are made of boulders
+    :param trap_density: Fraction of the free cells that get a negative
+                         terminal
+    :param seed: Seed of the random generator, the same seed and arguments
+                 always give the same grid
+    :param iterations: Number of times to do value iteration
+    :param episodes: Number of episodes to do q learning on
+    :param discount: Discount value for learning
+    :param alpha: Value of alpha
+    :param noise: The likelihood the robot won't end up where it's going
+    :param transition_cost: Cost for trasitioning between states
+    :return: The GridConfig
+    """
+    if layout not in LAYOUTS:
+        raise ValueError("Unknown grid layout '{}', expected one of {}".format(
+            layout, LAYOUTS))
+    if rows < 2 or cols < 2:
+        raise ValueError("Grids need at least 2 rows and 2 columns")
+    rng = np.random.default_rng(seed)
+    # cells that must stay free of boulders and traps
+    reserved = np.zeros((rows, cols), dtype=bool)
+    terminals = []
+
+    if layout == 'maze':
+        is_open = carve_maze(rows, cols, rng)
+        # the goal is the last passage cell
+        goal = ((rows - 1) // 2 * 2, (cols - 1) // 2 * 2)
+        is_boulder = ~is_open
+    else:
+        goal = (rows - 1, cols - 1)
+        if layout == 'cliff':
+            # the start is at one end of the bottom row, the goal at the other
+            # and the cells in between are the cliff
+            goal = (0, cols - 1)
+            for col in range(1, cols - 1):
+                terminals.append([0, col, CLIFF_REWARD])
+            reserved[0, :] = True
+        reserved[0, 0] = True
+        reserved[goal] = True
+        is_boulder = (rng.random((rows, cols)) < boulder_density) & ~reserved
+
+    terminals.append([goal[0], goal[1], GOAL_REWARD])
+    reserved[0, 0] = True
+    reserved[goal] = True
+    traps = (rng.random((rows, cols)) < trap_density) & ~is_boulder & ~reserved
+    for row, col in zip(*np.nonzero(traps)):
+        terminals.append([int(row), int(col), TRAP_REWARD])
+
+    config = GridConfig()
+    config.num_rows = rows
+    config.num_cols = cols
+    config.terminals = terminals
+    config.boulders = [[int(row), int(col)] for row, col in zip(*np.nonzero(is_boulder))]
+    config.robot_start_location = [0, 0]
+    config.iterations = iterations
+    config.episodes = episodes
+    config.discount = discount
+    config.alpha = alpha
+    config.noise = noise
+    config.transition_cost = transition_cost
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a grid file')
+
+    parser.add_argument('output', help='Grid file to write, in the binary format if it ends '
+                                       'with .npz and in the text format otherwise', type=str)
+
+    parser.add_argument('--rows', help='Number of rows (default: 10)', type=int, default=10)
+
+    parser.add_argument('--cols', help='Number of columns (default: 10)', type=int, default=10)
+
+    parser.add_argument(
+        '--layout', help='Layout of the grid (default: open)', choices=LAYOUTS, default='open')
+
+    parser.add_argument(
+        '--boulder_density', help='Fraction of the cells that get a boulder (default: 0.1)',
+        type=float, default=0.1)
+
+    parser.add_argument(
+        '--trap_density', help='Fraction of the cells that get a negative terminal (default: 0)',
+        type=float, default=0.0)
+
+    parser.add_argument('--seed', help='Seed of the random generator', type=int)
+
+    args = parser.parse_args()
+
+    config = generate_grid(args.rows, args.cols, args.layout, args.boulder_density,
+                           args.trap_density, args.seed)
+    if args.output.endswith('.npz'):
+        save_grid_binary(config, args.output)
+    else:
+        write_grid_config(config, args.output)
+    print("Wrote the {}x{} {} grid with {} terminals and {} boulders to {}".format(
+        config.num_rows, config.num_cols, args.layout, len(config.terminals),
+        len(config.boulders), args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,49 +1,156 @@
 """
     File name: main.py
     Author: Arsh Khokhar, Kiernan Wiese
-    Date last modified: 15 April, 2021
+    Date last modified: 17 October, 2026
     Python Version: 3.8
 
     This script contains the main function that calls both of the agent
     scripts to do either value iteration or q learning based on data it reads
     from gridConf.txt and results.txt.
 """
-from grid import Grid
-from visualizer import Visualizer
-from value_iteration_agent import ValueIterationAgent
+from grid import Grid, STORAGES
+from queries import load_results, answer_query, format_answer, query_cells
+from value_iteration_agent import ValueIterationAgent, ENGINES, SCHEDULES
+from policy_iteration_agent import PolicyIterationAgent, EVALUATIONS
 from q_learning_agent import QLearningAgent
-from copy import deepcopy
+from vectorized_q_learning_agent import VectorizedQLearningAgent
+from exploration import EXPLORATIONS, DECAYS, EXPLORATION_SETTINGS
+from replay import LEARNING_MODES, DEFAULT_REPLAY_CAPACITY
+from checkpoint import save_checkpoint, load_checkpoint, warm_start
+from result_cache import ResultCache, cache_key, DEFAULT_CACHE_SIZE
 import argparse
+import csv
+import itertools
+import json
+import random
+import sys
+import textwrap
 
 
-def load_results(filename: str):
+def collect_answers(queries, agents, learning_type):
     """
-    Load the results file
+    Answer the queries of one learning type from the agents snapshotted at
+    each queried iteration/episode, one at a time as they are written
 
-    :param filename: The name of the results file to load (results.txt)
-    :return: Two dictionaries containing representations of the queries the input file
+    :param queries: Dictionary of the queries for each iteration/episode
+    :param agents: Dictionary of the AgentSnapshot for each iteration/episode
+    :param learning_type: 'MDP' or 'RL', as written in the results file
+    :return: A generator of dictionaries, one per query
     """
-    mdp_results = {}
-    rl_results = {}
-    with open(filename, 'r') as fp:
-        lines = fp.readlines()
-
-    for line in lines:
-        row, col, number, learning_type, query = line.strip().split(',')
-        row, col, number = int(row), int(col), int(number)
-        new_elem_dict = {"row": row, "col": col, "query": query}
-        if learning_type.lower() == 'mdp':
-            if number in mdp_results:
-                mdp_results[number].append(new_elem_dict)
-            else:
-                mdp_results[number] = [new_elem_dict]
-        elif learning_type.lower() == 'rl':
-            if number in rl_results:
-                rl_results[number].append(new_elem_dict)
-            else:
-                rl_results[number] = [new_elem_dict]
+    for number in queries:
+        for query_data in queries[number]:
+            answer = answer_query(
+                agents[number], query_data['row'], query_data['col'], query_data['query'])
+            yield {"row": query_data['row'], "col": query_data['col'],
+                   "number": number, "type": learning_type,
+                   "query": query_data['query'],
+                   "answer": format_answer(query_data['query'], answer)}
+
+
+def write_answers(answers, output_format, filename=None):
+    """
+    Write the query answers as JSON or CSV, each answer as soon as it is
+    given so they are never all held in memory
+
+    :param answers: The answers returned by collect_answers
+    :param output_format: 'json' or 'csv'
+    :param filename: The file to write to, None to print to stdout
+    """
+    fp = open(filename, 'w', newline='') if filename else sys.stdout
+    try:
+        if output_format == 'json':
+            # the same layout as json.dump(answers, fp, indent=2)
+            separator = '[\n'
+            for answer in answers:
+                fp.write(separator + textwrap.indent(json.dumps(answer, indent=2), '  '))
+                separator = ',\n'
+            fp.write('[]\n' if separator == '[\n' else '\n]\n')
+        else:
+            writer = csv.DictWriter(
+                fp, fieldnames=['row', 'col', 'number', 'type', 'query', 'answer'])
+            writer.writeheader()
+            for answer in answers:
+                if isinstance(answer['answer'], (dict, list)):
+                    # q values and maps are written as JSON in one column
+                    answer = dict(answer, answer=json.dumps(answer['answer']))
+                writer.writerow(answer)
+    finally:
+        if filename:
+            fp.close()
+
+
+def apply_exploration_args(grid, args):
+    """
+    Override the exploration and learning rate settings of a grid with the
+    ones given on the command line
+
+    :param grid: The Grid to change
+    :param args: The parsed command line arguments
+    """
+    for setting in EXPLORATION_SETTINGS:
+        if getattr(args, setting) is not None:
+            setattr(grid, setting, getattr(args, setting))
+
+
+def load_agent(agent, filename, args, log):
+    """
+    Warm start an agent from a checkpoint
+
+    :param agent: The agent to warm start
+    :param filename: The checkpoint to load, None to start from zero
+    :param args: The parsed command line arguments
+    :param log: The file to report the warm start to
+    :return: A snapshot of the agent right after loading, None if there was
+             no checkpoint
+    """
+    if filename is None:
+        return None
+    checkpoint = load_checkpoint(filename, args.mmap)
+    resumed = warm_start(agent, checkpoint, not args.reset_counters)
+    changes = checkpoint.changes(agent.grid)
+    print("Warm started from {}{}{}".format(
+        filename, ", continuing at {}".format(agent.get_display_index()) if resumed else "",
+        " (changed: {})".format(', '.join(changes)) if changes else ""), file=log)
+    return agent.snapshot()
+
+
+def answer_from_loaded(queries, results, loaded):
+    """
+    Answer the queries about the iterations/episodes a warm started agent
+    skipped from the loaded tables, the earliest values there are
+
+    :param queries: Dictionary of the queries for each iteration/episode
+    :param results: Dictionary of the AgentSnapshot for each iteration/episode
+    :param loaded: The snapshot returned by load_agent, None if nothing was loaded
+    """
+    if loaded is None:
+        return
+    for number in queries:
+        if number <= loaded.display_index and number not in results:
+            results[number] = loaded
+
+
+def mdp_parameters(args):
+    """
+    :param args: The parsed command line arguments
+    :return: Dictionary of the settings the MDP results depend on, besides
+             the grid, for the result cache
+    """
+    return {'agent': 'policy_iteration' if args.policy_iteration else 'value_iteration',
+            'engine': args.engine, 'tolerance': args.tolerance, 'schedule': args.schedule,
+            'evaluation': args.evaluation, 'storage': args.storage}
+
 
-    return mdp_results, rl_results
+def rl_parameters(args):
+    """
+    :param args: The parsed command line arguments
+    :return: Dictionary of the settings the Q-learning results depend on,
+             besides the grid, for the result cache
+    """
+    return {'agent': 'q_learning', 'robots': args.robots, 'seed': args.seed,
+            'max_episode_steps': args.max_episode_steps, 'learning': args.learning,
+            'backups_per_step': args.backups_per_step, 'replay_capacity': args.replay_capacity,
+            'storage': args.storage}
 
 
 def main():
@@ -61,65 +168,287 @@ def main():
     parser.add_argument(
         '--results', help='Use a custom result file', type=str)
 
+    parser.add_argument(
+        '--engine', help='Engine to run value iteration with (default: reference)',
+        choices=ENGINES, default='reference')
+
+    parser.add_argument(
+        '--tolerance', help='Stop value iteration once the values are provably within TOLERANCE of the optimal values',
+        type=float)
+
+    parser.add_argument(
+        '--schedule', help='Order to back up the states in during value iteration (default: synchronous)',
+        choices=SCHEDULES, default='synchronous')
+
+    parser.add_argument('--policy_iteration',
+                        help='Use policy iteration instead of value iteration for the MDP', default=False,
+                        action="store_true")
+
+    parser.add_argument(
+        '--evaluation', help='How policy iteration evaluates each policy (default: direct)',
+        choices=EVALUATIONS, default='direct')
+
+    parser.add_argument(
+        '--robots', help='Run Q-learning with ROBOTS robots at once on an array backed Q-table', type=int)
+
+    parser.add_argument(
+        '--seed', help='Seed for the random generators of Q-learning and its environment', type=int)
+
+    parser.add_argument(
+        '--max_episode_steps', help='Cut Q-learning episodes off after MAX_EPISODE_STEPS steps', type=int)
+
+    parser.add_argument(
+        '--exploration', help='How Q-learning explores (default: epsilon_greedy, or the grid file\'s Exploration)',
+        choices=EXPLORATIONS)
+
+    parser.add_argument(
+        '--exploration_start', help='Epsilon, temperature or UCB bonus weight the exploration starts with '
+                                    '(default: the noise for epsilon_greedy, 1 otherwise)', type=float)
+
+    parser.add_argument(
+        '--exploration_end', help='Value the exploration decays to', type=float)
+
+    parser.add_argument(
+        '--exploration_decay', help='How the exploration decays (default: constant)', choices=DECAYS)
+
+    parser.add_argument(
+        '--alpha_end', help='Value alpha decays to', type=float)
+
+    parser.add_argument(
+        '--alpha_decay', help='How alpha decays (default: constant)', choices=DECAYS)
+
+    parser.add_argument(
+        '--decay_episodes', help='Episodes the decays take (default: 1000)', type=int)
+
+    parser.add_argument(
+        '--learning', help='How Q-learning learns from its steps (default: online)',
+        choices=LEARNING_MODES, default='online')
+
+    parser.add_argument(
+        '--backups_per_step', help='Replayed transitions or Dyna-Q planning backups after each step '
+                                   '(default: 16 for replay, 10 for dyna_q)', type=int)
+
+    parser.add_argument(
+        '--replay_capacity', help='Most transitions the replay buffer holds (default: {})'.format(
+            DEFAULT_REPLAY_CAPACITY), type=int, default=DEFAULT_REPLAY_CAPACITY)
+
+    parser.add_argument(
+        '--load_mdp', help='Checkpoint to warm start the MDP agent from', type=str)
+
+    parser.add_argument(
+        '--load_rl', help='Checkpoint to warm start the Q-learning agent from', type=str)
+
+    parser.add_argument(
+        '--save_mdp', help='Save the MDP agent to SAVE_MDP once it is done, a .npz file or a directory',
+        type=str)
+
+    parser.add_argument(
+        '--save_rl', help='Save the Q-learning agent to SAVE_RL once it is done, a .npz file or a directory',
+        type=str)
+
+    parser.add_argument('--reset_counters',
+                        help='Count the iterations/episodes of warm started agents from zero',
+                        default=False, action="store_true")
+
+    parser.add_argument('--mmap',
+                        help='Memory-map the arrays of checkpoint directories instead of reading them',
+                        default=False, action="store_true")
+
+    parser.add_argument(
+        '--cache', help='Directory to cache the results of runs in, runs of the same grid with the same '
+                        'settings are read from it instead of run again', type=str)
+
+    parser.add_argument(
+        '--cache_size', help='Most megabytes the cache takes before the least recently used runs are '
+                             'deleted (default: {})'.format(DEFAULT_CACHE_SIZE // 2 ** 20),
+        type=float, default=DEFAULT_CACHE_SIZE / 2 ** 20)
+
+    parser.add_argument(
+        '--storage', help='How the grid stores its states (default: objects)',
+        choices=STORAGES, default='objects')
+
+    parser.add_argument('--headless',
+                        help='Answer the queries without opening any windows', default=False,
+                        action="store_true")
+
+    parser.add_argument(
+        '--format', help='Format of the headless answers (default: json)',
+        choices=['json', 'csv'], default='json')
+
+    parser.add_argument(
+        '--output', help='File to write the headless answers to (default: stdout)', type=str)
+
+    parser.add_argument(
+        '--fps', help='Most frames per second the windows are redrawn at (default: 30)',
+        type=int, default=30)
+
     args = parser.parse_args()
+    if args.robots and args.learning != 'online':
+        parser.error("--learning {} is not supported with --robots".format(args.learning))
 
     grid_file = "gridConf.txt" if not args.grid else args.grid
     result_file = "results.txt" if not args.results else args.results
+    if args.seed is not None:
+        # the exploration draws from the random module
+        random.seed(args.seed)
 
     if args.interactive_mdp:
+        # pygame is only imported when a window is opened
+        from visualizer import Visualizer
         # Launch an interactive mdp grid with value iteration agent
-        mdp_grid = Grid(grid_file)
-        interactive_mdp_agent = ValueIterationAgent(mdp_grid)
-        game = Visualizer(interactive_mdp_agent, is_interactive=True)
+        mdp_grid = Grid(grid_file, args.storage)
+        if args.policy_iteration:
+            interactive_mdp_agent = PolicyIterationAgent(mdp_grid, args.evaluation)
+        else:
+            interactive_mdp_agent = ValueIterationAgent(
+                mdp_grid, args.engine, schedule=args.schedule)
+        load_agent(interactive_mdp_agent, args.load_mdp, args, sys.stdout)
+        game = Visualizer(interactive_mdp_agent, is_interactive=True, fps=args.fps)
         game.display()
 
     elif args.interactive_rl:
+        from visualizer import Visualizer
         # Launch an interactive reinforcement learning grid with Q-learning agent
-        rl_grid = Grid(grid_file)
-        interactive_rl_agent = QLearningAgent(rl_grid)
-        game = Visualizer(interactive_rl_agent, is_interactive=True)
+        rl_grid = Grid(grid_file, args.storage)
+        apply_exploration_args(rl_grid, args)
+        interactive_rl_agent = QLearningAgent(
+            rl_grid, learning=args.learning, backups_per_step=args.backups_per_step,
+            replay_capacity=args.replay_capacity)
+        load_agent(interactive_rl_agent, args.load_rl, args, sys.stdout)
+        game = Visualizer(interactive_rl_agent, is_interactive=True, fps=args.fps)
         game.display()
 
     else:
-        mdp_grid = Grid(grid_file)
-        rl_grid = Grid(grid_file)
+        mdp_grid = Grid(grid_file, args.storage)
+        rl_grid = Grid(grid_file, args.storage)
+        apply_exploration_args(rl_grid, args)
 
         result_mdp_grids = {}
         result_rl_grids = {}
 
         mdp_queries, rl_queries = load_results(result_file)
+        # headless runs only take the cells their queries are about, the
+        # windows show every cell
+        if args.headless:
+            mdp_cells = query_cells(mdp_queries, mdp_grid.num_cols)
+            rl_cells = query_cells(rl_queries, rl_grid.num_cols)
+        else:
+            mdp_cells = dict.fromkeys(mdp_queries)
+            rl_cells = dict.fromkeys(rl_queries)
+
+        if args.policy_iteration:
+            value_iter_agent = PolicyIterationAgent(mdp_grid, args.evaluation)
+        else:
+            value_iter_agent = ValueIterationAgent(
+                mdp_grid, args.engine, args.tolerance, args.schedule)
+
+        if args.robots:
+            q_learn_agent = VectorizedQLearningAgent(
+                rl_grid, args.robots, args.seed)
+        else:
+            q_learn_agent = QLearningAgent(
+                rl_grid, learning=args.learning, backups_per_step=args.backups_per_step,
+                replay_capacity=args.replay_capacity)
+
+        # progress goes to stderr so stdout only holds the headless answers
+        log = sys.stderr if args.headless else sys.stdout
+        loaded_mdp_agent = load_agent(value_iter_agent, args.load_mdp, args, log)
+        loaded_rl_agent = load_agent(q_learn_agent, args.load_rl, args, log)
+
+        # runs that start from a checkpoint or have to be saved aren't
+        # cached, q learning only when its seed makes it repeatable
+        cache = ResultCache(args.cache, int(args.cache_size * 2 ** 20)) if args.cache else None
+        mdp_key = rl_key = cached_mdp = cached_rl = None
+        if cache and not args.load_mdp and not args.save_mdp:
+            mdp_key = cache_key(mdp_grid, mdp_parameters(args))
+            cached_mdp = cache.load(mdp_key, value_iter_agent)
+        if cache and args.seed is not None and not args.load_rl and not args.save_rl:
+            rl_key = cache_key(rl_grid, rl_parameters(args))
+            cached_rl = cache.load(rl_key, q_learn_agent)
+
+        cached_answers = cached_mdp.answers(mdp_cells) if cached_mdp else None
+        if cached_answers is not None:
+            result_mdp_grids = cached_answers
+            print("\n{} (read from the cache)".format(cached_mdp.message), file=log)
+        else:
+            def take_mdp_snapshot(iteration):
+                if iteration in mdp_queries:
+                    # take a snapshot of the values for a query
+                    result_mdp_grids[iteration] = value_iter_agent.snapshot(mdp_cells[iteration])
+
+            value_iter_agent.run(mdp_grid.iterations, take_mdp_snapshot)
+            answer_from_loaded(mdp_queries, result_mdp_grids, loaded_mdp_agent)
+
+            if args.policy_iteration:
+                mdp_message = "Policy iteration done for {} iterations{}".format(
+                    value_iter_agent.curr_iteration,
+                    " (policy stable)" if value_iter_agent.has_converged() else "")
+            elif value_iter_agent.has_converged():
+                mdp_message = "Value iteration converged after {} iterations, {} backups (residual {:.2e})".format(
+                    value_iter_agent.curr_iteration, value_iter_agent.backups,
+                    value_iter_agent.residuals[-1])
+            else:
+                mdp_message = "Value iteration done for {} iterations, {} backups".format(
+                    mdp_grid.iterations, value_iter_agent.backups)
+            print("\n" + mdp_message, file=log)
+
+            final_mdp_agent = value_iter_agent.snapshot()
+            if value_iter_agent.has_converged():
+                # queries past the convergence point are answered from the
+                # converged values
+                for iteration in mdp_queries:
+                    if iteration not in result_mdp_grids:
+                        result_mdp_grids[iteration] = final_mdp_agent
+            if mdp_key:
+                cache.store(mdp_key, result_mdp_grids, final_mdp_agent,
+                            value_iter_agent.has_converged(), mdp_message, cached_mdp)
 
-        value_iter_agent = ValueIterationAgent(mdp_grid)
+        cached_answers = cached_rl.answers(rl_cells) if cached_rl else None
+        if cached_answers is not None:
+            result_rl_grids = cached_answers
+            print("\n{} (read from the cache)".format(cached_rl.message), file=log)
+        else:
+            def take_rl_snapshot(episode):
+                if episode in rl_queries:
+                    # take a snapshot of the q values for a query
+                    result_rl_grids[episode] = q_learn_agent.snapshot(rl_cells[episode])
 
-        q_learn_agent = QLearningAgent(rl_grid)
+            steps = q_learn_agent.run_episodes(
+                max(rl_grid.episodes - q_learn_agent.curr_episode, 0), take_rl_snapshot, args.max_episode_steps)
+            answer_from_loaded(rl_queries, result_rl_grids, loaded_rl_agent)
 
-        for i in range(mdp_grid.iterations):
-            if i in mdp_queries:
-                # take a 'snapshot' of the agent state for a query
-                result_mdp_grids[i] = deepcopy(value_iter_agent)
-            value_iter_agent.iterate_values()
+            summary = q_learn_agent.stats.summary()
+            rl_message = "Q-Learning done for {} episodes, {} steps (mean episode length {:.1f}, mean return {:.2f}{})".format(
+                rl_grid.episodes, steps, summary['mean_length'], summary['mean_return'],
+                ", {} cut off".format(summary['truncated']) if summary['truncated'] else "")
+            print("\n" + rl_message, file=log)
+            if rl_key:
+                cache.store(rl_key, result_rl_grids, q_learn_agent.snapshot(), False, rl_message,
+                            cached_rl)
 
-        print("\nValue iteration done for {} iterations".format(mdp_grid.iterations))
+        if args.save_mdp:
+            save_checkpoint(value_iter_agent, args.save_mdp)
+        if args.save_rl:
+            save_checkpoint(q_learn_agent, args.save_rl)
 
-        while q_learn_agent.curr_episode < q_learn_agent.grid.episodes:
-            q_learn_agent.q_learn()
-            if q_learn_agent.curr_episode in rl_queries:
-                # take a 'snapshot' of the state for a query
-                result_rl_grids[q_learn_agent.curr_episode] = deepcopy(
-                    q_learn_agent)
+        if args.headless:
+            answers = itertools.chain(collect_answers(mdp_queries, result_mdp_grids, 'MDP'),
+                                      collect_answers(rl_queries, result_rl_grids, 'RL'))
+            write_answers(answers, args.format, args.output)
+            return
 
-        print("\nQ-Learning done for {} episodes".format(q_learn_agent.grid.episodes))
+        from visualizer import Visualizer
         # Showing results for the MDP queries
         for episode in mdp_queries:
             for query_data in mdp_queries[episode]:
-                game = Visualizer(result_mdp_grids[episode])
+                game = Visualizer(result_mdp_grids[episode], fps=args.fps)
                 game.display(highlight_cell=[
                     query_data['row'], query_data['col']], query=query_data['query'])
 
         # Showing results for the RL queries
         for episode in rl_queries:
             for query_data in rl_queries[episode]:
-                game = Visualizer(result_rl_grids[episode])
+                game = Visualizer(result_rl_grids[episode], fps=args.fps)
                 game.display(highlight_cell=[
                     query_data['row'], query_data['col']], query=query_data['query'])
 
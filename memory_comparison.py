@@ -0,0 +1,76 @@
+"""
+    File name: memory_comparison.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script compares the memory taken by a loaded grid with the 'objects'
+    and 'arrays' storages, using square grids of increasing size.
+"""
+from grid import Grid, STORAGES
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+def write_grid_file(filename, size):
+    """
+    Write a size x size grid file with a terminal in two corners and a
+    boulder in the middle
+
+    :param filename: The name of the file to write
+    :param size: The number of rows and columns of the grid
+    """
+    with open(filename, 'w') as fp:
+        fp.write("Horizontal={}\n".format(size))
+        fp.write("Vertical={}\n".format(size))
+        fp.write("Terminal={{1={{{0},{0},+10}},2={{0,{0},-10}}}}\n".format(size - 1))
+        fp.write("Boulder={{1={{{0},{0}}}}}\n".format(size // 2))
+        fp.write("RobotStartState={0,0}\n")
+        fp.write("K=100\nEpisodes=100\nDiscount=0.9\nAlpha=0.2\nNoise=0.2\nTransitionCost=-0.1\n")
+
+
+def measure(filename, storage):
+    """
+    Load a grid and measure the memory it takes
+
+    :param filename: The grid file to load
+    :param storage: The storage to load the grid with (one of STORAGES)
+    :return: The bytes still allocated after loading and the load time in seconds
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    grid = Grid(filename, storage)
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del grid
+    return size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare the memory taken by the grid storages')
+
+    parser.add_argument(
+        '--sizes', help='Number of rows/columns of the grids to compare (default: 10 100 300)',
+        type=int, nargs='+', default=[10, 100, 300])
+
+    args = parser.parse_args()
+
+    print("{:>8} {:>10} {:>14} {:>14} {:>10}".format(
+        'cells', 'storage', 'bytes', 'bytes/cell', 'load (s)'))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'grid.txt')
+        for size in args.sizes:
+            write_grid_file(filename, size)
+            for storage in STORAGES:
+                memory, seconds = measure(filename, storage)
+                print("{:>8} {:>10} {:>14} {:>14.1f} {:>10.3f}".format(
+                    size * size, storage, memory, memory / (size * size), seconds))
+
+
+if __name__ == '__main__':
+    main()
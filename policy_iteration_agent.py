@@ -0,0 +1,227 @@
+"""
+    File name: policy_iteration_agent.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the PolicyIterationAgent class used to run policy
+    iteration, evaluating each policy by solving a sparse linear system or
+    with sparse matrix-vector sweeps.
+"""
+import warnings
+import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg
+from grid import Grid
+from vectorized_value_iteration import VectorizedValueIteration, EXIT_INDEX
+from sparse_mdp import SparseMDP
+from snapshot import AgentSnapshot
+
+# ways a policy can be evaluated, 'direct' and 'iterative' solve its linear
+# system, 'sweeps' repeats its Bellman backup as a sparse matrix-vector
+# product, which takes the least memory on very large grids
+EVALUATIONS = ['direct', 'iterative', 'sweeps']
+
+# largest change of a value at which the 'sweeps' evaluation stops
+SWEEPS_TOLERANCE = 1e-10
+
+
+class PolicyIterationAgent:
+    """
+    Representation of a PolicyIterationAgent
+    Attributes
+        grid                The grid that the agent will be working with when learning
+        discount            The discount value
+        noise               The likelihood the robot won't end up where it's going
+        max_display_val     keeps track of the maximum terminal value for
+                            darker/lighter GUI colors
+        curr_iteration      The number of policy iterations run so far
+        evaluation          How the policy is evaluated, 'direct' for a sparse
+                            LU solve, 'iterative' for BiCGSTAB or 'sweeps'
+                            for sparse matrix-vector sweeps
+        model               VectorizedValueIteration holding the transition
+                            structure, values, q values and policy as arrays
+        mdp                 The SparseMDP of the grid the 'sweeps' evaluation
+                            uses, None for the other evaluations
+        policy              Column of the action taken at each cell (see
+                            vectorized_value_iteration.MOVE_ACTIONS)
+        policy_stable       True once an improvement step left the policy
+                            unchanged
+        states_stale        True if there are values that haven't been copied
+                            into the grid's states yet
+    """
+
+    def __init__(self, input_grid: Grid, evaluation='direct'):
+        """
+        Init function for the PolicyIterationAgent class
+
+        :param input_grid: The grid that the agent will be working with when learning
+        :param evaluation: How the policy is evaluated (one of EVALUATIONS)
+        """
+        if evaluation not in EVALUATIONS:
+            raise ValueError("Unknown policy evaluation '{}', expected one of {}".format(
+                evaluation, EVALUATIONS))
+        self.grid = input_grid
+        self.discount = input_grid.discount
+        self.noise = input_grid.noise
+        self.max_display_val = self.grid.max_terminal_val
+        self.curr_iteration = 0
+        self.evaluation = evaluation
+        self.model = VectorizedValueIteration(input_grid)
+        self.mdp = SparseMDP.from_model(self.model) if evaluation == 'sweeps' else None
+        # start by going north everywhere
+        self.policy = np.zeros(len(self.model.values), dtype=np.intp)
+        self.policy_stable = False
+        self.states_stale = False
+
+    def evaluate_policy(self):
+        """
+        Solve (I - discount * P) v = r for the values of the current policy,
+        where P holds the transition probabilities of the policy's actions and
+        r the expected reward of taking them, or with the 'sweeps' evaluation
+        repeat v = r + discount * P v from the previous policy's values.
+        Terminals are fixed to their terminal reward and boulders to 0.
+
+        :return: The value of every cell under the current policy
+        """
+        model = self.model
+        if self.mdp is not None:
+            return self.mdp.evaluate_policy(self.policy, model.values, SWEEPS_TOLERANCE,
+                                            self.grid.iterations)
+        num_cells = len(model.values)
+        movable = np.flatnonzero(model.is_movable)
+        actions = self.policy[movable]
+
+        rows = np.concatenate([movable, movable, movable])
+        cols = np.concatenate([model.destinations[movable, actions],
+                               model.drift_first[movable, actions],
+                               model.drift_second[movable, actions]])
+        probs = np.concatenate([
+            np.full(len(movable), 1.0 - self.noise),
+            np.full(len(movable), self.noise / 2.0),
+            np.full(len(movable), self.noise / 2.0)])
+        # duplicate (row, col) pairs are summed, e.g. when drifting into a wall
+        transitions = sparse.csr_matrix(
+            (probs, (rows, cols)), shape=(num_cells, num_cells))
+
+        system = sparse.identity(num_cells, format='csr') - \
+            self.discount * transitions
+        expected_rewards = transitions @ model.rewards
+        expected_rewards[model.is_terminal] = model.terminal_rewards[model.is_terminal]
+
+        with warnings.catch_warnings():
+            # a policy that never reaches a terminal makes the system singular
+            # when the grid isn't discounted, this is checked for below
+            warnings.simplefilter('ignore')
+            if self.evaluation == 'direct':
+                values = linalg.spsolve(system.tocsc(), expected_rewards)
+            else:
+                values, _ = linalg.bicgstab(
+                    system, expected_rewards, x0=model.values, rtol=1e-10, atol=0.0)
+
+        if not np.all(np.isfinite(values)):
+            # fall back to evaluating the policy with Bellman sweeps
+            values = model.values.copy()
+            for _ in range(self.grid.iterations):
+                values = expected_rewards + self.discount * (transitions @ values)
+        return values
+
+    def improve_policy(self, values):
+        """
+        Make the policy greedy with respect to values, ties keep the current
+        action so the iteration can't cycle between equally good policies
+
+        :param values: The values of the current policy
+        :return: True if the policy changed, false otherwise
+        """
+        model = self.model
+        targets = model.rewards + self.discount * values
+        q_table = (1.0 - self.noise) * targets[model.destinations]
+        q_table += (self.noise / 2.0) * targets[model.drift_first]
+        q_table += (self.noise / 2.0) * targets[model.drift_second]
+
+        movable = model.is_movable
+        greedy = q_table.argmax(axis=1)
+        current_q = q_table[np.arange(len(values)), self.policy]
+        keep = current_q >= q_table.max(axis=1)
+        new_policy = np.where(keep, self.policy, greedy)
+        changed = bool(np.any(new_policy[movable] != self.policy[movable]))
+
+        self.policy = new_policy
+        model.values = values
+        model.q_table[movable] = q_table[movable]
+        model.best_actions[movable] = new_policy[movable]
+        model.best_actions[model.is_terminal] = EXIT_INDEX
+        return changed
+
+    def iterate_values(self):
+        """
+        Run through 1 step of policy iteration, evaluating the current policy
+        and improving it
+        """
+        values = self.evaluate_policy()
+        self.policy_stable = not self.improve_policy(values)
+        self.states_stale = True
+        self.curr_iteration += 1
+
+    def has_converged(self):
+        """
+        :return: True if the policy is stable, false otherwise
+        """
+        return self.policy_stable
+
+    def run(self, max_iterations, on_iteration=None):
+        """
+        Run policy iteration until the policy is stable or max_iterations is
+        reached
+
+        :param max_iterations: The iteration count to stop at
+        :param on_iteration: Optional function called with the iteration number
+                             before each step, used to take query snapshots
+        """
+        while self.curr_iteration < max_iterations:
+            if on_iteration:
+                on_iteration(self.curr_iteration)
+            self.iterate_values()
+            if self.has_converged():
+                break
+
+    def sync_states(self):
+        """
+        Copy the values, q values and policy into the grid's states so they
+        can be read by the visualizer and the queries
+        """
+        if self.states_stale:
+            self.model.write_back()
+            self.states_stale = False
+
+    def load_tables(self, values, q_table, best_actions):
+        """
+        Warm start from saved tables (see checkpoint.py), the policy starts
+        as the best action of each cell's q values instead of going north
+
+        :param values: The value of each cell
+        :param q_table: (num_cells, 5) q values, columns are Q_ACTIONS
+        :param best_actions: Column of the best action per cell
+        """
+        self.model.load_tables(values, q_table, best_actions)
+        movable = self.model.is_movable
+        self.policy[movable] = self.model.best_actions[movable]
+        self.policy_stable = False
+        self.states_stale = True
+
+    def snapshot(self, cells=None):
+        """
+        Take a compact snapshot of the values, q values and policy of the
+        current policy for answering queries
+
+        :param cells: Sorted array of the cells to take, None for every cell
+        :return: The AgentSnapshot
+        """
+        return AgentSnapshot.from_model(self, self.model, cells)
+
+    def get_display_index(self):
+        """
+        Getting the index to display in GUI
+        """
+        return self.curr_iteration
@@ -1,13 +1,19 @@
 """
     File name: q_learning_agent.py
     Author: Arsh Khokhar, Kiernan Wiese
-    Date last modified: 15 April, 2021
+    Date last modified: 17 October, 2026
     Python Version: 3.8
 
     This script contains the QLearningAgent class used to run q learning.
 """
 import random
-from grid import Grid, Action
+from grid import Grid, Action, Q_ACTIONS, ACTION_COLUMNS
+from snapshot import AgentSnapshot, restore_tables
+from episode_stats import EpisodeStats
+from exploration import exploration_from_grid, alpha_schedule_from_grid
+from environment import GridEnvironment
+from replay import LEARNING_MODES, DEFAULT_REPLAY_CAPACITY, DEFAULT_BATCH_SIZE, DEFAULT_PLANNING_STEPS, \
+    ReplayBuffer, DynaModel
 
 
 class QLearningAgent:
@@ -17,24 +23,72 @@ class QLearningAgent:
         grid                The grid that the agent will be working with when learning
         discount            The discount value
         noise               The likelihood the robot won't end up where it's going
-        alpha               The discount alpha
+        alpha               The discount alpha, for the current episode
+        exploration         The exploration strategy picking the actions
+        alpha_schedule      Schedule of alpha over the episodes
+        environment         The GridEnvironment the robot moves in, its moves
+                            slip with the grid's noise
+        learning            How the agent learns from its steps (one of LEARNING_MODES)
+        experience          The ReplayBuffer or DynaModel the extra backups are
+                            drawn from, None when learning online
+        backups_per_step    The number of extra backups after each real step
         max_display_val     keeps track of the maximum terminal value for 
                             darker/lighter GUI colors
         curr_episode        The number of the current episode
+        stats               EpisodeStats of the finished episodes
+        episode_steps       The number of steps taken in the current episode
+        episode_return      The rewards received so far in the current episode
+        episode_td_error    The absolute TD errors so far in the current episode
     """
 
-    def __init__(self, input_grid: Grid):
+    def __init__(self, input_grid: Grid, exploration=None, alpha_schedule=None, seed=None,
+                 environment=None, learning='online', backups_per_step=None,
+                 replay_capacity=DEFAULT_REPLAY_CAPACITY):
         """
         Init function for the QLearningAgent class
 
         :param input_grid: The grid that the agent will be working with when learning
+        :param exploration: The exploration strategy (see exploration.py), None
+                            for the one set in the grid's settings
+        :param alpha_schedule: Schedule of alpha, None for the one set in the
+                               grid's settings
+        :param seed: Seed of the environment's random generator, None to draw
+                     one from the random module so random.seed repeats runs
+        :param environment: The GridEnvironment of the grid, None to create one
+        :param learning: How to learn from the steps (one of LEARNING_MODES)
+        :param backups_per_step: The number of replayed transitions or planning
+                                 backups after each real step, None for
+                                 DEFAULT_BATCH_SIZE or DEFAULT_PLANNING_STEPS
+        :param replay_capacity: The most transitions the replay buffer holds
         """
+        if learning not in LEARNING_MODES:
+            raise ValueError("Unknown learning mode '{}', expected one of {}".format(
+                learning, LEARNING_MODES))
         self.grid = input_grid
         self.discount = input_grid.discount
         self.noise = input_grid.noise
-        self.alpha = input_grid.alpha
+        self.exploration = exploration or exploration_from_grid(input_grid)
+        self.alpha_schedule = alpha_schedule or alpha_schedule_from_grid(input_grid)
+        self.alpha = self.alpha_schedule.value(0)
+        if environment is None:
+            environment = GridEnvironment(
+                input_grid, seed=random.getrandbits(32) if seed is None else seed)
+        self.environment = environment
+        self.learning = learning
+        self.experience = None
+        self.backups_per_step = 0
+        if learning == 'replay':
+            self.experience = ReplayBuffer(replay_capacity, random.getrandbits(32))
+            self.backups_per_step = DEFAULT_BATCH_SIZE if backups_per_step is None else backups_per_step
+        elif learning == 'dyna_q':
+            self.experience = DynaModel(input_grid.num_rows * input_grid.num_cols, random.getrandbits(32))
+            self.backups_per_step = DEFAULT_PLANNING_STEPS if backups_per_step is None else backups_per_step
         self.max_display_val = self.grid.max_terminal_val
         self.curr_episode = 0
+        self.stats = EpisodeStats()
+        self.episode_steps = 0
+        self.episode_return = 0.0
+        self.episode_td_error = 0.0
 
     def find_max_q_value(self, row, col):
         """
@@ -100,46 +154,164 @@ class QLearningAgent:
         """
         state = self.grid.states[row][col]
         possible_states = self.grid.find_possible_states(row, col)
-        exploration_action = random.choice(list(possible_states.keys()))
-        exploration_state = possible_states[exploration_action]
+        action = self.exploration.choose(row, col, state.q_values, possible_states)
+        return action, possible_states[action]
 
-        if random.random() < self.noise:
-            # returning exploration poilcy based on noise
-            return exploration_action, exploration_state
+    def backup_experience(self, alpha):
+        """
+        Update the q values with transitions drawn from the experience, the
+        replayed transitions or the planning backups of Dyna-Q
 
-        max_q_value = float('-inf')
-        best_actions = []
-        for action, value in state.q_values.items():
-            if value > max_q_value:
-                best_actions = [action]
-                max_q_value = value
-            elif value == max_q_value:
-                best_actions.append(action)
+        :param alpha: The alpha to update with
+        """
+        states = self.grid.states
+        num_cols = self.grid.num_cols
+        discount = self.discount
+        for cell, column, reward, next_cell, exited in zip(
+                *(values.tolist() for values in self.experience.sample(self.backups_per_step))):
+            row, col = divmod(cell, num_cols)
+            q_values = states[row][col].q_values
+            if exited:
+                sample = reward
+            else:
+                next_row, next_col = divmod(next_cell, num_cols)
+                sample = reward + discount * max(states[next_row][next_col].q_values.values())
+            action = Q_ACTIONS[column]
+            q_values[action] = (1-alpha) * q_values[action] + alpha*sample
 
-        # Out of all the best actions, choosing one randomly
-        best_random_action = random.choice(best_actions)
-        dest_state = possible_states[best_random_action]
+    def q_learn(self):
+        """
+        Run 1 step of q learning
+        """
+        self.run_steps(1)
 
-        return best_random_action, dest_state
+    def run_steps(self, num_steps=None, on_episode=None, max_episode_steps=None,
+                  num_episodes=None):
+        """
+        Run steps of q learning. The actions are picked by the exploration
+        and carried out in the environment, so moves can slip. Unless learning
+        online, every step is also added to the experience and followed by
+        backups_per_step backups drawn from it
 
-    def q_learn(self):
+        :param num_steps: The number of steps to run, None for no limit
+        :param on_episode: Optional function called with the episode number
+                           right before the step that finishes the episode,
+                           and once at the end of the run, so it sees the last
+                           values of every episode number. Used to take query
+                           snapshots
+        :param max_episode_steps: Cut episodes off after this many steps and
+                                  start a new one, None to never cut them off
+        :param num_episodes: Stop once this many more episodes are finished,
+                             None for no limit
+        :return: The number of steps run
         """
-        Call various other functions to run through 1 episode of q learning
-        """
-        best_action, next_state = self.get_policy(
-            self.grid.robot_curr_location[0], self.grid.robot_curr_location[1])
-        # update q values based on the policy
-        self.update(self.grid.robot_curr_location[0], self.grid.robot_curr_location[1],
-                    best_action, next_state.row, next_state.col)
-        # update the robot location
-        self.grid.robot_curr_location[0] = next_state.row
-        self.grid.robot_curr_location[1] = next_state.col
-        if best_action == Action.exit_game:
-            # if reached terminal, reset robot location, exit the grid
-            # and mark the episode as done
-            self.grid.robot_curr_location = self.grid.robot_start_location[:]
-            self.curr_episode += 1
-            return
+        states = self.grid.states
+        find_possible_states = self.grid.find_possible_states
+        choose = self.exploration.choose
+        environment = self.environment
+        step = environment.step
+        discount = self.discount
+        record = self.stats.record
+        experience = self.experience if self.backups_per_step else None
+        num_cols = self.grid.num_cols
+        environment.refresh()
+        # the robot can have been moved by hand since the last run
+        row, col = environment.location = tuple(self.grid.robot_curr_location)
+        # the current episode's statistics are kept in locals while running
+        episode_steps, episode_return, episode_td_error = \
+            self.episode_steps, self.episode_return, self.episode_td_error
+        max_steps = float('inf') if num_steps is None else num_steps
+        # finishing this many episodes ends the run
+        episodes_left = float('inf') if num_episodes is None else num_episodes
+        cutoff = float('inf') if max_episode_steps is None else max_episode_steps
+        steps = 0
+        self.exploration.start_episode(self.curr_episode)
+        alpha = self.alpha = self.alpha_schedule.value(self.curr_episode)
+
+        while steps < max_steps and episodes_left > 0:
+            q_values = states[row][col].q_values
+            possible_states = find_possible_states(row, col)
+            action = choose(row, col, q_values, possible_states)
+            (dest_row, dest_col), reward, is_exit = step(action)
+
+            if is_exit:
+                if on_episode:
+                    on_episode(self.curr_episode)
+                sample = reward
+            else:
+                sample = reward + discount * max(states[dest_row][dest_col].q_values.values())
+            q_value = q_values[action]
+            q_values[action] = (1-alpha) * q_value + alpha*sample
+            if experience is not None:
+                experience.add(row * num_cols + col, ACTION_COLUMNS[action], reward,
+                               dest_row * num_cols + dest_col, is_exit)
+                self.backup_experience(alpha)
+
+            steps += 1
+            episode_steps += 1
+            episode_return += reward
+            episode_td_error += abs(sample - q_value)
+            if is_exit or episode_steps >= cutoff:
+                if not is_exit and on_episode:
+                    on_episode(self.curr_episode)
+                # back to the start for the next episode
+                record(episode_steps, episode_return, episode_td_error, not is_exit)
+                episode_steps, episode_return, episode_td_error = 0, 0.0, 0.0
+                row, col = environment.reset()
+                self.curr_episode += 1
+                episodes_left -= 1
+                self.exploration.start_episode(self.curr_episode)
+                alpha = self.alpha = self.alpha_schedule.value(self.curr_episode)
+            else:
+                row, col = dest_row, dest_col
+
+        self.grid.robot_curr_location = [row, col]
+        self.episode_steps, self.episode_return, self.episode_td_error = \
+            episode_steps, episode_return, episode_td_error
+        if on_episode:
+            on_episode(self.curr_episode)
+        return steps
+
+    def run_episodes(self, num_episodes, on_episode=None, max_episode_steps=None):
+        """
+        Run q learning until num_episodes more episodes are finished
+
+        :param num_episodes: The number of episodes to run
+        :param on_episode: Optional function called with the episode number,
+                           see run_steps
+        :param max_episode_steps: Cut episodes off after this many steps, see
+                                  run_steps
+        :return: The number of steps run
+        """
+        return self.run_steps(None, on_episode, max_episode_steps, num_episodes)
+
+    def sync_states(self):
+        """
+        Nothing to copy, the q values are kept in the grid's states
+        """
+
+    def load_tables(self, values, q_table, best_actions):
+        """
+        Warm start from saved tables (see checkpoint.py), learning continues
+        from them instead of from zero. Q values the tables don't have (NaN)
+        are left as they are
+
+        :param values: The value of each cell
+        :param q_table: (num_cells, 5) q values, columns are Q_ACTIONS
+        :param best_actions: Column of the best action per cell
+        """
+        restore_tables(self.grid, values, q_table, best_actions)
+
+    def snapshot(self, cells=None):
+        """
+        Take a compact snapshot of the current q values for answering
+        queries; the values and policy are derived from the q values in the
+        grid's states
+
+        :param cells: Sorted array of the cells to take, None for every cell
+        :return: The AgentSnapshot
+        """
+        return AgentSnapshot.from_states(self, False, cells)
 
     def get_display_index(self):
         """
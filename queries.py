@@ -0,0 +1,146 @@
+"""
+    File name: queries.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the functions used to load the queries in results.txt
+    and answer them from an agent, without importing pygame.
+"""
+import numpy as np
+from value_iteration_agent import ValueIterationAgent
+from policy_iteration_agent import PolicyIterationAgent
+from snapshot import AgentSnapshot
+
+# queries that can be asked about a cell: its value, best action, best q
+# value and the q value of each of its actions, and about the whole grid:
+# the value and the best action of every cell
+QUERIES = ['stateValue', 'bestPolicy', 'bestQValue', 'qValues', 'valueMap', 'policyMap']
+
+# queries about every cell, the row and column they are asked with are ignored
+MAP_QUERIES = ['valueMap', 'policyMap']
+
+
+def load_results(filename: str):
+    """
+    Load the results file
+
+    :param filename: The name of the results file to load (results.txt)
+    :return: Two dictionaries containing representations of the queries the
+             input file, in increasing order of the iteration/episode
+    """
+    mdp_results = {}
+    rl_results = {}
+    with open(filename, 'r') as fp:
+        lines = fp.readlines()
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        row, col, number, learning_type, query = line.strip().split(',')
+        row, col, number = int(row), int(col), int(number)
+        if query not in QUERIES:
+            raise ValueError("Unknown query '{}' on line {} of {}, expected one of {}".format(
+                query, line_number, filename, QUERIES))
+        new_elem_dict = {"row": row, "col": col, "query": query}
+        if learning_type.lower() == 'mdp':
+            if number in mdp_results:
+                mdp_results[number].append(new_elem_dict)
+            else:
+                mdp_results[number] = [new_elem_dict]
+        elif learning_type.lower() == 'rl':
+            if number in rl_results:
+                rl_results[number].append(new_elem_dict)
+            else:
+                rl_results[number] = [new_elem_dict]
+
+    return dict(sorted(mdp_results.items())), dict(sorted(rl_results.items()))
+
+
+def query_cells(queries, num_cols):
+    """
+    Find the cells the queries about each iteration/episode are about, the
+    only ones a snapshot needs to answer them
+
+    :param queries: Dictionary of the queries for each iteration/episode
+    :param num_cols: The number of columns of the grid
+    :return: Dictionary of the sorted array of cells for each
+             iteration/episode, None for the ones with queries about every cell
+    """
+    cells = {}
+    for number, number_queries in queries.items():
+        if any(query_data['query'] in MAP_QUERIES for query_data in number_queries):
+            cells[number] = None
+            continue
+        cells[number] = np.unique(np.array(
+            [query_data['row'] * num_cols + query_data['col'] for query_data in number_queries],
+            dtype=np.intp))
+    return cells
+
+
+def is_value_agent(agent):
+    """
+    :param agent: The learning agent
+    :return: True for agents that keep state values (value and policy
+             iteration) and their snapshots, false for q learning agents
+    """
+    if isinstance(agent, AgentSnapshot):
+        return agent.is_value_agent
+    return type(agent) in (ValueIterationAgent, PolicyIterationAgent)
+
+
+def answer_query(agent, row, col, query):
+    """
+    Answer a query about a cell from the agent's current values
+
+    :param agent: The learning agent with its states synced (see
+                  sync_states), or a snapshot
+    :param row: The row of the cell
+    :param col: The column of the cell
+    :param query: The query to answer (one of QUERIES)
+    :return: The value of the cell for stateValue and bestQValue, the best
+             action (or None) for bestPolicy, a dictionary of the q value of
+             each of the cell's actions for qValues, and for valueMap and
+             policyMap a list of rows of the value or best action of every
+             cell, None for boulders
+    """
+    if query not in QUERIES:
+        raise ValueError("Unknown query '{}', expected one of {}".format(
+            query, QUERIES))
+    if query in MAP_QUERIES:
+        answers = [[None] * agent.grid.num_cols for _ in range(agent.grid.num_rows)]
+        for i, grid_row in enumerate(agent.grid.states):
+            for j, state in enumerate(grid_row):
+                if not state.is_boulder:
+                    answers[i][j] = answer_query(
+                        agent, i, j, 'bestPolicy' if query == 'policyMap' else 'stateValue')
+        return answers
+    if query == 'qValues':
+        if isinstance(agent, AgentSnapshot):
+            return agent.find_q_values(row, col)
+        # every agent keeps its q values in the grid's states once synced
+        return dict(agent.grid.states[row][col].q_values)
+    if type(agent) in (ValueIterationAgent, PolicyIterationAgent):
+        state = agent.grid.states[row][col]
+        # the value of a state is its best q value
+        return state.best_action if query == 'bestPolicy' else state.max_q_value
+    # q learning agents and snapshots find the best of a cell's q values
+    max_q_value, best_action = agent.find_max_q_value(row, col)
+    return best_action if query == 'bestPolicy' else max_q_value
+
+
+def format_answer(query, answer):
+    """
+    Turn an answer into values that can be written as JSON or CSV
+
+    :param query: The query (one of QUERIES)
+    :param answer: The answer returned by answer_query
+    :return: Action names instead of actions and plain lists and dictionaries
+    """
+    if query == 'bestPolicy':
+        return answer.name if answer else None
+    if query == 'qValues':
+        return {action.name: q_value for action, q_value in answer.items()}
+    if query == 'policyMap':
+        return [[action.name if action else None for action in row] for row in answer]
+    return answer
@@ -0,0 +1,287 @@
+"""
+    File name: renderer.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script renders the values or q values of an agent at chosen
+    iterations/episodes to a PNG image sequence or a video without opening any
+    windows. Every frame is written out as soon as it is drawn, so runs of
+    thousands of iterations take no more memory than a single frame.
+"""
+import os
+# pygame draws into memory instead of a window, this has to be set before
+# pygame is imported
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from grid import Grid, STORAGES
+from value_iteration_agent import ValueIterationAgent, ENGINES, SCHEDULES
+from policy_iteration_agent import PolicyIterationAgent
+from q_learning_agent import QLearningAgent
+from vectorized_q_learning_agent import VectorizedQLearningAgent
+from visualizer import Visualizer
+import argparse
+import pygame
+import random
+import shutil
+import subprocess
+
+# outputs with these extensions are encoded by ffmpeg, any other output is a
+# directory of PNG images
+VIDEO_EXTENSIONS = ['.mp4', '.mkv', '.webm', '.avi', '.gif']
+
+# what the frames show, MDP agents can show either
+MODES = ['values', 'q_values']
+
+
+class PngSequenceWriter:
+    """
+    Representation of a PngSequenceWriter, writes the frames as numbered PNG
+    images into a directory
+    Attributes
+        directory           The directory the images are written to
+        num_frames          The number of frames written so far
+    """
+
+    def __init__(self, directory):
+        """
+        Init function for the PngSequenceWriter class
+
+        :param directory: The directory to write the images to, created if
+                          it doesn't exist
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.num_frames = 0
+
+    def write(self, surface):
+        """
+        Write a frame
+
+        :param surface: The pygame surface to write
+        """
+        pygame.image.save(surface, os.path.join(
+            self.directory, 'frame_{:06d}.png'.format(self.num_frames)))
+        self.num_frames += 1
+
+    def close(self):
+        """
+        Nothing to finish, every image is complete once written
+        """
+
+
+class VideoWriter:
+    """
+    Representation of a VideoWriter, streams the frames to an ffmpeg process
+    that encodes them into a video or an animated GIF
+    Attributes
+        filename            The file the video is written to
+        process             The ffmpeg process
+        num_frames          The number of frames written so far
+    """
+
+    def __init__(self, filename, size, fps):
+        """
+        Init function for the VideoWriter class
+
+        :param filename: The file to write the video to, ffmpeg picks the
+                         format from its extension
+        :param size: (width, height) of the frames
+        :param fps: The frames per second of the video
+        """
+        ffmpeg = shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg is needed to write '{}', give a directory to write a PNG "
+                               "sequence instead".format(filename))
+        command = [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                   '-s', '{}x{}'.format(*size), '-r', str(fps), '-i', '-']
+        if not filename.endswith('.gif'):
+            # most players only play yuv420p, which needs even dimensions
+            command += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p']
+        command.append(filename)
+        self.filename = filename
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        self.num_frames = 0
+
+    def write(self, surface):
+        """
+        Write a frame
+
+        :param surface: The pygame surface to write
+        """
+        # tobytes is called tostring before pygame 2.1.3
+        to_bytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+        self.process.stdin.write(to_bytes(surface, 'RGB'))
+        self.num_frames += 1
+
+    def close(self):
+        """
+        Finish the video, waiting for ffmpeg to encode the last frames
+        """
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError("ffmpeg failed to write '{}'".format(self.filename))
+
+
+def parse_frames(text: str):
+    """
+    Parse the iterations/episodes to render
+
+    :param text: Either a comma separated list ('0,10,100') or an inclusive
+                 range written as start:stop:step ('0:1000:10')
+    :return: The sorted list of iterations/episodes
+    """
+    try:
+        if ':' in text:
+            start, stop, step = (int(value) for value in text.split(':'))
+            if step <= 0 or stop < start:
+                raise ValueError
+            return list(range(start, stop + 1, step))
+        return sorted(set(int(value) for value in text.split(',')))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Invalid frames '{}', expected a list (0,10,100) or start:stop:step with "
+            "start <= stop and step > 0".format(text))
+
+
+def render_mdp(agent, frames, visualizer, to_draw_ptr, writer):
+    """
+    Run value or policy iteration and render the frames. Frames past the
+    point where the agent converged show the converged values
+
+    :param agent: The value or policy iteration agent
+    :param frames: The sorted iterations to render
+    :param visualizer: The Visualizer drawing the agent
+    :param to_draw_ptr: visualizer.draw_values or visualizer.draw_q_values
+    :param writer: The PngSequenceWriter or VideoWriter
+    """
+    wanted = set(frames)
+
+    def render_frame(iteration):
+        if iteration in wanted:
+            visualizer.draw_frame(to_draw_ptr)
+            writer.write(visualizer.background)
+
+    agent.run(frames[-1], render_frame)
+    visualizer.draw_frame(to_draw_ptr)
+    for iteration in frames:
+        if iteration >= agent.curr_iteration:
+            writer.write(visualizer.background)
+
+
+def render_rl(agent, frames, visualizer, writer):
+    """
+    Run q learning and render each frame as soon as its episode is reached
+
+    :param agent: The q learning agent
+    :param frames: The sorted episodes to render
+    :param visualizer: The Visualizer drawing the agent
+    :param writer: The PngSequenceWriter or VideoWriter
+    """
+    next_frame = 0
+    while next_frame < len(frames):
+        if frames[next_frame] <= agent.curr_episode:
+            visualizer.draw_frame(visualizer.draw_q_values)
+            # several robots can finish an episode in the same step
+            while next_frame < len(frames) and frames[next_frame] <= agent.curr_episode:
+                writer.write(visualizer.background)
+                next_frame += 1
+            continue
+        agent.q_learn()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render the learning progress of an agent to PNG images or a video')
+
+    parser.add_argument('output', help='Directory to write the PNG images to, or a video file '
+                                       'ending with one of {}, written with ffmpeg'.format(
+                                           ', '.join(VIDEO_EXTENSIONS)), type=str)
+
+    parser.add_argument(
+        '--type', help='Agent to render (default: mdp)', choices=['mdp', 'rl'], default='mdp')
+
+    parser.add_argument(
+        '--frames', help='Iterations/episodes to render, a list (0,10,100) or a range (0:1000:10), '
+                         'defaults to every iteration/episode in the grid file', type=parse_frames)
+
+    parser.add_argument(
+        '--mode', help='What the MDP frames show (default: values), RL frames always show q values',
+        choices=MODES, default='values')
+
+    parser.add_argument(
+        '--grid', help='Grid file to load (default: gridConf.txt)', type=str, default='gridConf.txt')
+
+    parser.add_argument(
+        '--size', help='Width and height of the grid in pixels (default: 800 600)', type=int,
+        nargs=2, default=[800, 600])
+
+    parser.add_argument(
+        '--fps', help='Frames per second of videos (default: 30)', type=int, default=30)
+
+    parser.add_argument(
+        '--engine', help='Engine to run value iteration with (default: reference)',
+        choices=ENGINES, default='reference')
+
+    parser.add_argument(
+        '--tolerance', help='Stop value iteration once the values are provably within TOLERANCE of the optimal values',
+        type=float)
+
+    parser.add_argument(
+        '--schedule', help='Order to back up the states in during value iteration (default: synchronous)',
+        choices=SCHEDULES, default='synchronous')
+
+    parser.add_argument('--policy_iteration',
+                        help='Use policy iteration instead of value iteration for the MDP', default=False,
+                        action="store_true")
+
+    parser.add_argument(
+        '--robots', help='Run Q-learning with ROBOTS robots at once on an array backed Q-table', type=int)
+
+    parser.add_argument(
+        '--seed', help='Seed for the random generators of Q-learning and its environment', type=int)
+
+    parser.add_argument(
+        '--storage', help='How the grid stores its states (default: objects)',
+        choices=STORAGES, default='objects')
+
+    args = parser.parse_args()
+
+    grid = Grid(args.grid, args.storage)
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.type == 'mdp':
+        if args.policy_iteration:
+            agent = PolicyIterationAgent(grid)
+        else:
+            agent = ValueIterationAgent(grid, args.engine, args.tolerance, args.schedule)
+        frames = args.frames or list(range(grid.iterations + 1))
+    else:
+        if args.robots:
+            agent = VectorizedQLearningAgent(grid, args.robots, args.seed)
+        else:
+            agent = QLearningAgent(grid)
+        frames = args.frames or list(range(grid.episodes + 1))
+
+    pygame.init()
+    visualizer = Visualizer(agent, size=args.size)
+    if os.path.splitext(args.output)[1] in VIDEO_EXTENSIONS:
+        writer = VideoWriter(args.output, visualizer.background.get_size(), args.fps)
+    else:
+        writer = PngSequenceWriter(args.output)
+
+    try:
+        if args.type == 'mdp':
+            to_draw_ptr = visualizer.draw_values if args.mode == 'values' else visualizer.draw_q_values
+            render_mdp(agent, frames, visualizer, to_draw_ptr, writer)
+        else:
+            render_rl(agent, frames, visualizer, writer)
+    finally:
+        writer.close()
+        pygame.quit()
+
+    print("Rendered {} frames to {}".format(writer.num_frames, args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+    File name: replay.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the ReplayBuffer and DynaModel classes q learning
+    uses to learn from each real step more than once: the ReplayBuffer keeps
+    the most recent transitions, the DynaModel a tabular model of the
+    outcome of every state and action seen so far.
+"""
+import numpy as np
+from grid import Q_ACTIONS, EXIT_INDEX
+
+# 'online' learns from each step once, 'replay' also learns from a minibatch
+# of recent transitions every step and 'dyna_q' from planning backups
+# simulated with the learned model
+LEARNING_MODES = ['online', 'replay', 'dyna_q']
+
+# transitions the replay buffer holds by default
+DEFAULT_REPLAY_CAPACITY = 10000
+
+# replayed transitions or planning backups per real step
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_PLANNING_STEPS = 10
+
+
+class ReplayBuffer:
+    """
+    Representation of a ReplayBuffer, a ring buffer of the most recent
+    transitions in preallocated arrays. Once full, every new transition
+    overwrites the oldest one. Cells are indexed by row * num_cols + col
+    Attributes
+        capacity            The most transitions the buffer holds
+        size                The number of transitions held
+        position            The index the next transition is written to
+        cells               The cell each transition started in
+        columns             The column in Q_ACTIONS of each transition's action
+        rewards             The reward of each transition
+        next_cells          The cell each transition ended up in
+        exited              True for the transitions that exited the game
+        rng                 numpy random generator used for sampling
+    """
+
+    def __init__(self, capacity=DEFAULT_REPLAY_CAPACITY, seed=None):
+        """
+        Init function for the ReplayBuffer class
+
+        :param capacity: The most transitions to hold
+        :param seed: Seed of the random generator, None for a random seed
+        """
+        if capacity <= 0:
+            raise ValueError("The replay capacity has to be positive, got {}".format(capacity))
+        self.capacity = capacity
+        self.size = 0
+        self.position = 0
+        self.cells = np.zeros(capacity, dtype=np.intp)
+        self.columns = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity)
+        self.next_cells = np.zeros(capacity, dtype=np.intp)
+        self.exited = np.zeros(capacity, dtype=bool)
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, cell, column, reward, next_cell, exited):
+        """
+        Store a transition
+
+        :param cell: The cell it started in
+        :param column: The column in Q_ACTIONS of its action
+        :param reward: The reward received
+        :param next_cell: The cell it ended up in
+        :param exited: True if it exited the game
+        """
+        position = self.position
+        self.cells[position] = cell
+        self.columns[position] = column
+        self.rewards[position] = reward
+        self.next_cells[position] = next_cell
+        self.exited[position] = exited
+        self.position = (position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Draw transitions uniformly at random, with replacement
+
+        :param batch_size: The number of transitions to draw
+        :return: Arrays of the cells, action columns, rewards, next cells and
+                 exited flags of the transitions
+        """
+        indexes = self.rng.integers(0, self.size, batch_size)
+        return (self.cells[indexes], self.columns[indexes], self.rewards[indexes],
+                self.next_cells[indexes], self.exited[indexes])
+
+    def clear(self):
+        """
+        Forget every transition, after the grid changed
+        """
+        self.size = 0
+        self.position = 0
+
+
+class DynaModel:
+    """
+    Representation of a DynaModel, the tabular model Dyna-Q plans with. It
+    keeps the last outcome of every state and action seen so far and samples
+    the pairs uniformly, so on noisy grids the planning backups use the
+    latest slip of each pair rather than the slip probabilities. Cells are
+    indexed by row * num_cols + col
+    Attributes
+        rewards             (num_cells, 5) last reward of each pair, columns
+                            are Q_ACTIONS
+        next_cells          (num_cells, 5) last cell each pair ended up in
+        is_seen             (num_cells, 5) True for the pairs seen so far
+        pairs               The flat index of each pair seen so far, in the
+                            order they were first seen
+        size                The number of pairs seen so far
+        rng                 numpy random generator used for sampling
+    """
+
+    def __init__(self, num_cells, seed=None):
+        """
+        Init function for the DynaModel class
+
+        :param num_cells: The number of cells of the grid
+        :param seed: Seed of the random generator, None for a random seed
+        """
+        self.rewards = np.zeros((num_cells, len(Q_ACTIONS)))
+        self.next_cells = np.zeros((num_cells, len(Q_ACTIONS)), dtype=np.intp)
+        self.is_seen = np.zeros((num_cells, len(Q_ACTIONS)), dtype=bool)
+        self.pairs = np.zeros(num_cells * len(Q_ACTIONS), dtype=np.intp)
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, cell, column, reward, next_cell, exited):
+        """
+        Update the model with an observed transition
+
+        :param cell: The cell it started in
+        :param column: The column in Q_ACTIONS of its action
+        :param reward: The reward received
+        :param next_cell: The cell it ended up in
+        :param exited: True if it exited the game, which only the exit
+                       action does
+        """
+        if not self.is_seen[cell, column]:
+            self.is_seen[cell, column] = True
+            self.pairs[self.size] = cell * len(Q_ACTIONS) + column
+            self.size += 1
+        self.rewards[cell, column] = reward
+        self.next_cells[cell, column] = next_cell
+
+    def sample(self, batch_size):
+        """
+        Simulate transitions of pairs seen so far, drawn uniformly at random
+        with replacement
+
+        :param batch_size: The number of transitions to simulate
+        :return: Arrays of the cells, action columns, rewards, next cells and
+                 exited flags of the transitions
+        """
+        pairs = self.pairs[self.rng.integers(0, self.size, batch_size)]
+        cells, columns = np.divmod(pairs, len(Q_ACTIONS))
+        return (cells, columns, self.rewards.flat[pairs], self.next_cells.flat[pairs],
+                columns == EXIT_INDEX)
+
+    def clear(self):
+        """
+        Forget every transition, after the grid changed
+        """
+        self.is_seen[:] = False
+        self.size = 0
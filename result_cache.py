@@ -0,0 +1,252 @@
+"""
+    File name: result_cache.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the ResultCache class, a store on local disk of the
+    query snapshots of finished runs. Runs are looked up by a hash of the
+    grid's content and the agent's parameters, so running the same grid with
+    the same settings again reads the results instead of recomputing them.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+import zlib
+import numpy as np
+from snapshot import AgentSnapshot
+from exploration import EXPLORATION_SETTINGS
+
+# version of the cache format, part of every key so old entries are never read
+CACHE_VERSION = 1
+
+# most bytes the cache takes by default before the least recently used runs
+# are evicted
+DEFAULT_CACHE_SIZE = 512 * 2 ** 20
+
+# grid settings that are part of the key, besides its cells
+GRID_SETTINGS = ['num_rows', 'num_cols', 'robot_start_location', 'iterations', 'episodes',
+                 'discount', 'noise', 'alpha', 'transition_cost'] + EXPLORATION_SETTINGS
+
+
+def grid_arrays(grid):
+    """
+    :param grid: The Grid
+    :return: Arrays of the reward, terminal reward, terminal flag and boulder
+             flag of each cell
+    """
+    if grid.storage == 'arrays':
+        return (grid.cell_rewards, grid.cell_terminal_rewards, grid.cell_is_terminal,
+                grid.cell_is_boulder)
+    states = [state for row in grid.states for state in row]
+    return (np.array([state.reward for state in states], dtype=float),
+            np.array([state.terminal_reward for state in states], dtype=float),
+            np.array([state.is_terminal for state in states], dtype=bool),
+            grid.boulder_mask())
+
+
+def cache_key(grid, parameters):
+    """
+    Hash the content of a grid and the parameters of a run. Grids with the
+    same cells and settings have the same key however they were loaded or
+    edited, whatever the order of their terminals and boulders
+
+    :param grid: The Grid the run is on
+    :param parameters: Dictionary of the agent's parameters, values that can
+                       be written as JSON
+    :return: The key, a hexadecimal string
+    """
+    digest = hashlib.sha256()
+    settings = {name: getattr(grid, name) for name in GRID_SETTINGS}
+    digest.update(json.dumps([CACHE_VERSION, settings, parameters], sort_keys=True).encode())
+    for array in grid_arrays(grid):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+class CachedRun:
+    """
+    Representation of a CachedRun, the results of one run read from the cache
+    Attributes
+        snapshots           Dictionary of the AgentSnapshot of each queried
+                            iteration/episode
+        final               The AgentSnapshot at the end of the run
+        converged           True if the run stopped early because the values
+                            converged, so the final snapshot also answers
+                            every later iteration
+        message             The summary printed at the end of the run
+    """
+
+    def __init__(self, snapshots, final, converged, message):
+        """
+        Init function for the CachedRun class
+
+        :param snapshots: Dictionary of the AgentSnapshot of each iteration/episode
+        :param final: The AgentSnapshot at the end of the run
+        :param converged: True if the values converged
+        :param message: The summary of the run
+        """
+        self.snapshots = snapshots
+        self.final = final
+        self.converged = converged
+        self.message = message
+
+    def answers(self, cells):
+        """
+        Find the snapshots that answer queries about some iterations/episodes
+
+        :param cells: Dictionary of the sorted array of the cells needed at
+                      each iteration/episode, None for every cell
+        :return: Dictionary of the AgentSnapshot of each, None if the run
+                 didn't keep a snapshot of one of them with those cells
+        """
+        snapshots = {}
+        for number, needed in cells.items():
+            snapshot = self.snapshots.get(number)
+            if snapshot is not None and (snapshot.cells is None or (
+                    needed is not None and np.isin(needed, snapshot.cells).all())):
+                snapshots[number] = snapshot
+            elif self.converged and number >= self.final.display_index:
+                snapshots[number] = self.final
+            else:
+                return None
+        return snapshots
+
+
+class ResultCache:
+    """
+    Representation of a ResultCache. Every run is one .npz file named after
+    its key, holding its snapshots and summary. Reading a run marks it as
+    used, and once the files take more than max_bytes the least recently
+    used ones are deleted
+    Attributes
+        directory           The directory the runs are stored in
+        max_bytes           The most bytes the runs take
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_SIZE):
+        """
+        Init function for the ResultCache class
+
+        :param directory: The directory to store the runs in, created if needed
+        :param max_bytes: The most bytes the runs take
+        """
+        if max_bytes <= 0:
+            raise ValueError("The cache size has to be positive, got {}".format(max_bytes))
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """
+        :param key: The key of a run, returned by cache_key
+        :return: The file the run is stored in
+        """
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self, key, agent):
+        """
+        Read a run from the cache
+
+        :param key: The key of the run
+        :param agent: An agent on the run's grid, the snapshots are attached
+                      to its grid
+        :return: The CachedRun, None if the run isn't cached
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data['meta']))
+                snapshots = {}
+                for number in meta['numbers'] + ['final']:
+                    cells = 'cells_{}'.format(number)
+                    snapshot = AgentSnapshot(agent, meta['is_value_agent'],
+                                             data['values_{}'.format(number)],
+                                             data['q_table_{}'.format(number)],
+                                             data['best_actions_{}'.format(number)],
+                                             data[cells] if cells in data.files else None)
+                    snapshot.display_index = meta['final_index'] if number == 'final' else number
+                    snapshots[number] = snapshot
+        except (OSError, KeyError, ValueError):
+            # missing, evicted while reading or written by another version
+            return None
+        except (zipfile.BadZipFile, zlib.error, EOFError):
+            # truncated or corrupt, the run is computed and stored again
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            # the modification time marks when the run was last used
+            os.utime(path)
+        except OSError:
+            pass
+        final = snapshots.pop('final')
+        return CachedRun(snapshots, final, meta['converged'], meta['message'])
+
+    def store(self, key, new_snapshots, final, converged, message, previous=None):
+        """
+        Write a run to the cache, replacing any run with the same key
+
+        :param key: The key of the run
+        :param new_snapshots: Dictionary of the AgentSnapshot of each iteration/episode
+        :param final: The AgentSnapshot at the end of the run
+        :param converged: True if the values converged
+        :param message: The summary of the run
+        :param previous: The CachedRun read for the same key, its snapshots
+                         are kept along with the new ones
+        """
+        snapshots = new_snapshots
+        if previous is not None:
+            snapshots = dict(previous.snapshots)
+            snapshots.update(new_snapshots)
+        snapshots = {number: snapshot for number, snapshot in snapshots.items()
+                     if snapshot is not final}
+        meta = {'numbers': sorted(snapshots), 'is_value_agent': final.is_value_agent,
+                'final_index': final.display_index, 'converged': converged, 'message': message}
+        arrays = {}
+        for number, snapshot in list(snapshots.items()) + [('final', final)]:
+            arrays['values_{}'.format(number)] = snapshot.values
+            arrays['q_table_{}'.format(number)] = snapshot.q_table
+            arrays['best_actions_{}'.format(number)] = snapshot.best_actions
+            if snapshot.cells is not None:
+                arrays['cells_{}'.format(number)] = snapshot.cells
+
+        # written to a temporary file first so runs reading the cache at the
+        # same time never see half a file
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            np.savez_compressed(fp, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(temporary, self.path(key))
+        self.evict(key)
+
+    def evict(self, keep=None):
+        """
+        Delete the least recently used runs until the cache fits in max_bytes
+
+        :param keep: The key of a run that is never deleted
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == self.path(keep):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
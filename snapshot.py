@@ -0,0 +1,228 @@
+"""
+    File name: snapshot.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the AgentSnapshot class, a compact copy of an agent's
+    values, q values and policy used to answer queries about past
+    iterations/episodes without copying the whole agent.
+"""
+import numpy as np
+from grid import Q_ACTIONS, ACTION_COLUMNS, EXIT_INDEX, NO_ACTION
+
+
+class AgentSnapshot:
+    """
+    Representation of an AgentSnapshot. It can stand in for the agent it was
+    taken from in the Visualizer and the query functions. The grid is shared
+    with the agent rather than copied, restoring the snapshot writes its
+    values into that grid's states. Cells are indexed by row * num_cols + col.
+    A snapshot can hold only some cells, enough to answer the queries about
+    them, its arrays then have one entry per cell in cells.
+    Attributes
+        grid                The grid of the agent the snapshot was taken from
+        is_value_agent      True if the snapshot is of a value or policy
+                            iteration agent, false for q learning agents
+        display_index       The iteration/episode the snapshot was taken at
+        max_display_val     keeps track of the maximum terminal value for
+                            darker/lighter GUI colors
+        values              The value (max q value) of each cell
+        q_table             (num_cells, 5) q values, columns are Q_ACTIONS and
+                            actions a cell can't take are NaN
+        best_actions        Column of the best action per cell, NO_ACTION if
+                            there is none
+        cells               Sorted array of the cells the snapshot holds, None
+                            if it holds every cell
+        positions           Dictionary of the position of each cell in the
+                            arrays, None if the snapshot holds every cell
+    """
+
+    def __init__(self, agent, is_value_agent, values, q_table, best_actions, cells=None):
+        """
+        Init function for the AgentSnapshot class, the arrays are stored as
+        they are so they must not be shared with the agent
+
+        :param agent: The agent the snapshot is taken from
+        :param is_value_agent: True for value or policy iteration agents
+        :param values: The value of each cell
+        :param q_table: (num_cells, 5) q values of each cell
+        :param best_actions: Column of the best action per cell
+        :param cells: Sorted array of the cells the arrays hold, None for every cell
+        """
+        self.grid = agent.grid
+        self.is_value_agent = is_value_agent
+        self.display_index = agent.get_display_index()
+        self.max_display_val = agent.max_display_val
+        self.values = values
+        self.q_table = q_table
+        self.best_actions = best_actions
+        self.cells = cells
+        self.positions = None
+        if cells is not None:
+            self.positions = {cell: i for i, cell in enumerate(cells.tolist())}
+
+    @classmethod
+    def from_states(cls, agent, is_value_agent, cells=None):
+        """
+        Take a snapshot of an agent that keeps its values in the grid's states
+
+        :param agent: The agent to take the snapshot of
+        :param is_value_agent: True for value or policy iteration agents, whose
+                               states hold their value and best action. For q
+                               learning agents they are taken from the q values
+        :param cells: Sorted array of the cells to take, None for every cell
+        :return: The AgentSnapshot
+        """
+        grid = agent.grid
+        if cells is None:
+            cells_taken = range(grid.num_rows * grid.num_cols)
+        else:
+            cells_taken = cells.tolist()
+        values = np.zeros(len(cells_taken))
+        q_table = np.full((len(cells_taken), len(Q_ACTIONS)), np.nan)
+        best_actions = np.full(len(cells_taken), NO_ACTION, dtype=np.int8)
+
+        for index, cell in enumerate(cells_taken):
+            state = grid.states[cell // grid.num_cols][cell % grid.num_cols]
+            if state.is_boulder:
+                continue
+            for action, q_value in state.q_values.items():
+                q_table[index, ACTION_COLUMNS[action]] = q_value
+            if is_value_agent:
+                values[index] = state.max_q_value
+                if state.best_action is not None:
+                    best_actions[index] = ACTION_COLUMNS[state.best_action]
+            else:
+                # first of the highest q values, like find_max_q_value
+                best_actions[index] = np.nanargmax(q_table[index])
+                values[index] = q_table[index, best_actions[index]]
+        return cls(agent, is_value_agent, values, q_table, best_actions, cells)
+
+    @classmethod
+    def from_model(cls, agent, model, cells=None):
+        """
+        Take a snapshot of a value or policy iteration agent that keeps its
+        values in a VectorizedValueIteration model
+
+        :param agent: The agent to take the snapshot of
+        :param model: The agent's VectorizedValueIteration
+        :param cells: Sorted array of the cells to take, None for every cell
+        :return: The AgentSnapshot
+        """
+        taken = slice(None) if cells is None else cells
+        is_movable = model.is_movable[taken]
+        is_terminal = model.is_terminal[taken]
+        best_actions = model.best_actions[taken].copy()
+        q_table = np.full((len(best_actions), len(Q_ACTIONS)), np.nan)
+        q_table[is_movable, :EXIT_INDEX] = model.q_table[taken][is_movable]
+        # terminals hold their exit reward once they have been backed up
+        q_table[is_terminal, EXIT_INDEX] = np.where(
+            best_actions[is_terminal] == EXIT_INDEX,
+            model.terminal_rewards[taken][is_terminal], 0.0)
+        return cls(agent, True, model.values[taken].copy(), q_table, best_actions, cells)
+
+    def find_max_q_value(self, row, col):
+        """
+        Get the value and best action of a cell
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :return: The max q value and the action to take to get it
+        """
+        index = self.index(row, col)
+        best_action = self.best_actions[index]
+        return float(self.values[index]), \
+            Q_ACTIONS[best_action] if best_action != NO_ACTION else None
+
+    def find_q_values(self, row, col):
+        """
+        Get the q values of a cell
+
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :return: Dictionary of the q value of each action the cell can take
+        """
+        q_values = self.q_table[self.index(row, col)]
+        return {action: float(q_values[k]) for k, action in enumerate(Q_ACTIONS)
+                if not np.isnan(q_values[k])}
+
+    def index(self, row, col):
+        """
+        :param row: The row of a cell
+        :param col: The column of the cell
+        :return: The position of the cell in the arrays
+        """
+        cell = row * self.grid.num_cols + col
+        if self.positions is None:
+            return cell
+        if cell not in self.positions:
+            raise ValueError("The snapshot doesn't hold the cell ({}, {})".format(row, col))
+        return self.positions[cell]
+
+    def restore(self):
+        """
+        Copy the snapshot's values, q values and best actions into the grid's
+        states, of the cells it holds
+        """
+        num_cols = self.grid.num_cols
+        cells = range(self.grid.num_rows * num_cols) if self.cells is None else self.cells.tolist()
+        for cell in cells:
+            i, j = divmod(cell, num_cols)
+            state = self.grid.states[i][j]
+            if state.is_boulder:
+                continue
+            state.max_q_value, state.best_action = self.find_max_q_value(i, j)
+            for action in state.q_values:
+                state.q_values[action] = float(
+                    self.q_table[self.index(i, j), ACTION_COLUMNS[action]])
+
+    def sync_states(self):
+        """
+        Restore the snapshot so the visualizer can read it from the grid's
+        states
+        """
+        self.restore()
+
+    def get_display_index(self):
+        """
+        Getting the index to display in GUI
+        """
+        return self.display_index
+
+    @property
+    def nbytes(self):
+        """
+        :return: The number of bytes taken by the snapshot's arrays
+        """
+        return self.values.nbytes + self.q_table.nbytes + self.best_actions.nbytes
+
+
+def restore_tables(grid, values, q_table, best_actions):
+    """
+    Copy saved tables into a grid's states to warm start an agent that keeps
+    its values there. The grid's layout can differ from the one the tables
+    were saved on: q values the tables don't have (NaN) and best actions a
+    state can't take are left as they are
+
+    :param grid: The grid to copy the tables into
+    :param values: The value of each cell
+    :param q_table: (num_cells, 5) q values, columns are Q_ACTIONS and
+                    actions a cell can't take are NaN
+    :param best_actions: Column of the best action per cell, NO_ACTION if
+                         there is none
+    """
+    num_cols = grid.num_cols
+    for i, row in enumerate(grid.states):
+        for j, state in enumerate(row):
+            if state.is_boulder:
+                continue
+            cell = i * num_cols + j
+            state.max_q_value = float(values[cell])
+            for action in state.q_values:
+                q_value = float(q_table[cell, ACTION_COLUMNS[action]])
+                if not np.isnan(q_value):
+                    state.q_values[action] = q_value
+            best_action = int(best_actions[cell])
+            if best_action != NO_ACTION and Q_ACTIONS[best_action] in state.q_values:
+                state.best_action = Q_ACTIONS[best_action]
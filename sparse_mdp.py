@@ -0,0 +1,276 @@
+"""
+    File name: sparse_mdp.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script compiles a grid into a SparseMDP, a CSR transition matrix and
+    a reward vector per move action, which can be exported to a .npz file,
+    and contains the SparseValueIteration engine that runs value iteration
+    sweeps as sparse matrix-vector products with it.
+"""
+import argparse
+import numpy as np
+from scipy import sparse
+from grid import Grid, MOVE_ACTIONS, STORAGES
+from vectorized_value_iteration import VectorizedValueIteration
+
+# version of the exported format, stored in every file
+SPARSE_MDP_VERSION = 1
+
+
+class SparseMDP:
+    """
+    Representation of a SparseMDP. The transition matrices of the move
+    actions are stacked into one CSR matrix: row a * num_cells + s holds the
+    probability of landing in each cell after taking the move action in
+    column a of MOVE_ACTIONS in cell s, so one product with the values gives
+    the expected next value of every action of every cell. Terminals and
+    boulders have empty rows, exiting a terminal receives its terminal reward
+    and ends the game. Cells are indexed by row * num_cols + col.
+    Attributes
+        num_rows            Number of rows of the grid
+        num_cols            Number of columns of the grid
+        discount            The discount value
+        noise               The likelihood the robot won't end up where it's going
+        transitions         (4 * num_cells, num_cells) CSR matrix, the
+                            transition matrices of the MOVE_ACTIONS stacked
+        rewards             (4, num_cells) expected reward of taking each move
+                            action in each cell, the reward of the cell landed in
+        terminal_rewards    Reward for exiting the game from each cell
+        is_terminal         True for the terminal cells
+        is_movable          True for the cells that are neither terminal nor
+                            boulders (the ones that use the move actions)
+    """
+
+    def __init__(self, num_rows, num_cols, discount, noise, transitions, rewards,
+                 terminal_rewards, is_terminal, is_movable):
+        """
+        Init function for the SparseMDP class
+
+        :param num_rows: Number of rows of the grid
+        :param num_cols: Number of columns of the grid
+        :param discount: The discount value
+        :param noise: The likelihood the robot won't end up where it's going
+        :param transitions: The stacked CSR transition matrix
+        :param rewards: (4, num_cells) expected reward of each move action
+        :param terminal_rewards: Reward for exiting the game from each cell
+        :param is_terminal: True for the terminal cells
+        :param is_movable: True for the cells that use the move actions
+        """
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.discount = discount
+        self.noise = noise
+        self.transitions = transitions
+        self.rewards = rewards
+        self.terminal_rewards = terminal_rewards
+        self.is_terminal = is_terminal
+        self.is_movable = is_movable
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Compile the transitions of a VectorizedValueIteration engine, the same
+        moves and slips find_possible_states gives for each state
+
+        :param model: The VectorizedValueIteration of the grid
+        :return: The SparseMDP
+        """
+        grid = model.grid
+        num_cells = len(model.rewards)
+        num_actions = len(MOVE_ACTIONS)
+        movable = np.flatnonzero(model.is_movable)
+        # the CSR arrays are filled in directly, every movable row holds its
+        # intended cell and its two drifts. Entries landing in the same cell,
+        # e.g. both drifts into a wall, are kept apart, products sum them
+        row_sizes = np.zeros(num_actions * num_cells, dtype=np.int64)
+        for k in range(num_actions):
+            row_sizes[k * num_cells + movable] = 3
+        indptr = np.zeros(num_actions * num_cells + 1, dtype=np.int64)
+        np.cumsum(row_sizes, out=indptr[1:])
+        del row_sizes
+        index_type = np.int32 if num_cells < 2 ** 31 and indptr[-1] < 2 ** 31 else np.int64
+        indptr = indptr.astype(index_type)
+        indices = np.empty((num_actions, len(movable), 3), dtype=index_type)
+        for k in range(num_actions):
+            for j, table in enumerate((model.destinations, model.drift_first, model.drift_second)):
+                indices[k, :, j] = table[movable, k]
+        data = np.tile([1.0 - model.noise, model.noise / 2.0, model.noise / 2.0],
+                       num_actions * len(movable))
+        transitions = sparse.csr_matrix((data, indices.ravel(), indptr),
+                                        shape=(num_actions * num_cells, num_cells))
+        # without noise the drifts are stored as zeros
+        transitions.eliminate_zeros()
+        rewards = (transitions @ model.rewards).reshape(num_actions, num_cells)
+        return cls(grid.num_rows, grid.num_cols, model.discount, model.noise, transitions,
+                   rewards, model.terminal_rewards.copy(), model.is_terminal.copy(),
+                   model.is_movable.copy())
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Compile a grid
+
+        :param grid: The Grid
+        :return: The SparseMDP
+        """
+        return cls.from_model(VectorizedValueIteration(grid))
+
+    @property
+    def num_cells(self):
+        return self.num_rows * self.num_cols
+
+    def action_matrix(self, column):
+        """
+        :param column: The column in MOVE_ACTIONS of a move action
+        :return: (num_cells, num_cells) CSR transition matrix of the action
+        """
+        return self.transitions[column * self.num_cells:(column + 1) * self.num_cells]
+
+    def find_q_values(self, values):
+        """
+        Compute the q values of the move actions of every cell
+
+        :param values: The value of each cell
+        :return: (num_cells, 4) q values, 0 for cells that can't move
+        """
+        expected = (self.transitions @ values).reshape(len(MOVE_ACTIONS), self.num_cells)
+        return (self.rewards + self.discount * expected).T
+
+    def policy_transitions(self, policy):
+        """
+        :param policy: Column in MOVE_ACTIONS of the action taken at each cell
+        :return: (num_cells, num_cells) CSR transition matrix of the policy
+        """
+        return self.transitions[policy * self.num_cells + np.arange(self.num_cells)]
+
+    def evaluate_policy(self, policy, values, tolerance, max_sweeps):
+        """
+        Evaluate a policy with sweeps of v = r + discount * P v, where P holds
+        the transition probabilities of the policy's actions and r the
+        expected reward of taking them. Terminals are fixed to their terminal
+        reward and boulders to 0.
+
+        :param policy: Column in MOVE_ACTIONS of the action taken at each cell
+        :param values: The values to start from
+        :param tolerance: Stop once no value changes by more than this
+        :param max_sweeps: The most sweeps to run
+        :return: The value of every cell under the policy
+        """
+        transitions = self.policy_transitions(policy)
+        expected_rewards = self.rewards[policy, np.arange(self.num_cells)]
+        expected_rewards[self.is_terminal] = self.terminal_rewards[self.is_terminal]
+        for _ in range(max_sweeps):
+            new_values = expected_rewards + self.discount * (transitions @ values)
+            change = float(np.abs(new_values - values).max(initial=0.0))
+            values = new_values
+            if change <= tolerance:
+                break
+        return values
+
+    def save(self, filename):
+        """
+        Export the MDP to a compressed .npz file, read back by load_sparse_mdp.
+        The transition matrix is stored as its CSR data, indices and indptr
+        arrays so other tools can read it without this script
+
+        :param filename: The file to write, should end with .npz
+        """
+        with open(filename, 'wb') as fp:
+            np.savez_compressed(
+                fp, version=SPARSE_MDP_VERSION, shape=np.array([self.num_rows, self.num_cols]),
+                discount=self.discount, noise=self.noise, data=self.transitions.data,
+                indices=self.transitions.indices, indptr=self.transitions.indptr,
+                rewards=self.rewards, terminal_rewards=self.terminal_rewards,
+                is_terminal=self.is_terminal, is_movable=self.is_movable)
+
+
+def load_sparse_mdp(filename):
+    """
+    Load an MDP exported by SparseMDP.save
+
+    :param filename: The .npz file
+    :return: The SparseMDP
+    """
+    with np.load(filename) as data:
+        if int(data['version']) != SPARSE_MDP_VERSION:
+            raise ValueError("Unknown sparse MDP version {}, expected {}".format(
+                int(data['version']), SPARSE_MDP_VERSION))
+        num_rows, num_cols = (int(size) for size in data['shape'])
+        num_cells = num_rows * num_cols
+        transitions = sparse.csr_matrix(
+            (data['data'], data['indices'], data['indptr']),
+            shape=(len(MOVE_ACTIONS) * num_cells, num_cells))
+        return SparseMDP(num_rows, num_cols, float(data['discount']), float(data['noise']),
+                         transitions, data['rewards'], data['terminal_rewards'],
+                         data['is_terminal'], data['is_movable'])
+
+
+class SparseValueIteration(VectorizedValueIteration):
+    """
+    Value iteration engine that runs each sweep as one sparse matrix-vector
+    product with the SparseMDP compiled from the grid. It only holds the
+    values, q values and policy besides the matrix, so with the grid's array
+    storage it scales to grids with millions of cells. Otherwise it works
+    like VectorizedValueIteration.
+    Attributes
+        mdp                 The SparseMDP of the grid, None until the next
+                            sweep compiles it again after the grid was edited
+    """
+
+    def __init__(self, input_grid: Grid):
+        """
+        Init function for the SparseValueIteration class
+
+        :param input_grid: The grid that the engine will be working with
+        """
+        self.mdp = None
+        super().__init__(input_grid)
+
+    def read_grid(self, cells=None):
+        """
+        Read the rewards and layout of the grid's cells, the MDP is compiled
+        again before the next sweep
+
+        :param cells: Array of the cells to read again after they were
+                      edited, None to read every cell
+        """
+        super().read_grid(cells)
+        self.mdp = None
+
+    def find_q_values(self):
+        """
+        Compute the q values of the move actions of every cell from the
+        current values
+
+        :return: (num_cells, 4) q values, only meaningful for movable cells
+        """
+        if self.mdp is None:
+            self.mdp = SparseMDP.from_model(self)
+        return self.mdp.find_q_values(self.values)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compile a grid into a sparse MDP and export it to a .npz file')
+
+    parser.add_argument('input', help='Grid file to read', type=str)
+
+    parser.add_argument('output', help='File to write the MDP to, should end with .npz', type=str)
+
+    parser.add_argument(
+        '--storage', help='How the grid stores its states while compiling (default: arrays, '
+                          'which takes far less memory on large grids)',
+        choices=STORAGES, default='arrays')
+
+    args = parser.parse_args()
+
+    mdp = SparseMDP.from_grid(Grid(args.input, args.storage))
+    mdp.save(args.output)
+    print("Wrote the {}x{} MDP with {} transitions to {}".format(
+        mdp.num_rows, mdp.num_cols, mdp.transitions.nnz, args.output))
+
+
+if __name__ == '__main__':
+    main()
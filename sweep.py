@@ -0,0 +1,235 @@
+"""
+    File name: sweep.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script runs value iteration and q learning for every combination of
+    the given learning parameters, spread over a pool of processes, and writes
+    the results of all the runs into one CSV table. It never imports pygame so
+    it can be run on machines without a display.
+"""
+from grid import Grid, STORAGES
+from value_iteration_agent import ValueIterationAgent, ENGINES, SCHEDULES
+from policy_iteration_agent import PolicyIterationAgent
+from q_learning_agent import QLearningAgent
+from vectorized_q_learning_agent import VectorizedQLearningAgent
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import itertools
+import random
+import time
+import numpy as np
+
+# 'mdp' runs value (or policy) iteration, 'rl' runs q learning
+AGENTS = ['mdp', 'rl']
+
+# grid parameters that can be swept, see Grid.set_parameters
+PARAMETERS = ['discount', 'alpha', 'noise', 'transition_cost']
+
+# columns of the result table, there is one row per run and grid cell
+COLUMNS = ['run', 'agent', 'discount', 'alpha', 'noise', 'transition_cost',
+           'steps', 'converged', 'convergence', 'seconds', 'row', 'col', 'value', 'policy']
+
+
+def run_until_stable(agent, num_episodes, check_every, tolerance):
+    """
+    Run q learning for num_episodes episodes, checking every check_every
+    episodes whether the greedy policy and the max q value of each cell
+    changed since the last check
+
+    :param agent: The q learning agent
+    :param num_episodes: The number of episodes to run
+    :param check_every: The number of episodes between checks
+    :param tolerance: Largest change of a max q value that counts as stable
+    :return: The episode after which the greedy policy stayed the same and the
+             max q values within tolerance until the end, None if they still
+             changed between the last two checks
+    """
+    stable_since = None
+    previous = agent.snapshot()
+    while agent.curr_episode < num_episodes:
+        agent.run_episodes(min(check_every, num_episodes - agent.curr_episode))
+        current = agent.snapshot()
+        stable = (np.array_equal(current.best_actions, previous.best_actions) and
+                  np.abs(current.values - previous.values).max(initial=0.0) <= tolerance)
+        if not stable:
+            stable_since = None
+        elif stable_since is None:
+            stable_since = previous.display_index
+        previous = current
+    return stable_since
+
+
+def parse_values(text: str):
+    """
+    Parse the values of a swept parameter
+
+    :param text: Either a comma separated list ('0.8,0.9') or an inclusive
+                 range written as start:stop:step ('0.5:0.9:0.1')
+    :return: The list of values
+    """
+    if ':' in text:
+        start, stop, step = (float(value) for value in text.split(':'))
+        if step <= 0 or stop < start:
+            raise argparse.ArgumentTypeError(
+                "Invalid range '{}', expected start:stop:step with start <= stop and step > 0".format(text))
+        count = int(round((stop - start) / step)) + 1
+        # rounding keeps 0.1 steps from printing as 0.30000000000000004
+        return [round(start + i * step, 10) for i in range(count)]
+    return [float(value) for value in text.split(',')]
+
+
+def run_config(config: dict):
+    """
+    Load the grid, run one agent on it and collect the final values and
+    policy of every cell. Runs in a worker process.
+
+    :param config: The run number, grid file, agent and parameters of the run
+    :return: A list of result rows, one per grid cell
+    """
+    grid = Grid(config['grid'], config['storage'])
+    grid.set_parameters(**config['parameters'])
+    start = time.perf_counter()
+
+    if config['agent'] == 'mdp':
+        if config['policy_iteration']:
+            agent = PolicyIterationAgent(grid)
+        else:
+            agent = ValueIterationAgent(
+                grid, config['engine'], config['tolerance'], config['schedule'])
+        agent.run(grid.iterations)
+        agent.sync_states()
+        steps, converged = agent.curr_iteration, agent.has_converged()
+        convergence = steps if converged else ''
+
+        def cell_result(row, col):
+            state = grid.states[row][col]
+            return state.max_q_value, state.best_action
+    else:
+        if config['seed'] is not None:
+            random.seed(config['seed'])
+        if config['robots']:
+            agent = VectorizedQLearningAgent(
+                grid, config['robots'], config['seed'])
+        else:
+            agent = QLearningAgent(grid)
+        stable_since = run_until_stable(
+            agent, grid.episodes, config['check_every'], config['q_tolerance'])
+        agent.sync_states()
+        # q learning always runs all of its episodes, it converged if its
+        # greedy policy stopped changing before the last check
+        steps, converged = agent.curr_episode, stable_since is not None
+        convergence = '' if stable_since is None else stable_since
+        cell_result = agent.find_max_q_value
+
+    seconds = time.perf_counter() - start
+    results = []
+    for i, row in enumerate(grid.states):
+        for j, state in enumerate(row):
+            if state.is_boulder:
+                continue
+            value, action = cell_result(i, j)
+            results.append({
+                'run': config['run'], 'agent': config['agent'],
+                'discount': grid.discount, 'alpha': grid.alpha,
+                'noise': grid.noise, 'transition_cost': grid.transition_cost,
+                'steps': steps, 'converged': converged, 'convergence': convergence,
+                'seconds': '{:.4f}'.format(seconds), 'row': i, 'col': j,
+                'value': value, 'policy': action.name if action else ''})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run a grid world parameter sweep over a pool of processes')
+
+    parser.add_argument(
+        '--grid', help='Grid file to load (default: gridConf.txt)', type=str, default='gridConf.txt')
+
+    parser.add_argument(
+        '--output', help='CSV file to write the results to (default: sweep_results.csv)',
+        type=str, default='sweep_results.csv')
+
+    parser.add_argument(
+        '--agents', help='Agents to run (default: mdp rl)', nargs='+', choices=AGENTS, default=AGENTS)
+
+    for parameter in PARAMETERS:
+        parser.add_argument(
+            '--' + parameter, type=parse_values,
+            help='Values of {} to sweep, a list (0.8,0.9) or a range (0.5:0.9:0.1), '
+                 'defaults to the value in the grid file'.format(parameter))
+
+    parser.add_argument(
+        '--processes', help='Number of worker processes (default: one per CPU)', type=int)
+
+    parser.add_argument(
+        '--engine', help='Engine to run value iteration with (default: reference)',
+        choices=ENGINES, default='reference')
+
+    parser.add_argument(
+        '--tolerance', help='Stop value iteration once the values are provably within TOLERANCE of the optimal values',
+        type=float)
+
+    parser.add_argument(
+        '--schedule', help='Order to back up the states in during value iteration (default: synchronous)',
+        choices=SCHEDULES, default='synchronous')
+
+    parser.add_argument('--policy_iteration',
+                        help='Use policy iteration instead of value iteration for the MDP', default=False,
+                        action="store_true")
+
+    parser.add_argument(
+        '--storage', help='How the grid stores its states (default: objects)',
+        choices=STORAGES, default='objects')
+
+    parser.add_argument(
+        '--robots', help='Run Q-learning with ROBOTS robots at once on an array backed Q-table', type=int)
+
+    parser.add_argument(
+        '--seed', help='Seed for the random generators of the Q-learning runs', type=int)
+
+    parser.add_argument(
+        '--check_every', help='Episodes between checks of whether Q-learning converged (default: 100)',
+        type=int, default=100)
+
+    parser.add_argument(
+        '--q_tolerance', help='Largest change of a max Q-value between checks at which Q-learning '
+                              'counts as converged, along with an unchanged greedy policy (default: 0.01)',
+        type=float, default=0.01)
+
+    args = parser.parse_args()
+
+    # None keeps the value from the grid file
+    sweep_values = [getattr(args, parameter) or [None]
+                    for parameter in PARAMETERS]
+    configs = []
+    for agent in args.agents:
+        for values in itertools.product(*sweep_values):
+            configs.append({
+                'run': len(configs), 'grid': args.grid, 'agent': agent,
+                'parameters': dict(zip(PARAMETERS, values)),
+                'engine': args.engine, 'tolerance': args.tolerance,
+                'schedule': args.schedule, 'policy_iteration': args.policy_iteration,
+                'storage': args.storage, 'robots': args.robots, 'seed': args.seed,
+                'check_every': args.check_every, 'q_tolerance': args.q_tolerance})
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processes) as executor, \
+            open(args.output, 'w', newline='') as fp:
+        writer = csv.DictWriter(fp, fieldnames=COLUMNS)
+        writer.writeheader()
+        for results in executor.map(run_config, configs):
+            writer.writerows(results)
+            if results:
+                print("Run {} ({}) done: {} steps in {}s".format(
+                    results[0]['run'], results[0]['agent'], results[0]['steps'],
+                    results[0]['seconds']))
+
+    print("\n{} runs done in {:.2f}s, results written to {}".format(
+        len(configs), time.perf_counter() - start, args.output))
+
+
+if __name__ == '__main__':
+    main()
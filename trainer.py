@@ -0,0 +1,182 @@
+"""
+    File name: trainer.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the Trainer class, which runs an agent's learning
+    steps in a background thread while the visualizer shows snapshots of it.
+"""
+import copy
+import threading
+import time
+
+# seconds of learning between checks for pausing and snapshot requests
+BATCH_SECONDS = 0.01
+
+# seconds the steps per second are measured over
+RATE_SECONDS = 0.5
+
+# steps per frame settings, from slowest to fastest. 0 is no limit
+STEPS_PER_FRAME = [1, 10, 100, 1000, 10000, 0]
+
+
+class Trainer:
+    """
+    Representation of a Trainer. The agent learns in a background thread at
+    full speed and publishes a snapshot of itself whenever one was requested,
+    so taking a sample never waits for the learning and drawing it never slows
+    the learning down. The snapshots are restored into a copy of the grid,
+    never into the grid the agent learns on.
+    Attributes
+        agent               The agent being trained
+        step                The agent's learning step, iterate_values for value
+                            and policy iteration agents, q_learn otherwise
+        display_grid        Copy of the agent's grid the snapshots are shown in
+        num_edits           The number of the grid's edits the copy was taken
+                            after, it is taken again once the grid is edited
+        steps               The number of steps run so far
+        steps_per_frame     The most steps to run between two samples, 0 for
+                            no limit
+        steps_per_second    The recent learning speed
+        is_running          True while learning, False while paused
+        latest              The last published (snapshot, robot location),
+                            None until the first one
+    """
+
+    def __init__(self, agent, is_value_agent):
+        """
+        Init function for the Trainer class, the trainer starts paused
+
+        :param agent: The agent to train
+        :param is_value_agent: True for value or policy iteration agents
+        """
+        self.agent = agent
+        self.step = agent.iterate_values if is_value_agent else agent.q_learn
+        self.display_grid = copy.deepcopy(agent.grid)
+        self.num_edits = len(agent.grid.edits)
+        self.steps = 0
+        self.steps_per_frame = STEPS_PER_FRAME[-1]
+        self.steps_per_second = 0.0
+        self.is_running = False
+        self.latest = None
+
+        # guards the fields below and the ones above that both threads change
+        self.condition = threading.Condition()
+        self.is_busy = False
+        self.is_stopped = False
+        self.snapshot_requested = True
+        self.frame_steps = 0
+        self.thread = None
+
+    def start(self):
+        """
+        Start or resume the learning
+        """
+        with self.condition:
+            self.is_running = True
+            self.condition.notify_all()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def pause(self):
+        """
+        Pause the learning, returns once the agent is no longer being changed
+        """
+        with self.condition:
+            self.is_running = False
+            while self.is_busy:
+                self.condition.wait()
+
+    def toggle(self):
+        """
+        Pause the learning if it is running, start it otherwise
+        """
+        if self.is_running:
+            self.pause()
+        else:
+            self.start()
+
+    def stop(self):
+        """
+        Stop the learning thread for good
+        """
+        with self.condition:
+            self.is_stopped = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+
+    def change_speed(self, faster):
+        """
+        Move to the next faster or slower steps per frame setting
+
+        :param faster: True to allow more steps per frame, False for fewer
+        """
+        index = STEPS_PER_FRAME.index(self.steps_per_frame) + (1 if faster else -1)
+        with self.condition:
+            self.steps_per_frame = STEPS_PER_FRAME[min(max(index, 0), len(STEPS_PER_FRAME) - 1)]
+            self.condition.notify_all()
+
+    def sample(self):
+        """
+        Get the latest snapshot and ask for a new one, which also lets the
+        next frame's steps run
+
+        :return: The latest (snapshot, robot location), None if there is none yet
+        """
+        with self.condition:
+            self.snapshot_requested = True
+            self.frame_steps = 0
+            self.condition.notify_all()
+            return self.latest
+
+    def publish(self):
+        """
+        Take a snapshot of the agent for the visualizer, called by the
+        learning thread
+        """
+        grid = self.agent.grid
+        if self.num_edits != len(grid.edits):
+            # boulders and terminals added since are shown from now on
+            self.display_grid = copy.deepcopy(grid)
+            self.num_edits = len(grid.edits)
+        snapshot = self.agent.snapshot()
+        snapshot.grid = self.display_grid
+        self.latest = (snapshot, tuple(self.agent.grid.robot_curr_location))
+        self.snapshot_requested = False
+
+    def run(self):
+        """
+        Run the learning in batches until stopped, called by the learning thread
+        """
+        rate_steps, rate_time = self.steps, time.perf_counter()
+        while True:
+            with self.condition:
+                while not self.is_stopped and (not self.is_running or (
+                        self.steps_per_frame and self.frame_steps >= self.steps_per_frame)):
+                    self.condition.wait()
+                if self.is_stopped:
+                    return
+                self.is_busy = True
+                limit = self.steps_per_frame - self.frame_steps if self.steps_per_frame else None
+
+            # the lock isn't held while learning, pause waits for the batch
+            count = 0
+            end = time.perf_counter() + BATCH_SECONDS
+            while (limit is None or count < limit) and time.perf_counter() < end:
+                self.step()
+                count += 1
+
+            with self.condition:
+                self.steps += count
+                self.frame_steps += count
+                now = time.perf_counter()
+                if now - rate_time >= RATE_SECONDS or not self.is_running:
+                    self.steps_per_second = (self.steps - rate_steps) / (now - rate_time)
+                    rate_steps, rate_time = self.steps, now
+                if self.snapshot_requested:
+                    self.publish()
+                self.is_busy = False
+                self.condition.notify_all()
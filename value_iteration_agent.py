@@ -1,13 +1,29 @@
 """
     File name: value_iteration_agent.py
     Author: Arsh Khokhar, Kiernan Wiese
-    Date last modified: 15 April, 2021
+    Date last modified: 17 October, 2026
     Python Version: 3.8
 
     This script contains the ValueIterationAgent class used to run value
     iteration.
 """
-from grid import Grid, Action, ACTION_NEIGHBOURS
+import heapq
+import numpy as np
+from grid import Grid, Action, ACTION_NEIGHBOURS, MOVE_ACTIONS
+from vectorized_value_iteration import VectorizedValueIteration
+from sparse_mdp import SparseValueIteration
+from snapshot import AgentSnapshot, restore_tables
+
+# engines that can be used to run the value iteration sweeps
+ENGINES = ['reference', 'vectorized', 'sparse']
+
+# the array backed engine class of each engine other than 'reference'
+ENGINE_CLASSES = {'vectorized': VectorizedValueIteration, 'sparse': SparseValueIteration}
+
+# order in which the states are backed up, 'synchronous' sweeps read the
+# previous sweep's values, 'gauss_seidel' sweeps use new values right away and
+# 'prioritized' backs up the states whose successors changed the most first
+SCHEDULES = ['synchronous', 'gauss_seidel', 'prioritized']
 
 
 class ValueIterationAgent:
@@ -19,19 +35,82 @@ class ValueIterationAgent:
         noise               The likelihood the robot won't end up where it's going
         max_display_val     keeps track of the maximum terminal value for 
                             darker/lighter GUI colors
+        engine              The engine running the sweeps, 'reference' for the
+                            per-cell implementation, 'vectorized' or 'sparse'
+        vectorized_engine   The VectorizedValueIteration (or
+                            SparseValueIteration) instance, None when the
+                            reference engine is used
+        states_stale        True if the vectorized engine has values that
+                            haven't been copied into the grid's states yet
+        tolerance           Maximum distance from the optimal values at which
+                            the values count as converged, None to never stop
+                            early
+        residuals           The Bellman residual (max absolute change of a
+                            state's value) of every sweep run so far
+        schedule            The order the states are backed up in (one of
+                            SCHEDULES)
+        priority_threshold  Smallest change of a state's value that queues its
+                            predecessors for prioritized sweeping
+        backups             The number of state backups performed so far
+        priority_queue      Heap of (-priority, counter, row, col) entries of
+                            the states waiting for a prioritized backup
+        priorities          The current priority of each queued state, heap
+                            entries that don't match it are stale
+        predecessors        The states each state can be reached from
+        num_open_states     The number of non-boulder states, the number of
+                            prioritized backups in one iteration
+        swept_all           True if the last prioritized iteration backed up
+                            every state, only its residual bounds the error
+        num_edits           The number of the grid's edits the values were
+                            repaired for (see replan)
+        replanned           True if replan changed the values since the last
+                            sweep, whose residual then no longer bounds the error
     """
 
-    def __init__(self, input_grid: Grid):
+    def __init__(self, input_grid: Grid, engine='reference', tolerance=None,
+                 schedule='synchronous', priority_threshold=1e-6):
         """
         Init function for the ValueIterationAgent class
 
         :param input_grid: The grid that the agent will be working with when learning
+        :param engine: The engine to run the sweeps with (one of ENGINES)
+        :param tolerance: Maximum distance from the optimal values at which the
+                          values count as converged, None to never stop early
+        :param schedule: The order the states are backed up in (one of SCHEDULES)
+        :param priority_threshold: Smallest change of a state's value that
+                                   queues its predecessors for prioritized sweeping
         """
+        if engine not in ENGINES:
+            raise ValueError("Unknown value iteration engine '{}', expected one of {}".format(
+                engine, ENGINES))
+        if schedule not in SCHEDULES:
+            raise ValueError("Unknown value iteration schedule '{}', expected one of {}".format(
+                schedule, SCHEDULES))
+        if engine != 'reference' and schedule != 'synchronous':
+            raise ValueError(
+                "The {} engine only supports synchronous sweeps".format(engine))
         self.grid = input_grid
         self.discount = input_grid.discount
         self.noise = input_grid.noise
         self.max_display_val = self.grid.max_terminal_val
         self.curr_iteration = 0
+        self.engine = engine
+        self.vectorized_engine = ENGINE_CLASSES[engine](
+            input_grid) if engine != 'reference' else None
+        self.states_stale = False
+        self.tolerance = tolerance
+        self.residuals = []
+        self.schedule = schedule
+        self.priority_threshold = priority_threshold
+        self.backups = 0
+        self.priority_queue = None
+        self.priorities = {}
+        self.predecessors = None
+        self.queue_counter = 0
+        self.num_open_states = 0
+        self.swept_all = False
+        self.replanned = False
+        self.num_edits = len(input_grid.edits)
 
     def iterate_value(self, row, col):
         """
@@ -63,35 +142,373 @@ class ValueIterationAgent:
         """
         Set the best value and action for each state in the grid based on its
         update q values
+
+        :return: The max absolute change of a state's value
         """
+        residual = 0.0
         for row in self.grid.states:
             for state in row:
                 if not state.is_boulder:
-                    best_action = None
-                    max_q_value = float('-inf')
-                    for key in state.q_values:
-                        if state.q_values[key] > max_q_value:
-                            max_q_value = state.q_values[key]
-                            best_action = key
-                    # setting value to be the maximum of q-values
-                    # updating best action accordingly
-                    state.max_q_value = max_q_value
-                    state.best_action = best_action
+                    residual = max(residual, self.update_value(state))
+        return residual
+
+    def update_value(self, state):
+        """
+        Set the best value and action of a single state based on its q values
+
+        :param state: The state to update
+        :return: The absolute change of the state's value
+        """
+        best_action = None
+        max_q_value = float('-inf')
+        for key in state.q_values:
+            if state.q_values[key] > max_q_value:
+                max_q_value = state.q_values[key]
+                best_action = key
+        # setting value to be the maximum of q-values
+        # updating best action accordingly
+        change = abs(max_q_value - state.max_q_value)
+        state.max_q_value = max_q_value
+        state.best_action = best_action
+        return change
+
+    def backup(self, row, col):
+        """
+        Back up a single state in place, its new value is visible to the
+        states backed up after it
+
+        :param row: The row of the state to back up
+        :param col: The column of the state to back up
+        :return: The absolute change of the state's value
+        """
+        self.iterate_value(row, col)
+        self.backups += 1
+        return self.update_value(self.grid.states[row][col])
+
+    def gauss_seidel_sweep(self):
+        """
+        Back up every state in place, in row major order
+
+        :return: The max absolute change of a state's value
+        """
+        residual = 0.0
+        for i, row in enumerate(self.grid.states):
+            for j, state in enumerate(row):
+                if not state.is_boulder:
+                    residual = max(residual, self.backup(i, j))
+        return residual
+
+    def find_predecessors(self):
+        """
+        Find the states each state can be reached from, including by drifting
+
+        :return: A dictionary mapping (row, col) to a set of (row, col)
+        """
+        predecessors = {}
+        for i, row in enumerate(self.grid.states):
+            for j, state in enumerate(row):
+                if state.is_boulder or state.is_terminal:
+                    continue
+                for dest_state in self.grid.find_possible_states(i, j).values():
+                    predecessors.setdefault(
+                        (dest_state.row, dest_state.col), set()).add((i, j))
+        return predecessors
+
+    def queue_state(self, row, col, priority):
+        """
+        Queue a state for a prioritized backup, unless it is already queued
+        with a higher priority
+
+        :param row: The row of the state to queue
+        :param col: The column of the state to queue
+        :param priority: The priority of the backup
+        """
+        if priority <= self.priorities.get((row, col), 0.0):
+            return
+        self.priorities[(row, col)] = priority
+        # the counter breaks ties so states are never compared
+        heapq.heappush(self.priority_queue,
+                       (-priority, self.queue_counter, row, col))
+        self.queue_counter += 1
+
+    def prioritized_sweep(self):
+        """
+        Run as many prioritized backups as there are states. The state with
+        the highest priority is backed up first, and a change to its value
+        queues its predecessors with a priority of discount * change. Once no
+        state is waiting for a backup every state is backed up in place
+        instead, which measures the residual the convergence check needs
+
+        :return: The max absolute change of a state's value
+        """
+        if self.priority_queue is None:
+            # every state is backed up at least once
+            self.predecessors = self.find_predecessors()
+            self.priority_queue = []
+            for i, row in enumerate(self.grid.states):
+                for j, state in enumerate(row):
+                    if not state.is_boulder:
+                        self.queue_state(i, j, float('inf'))
+            self.num_open_states = len(self.priority_queue)
+
+        self.swept_all = not self.priority_queue
+        if not self.swept_all:
+            return self.run_queue(self.num_open_states)
+
+        # the changes left are below the threshold, but only a full sweep
+        # tells how far the values are from the optimal ones
+        residual = 0.0
+        for i, row in enumerate(self.grid.states):
+            for j, state in enumerate(row):
+                if state.is_boulder:
+                    continue
+                change = self.backup(i, j)
+                residual = max(residual, change)
+                priority = self.discount * change
+                if priority > self.priority_threshold:
+                    for pred_row, pred_col in self.predecessors.get((i, j), ()):
+                        self.queue_state(pred_row, pred_col, priority)
+        return residual
+
+    def run_queue(self, max_backups=None, threshold=None):
+        """
+        Run prioritized backups until no state is waiting for one. The state
+        with the highest priority is backed up first, and a change to its
+        value queues its predecessors with a priority of discount * change
+
+        :param max_backups: Stop after this many backups, None for no limit
+        :param threshold: Smallest priority that queues the predecessors,
+                          None for the priority threshold
+        :return: The max absolute change of a state's value
+        """
+        if threshold is None:
+            threshold = self.priority_threshold
+        residual = 0.0
+        remaining_backups = max_backups
+        while self.priority_queue and (remaining_backups is None or remaining_backups > 0):
+            neg_priority, _, row, col = heapq.heappop(self.priority_queue)
+            if self.priorities.get((row, col)) != -neg_priority:
+                # the state was queued again with a higher priority
+                continue
+            del self.priorities[(row, col)]
+            change = self.backup(row, col)
+            if remaining_backups is not None:
+                remaining_backups -= 1
+            residual = max(residual, change)
+
+            priority = self.discount * change
+            if priority > threshold:
+                for pred_row, pred_col in self.predecessors.get((row, col), ()):
+                    self.queue_state(pred_row, pred_col, priority)
+        return residual
+
+    def repair_threshold(self):
+        """
+        :return: Smallest change of a value that replan spreads, the priority
+                 threshold or, with a tolerance, small enough that the
+                 repaired values can meet it
+        """
+        if self.tolerance is None:
+            return self.priority_threshold
+        if self.discount >= 1.0:
+            return min(self.priority_threshold, self.tolerance)
+        return min(self.priority_threshold, self.tolerance * (1.0 - self.discount))
+
+    def update_predecessors(self, cells):
+        """
+        Update the predecessors after the successors of some states changed
+
+        :param cells: Array of the cells (row * num_cols + col) of the states
+        """
+        num_cols = self.grid.num_cols
+        for cell in cells.tolist():
+            row, col = divmod(cell, num_cols)
+            # a state only ever moves to itself or the states next to it
+            for action in [None] + MOVE_ACTIONS:
+                dest = (row, col) if action is None else \
+                    (row + action.value[0], col + action.value[1])
+                self.predecessors.get(dest, set()).discard((row, col))
+            state = self.grid.states[row][col]
+            if state.is_boulder or state.is_terminal:
+                continue
+            for dest_state in self.grid.find_possible_states(row, col).values():
+                self.predecessors.setdefault(
+                    (dest_state.row, dest_state.col), set()).add((row, col))
+
+    def replan(self, max_backups=None):
+        """
+        Repair the values after the grid was edited (see Grid.set_boulder,
+        Grid.set_terminal and Grid.set_transition_cost), starting from the
+        current values. Only the edited states and the states next to them are
+        backed up first, and the changes spread outwards through their
+        predecessors while they are above the repair threshold. The
+        vectorized engine spreads them with sweeps over the changed region.
+        The values only count as converged again after the next sweep
+
+        :param max_backups: Stop after this many backups, None to run until
+                            the changes are below the repair threshold.
+                            Ignored by the vectorized engine
+        :return: The number of backups run
+        """
+        cells = self.grid.changes_since(self.num_edits)
+        self.num_edits = len(self.grid.edits)
+        if self.curr_iteration == 0 and not self.backups:
+            # nothing was learned yet, the first sweep reads the edited grid
+            return 0
+        backups = self.backups
+        self.replanned = True
+
+        if self.vectorized_engine is not None:
+            self.vectorized_engine.read_grid(cells)
+            if cells is None:
+                cells = np.arange(len(self.vectorized_engine.values))
+            self.backups += self.vectorized_engine.repair(cells, self.repair_threshold())
+            self.states_stale = True
+            return self.backups - backups
+
+        if cells is None or self.predecessors is None:
+            self.predecessors = self.find_predecessors()
+            if cells is None:
+                cells = np.arange(self.grid.num_rows * self.grid.num_cols)
+        else:
+            self.update_predecessors(cells)
+        if self.priority_queue is None:
+            self.priority_queue = []
+        for cell in cells.tolist():
+            row, col = divmod(cell, self.grid.num_cols)
+            state = self.grid.states[row][col]
+            if state.is_boulder:
+                state.max_q_value = 0.0
+                state.best_action = None
+                self.priorities.pop((row, col), None)
+            else:
+                self.queue_state(row, col, float('inf'))
+        self.num_open_states = self.grid.num_rows * self.grid.num_cols - len(self.grid.boulders)
+        self.run_queue(max_backups, self.repair_threshold())
+        return self.backups - backups
 
     def iterate_values(self):
         """
         Call various other functions to run through 1 step of value iteration
         """
+        # the residual of this sweep is measured on the repaired values
+        self.replanned = False
+        if self.vectorized_engine is not None:
+            # the states are only updated when they are needed, see sync_states
+            self.residuals.append(self.vectorized_engine.sweep())
+            self.backups += int(self.vectorized_engine.is_movable.sum() +
+                                self.vectorized_engine.is_terminal.sum())
+            self.states_stale = True
+            self.curr_iteration += 1
+            return
+
+        if self.schedule == 'gauss_seidel':
+            self.residuals.append(self.gauss_seidel_sweep())
+            self.curr_iteration += 1
+            return
+
+        if self.schedule == 'prioritized':
+            self.residuals.append(self.prioritized_sweep())
+            self.curr_iteration += 1
+            return
+
         # iterate value for each grid sell
         for i, row in enumerate(self.grid.states):
             for j, state in enumerate(row):
                 if not state.is_boulder:
                     self.iterate_value(i, j)
+                    self.backups += 1
 
         # update values of all cells
-        self.update_values()
+        self.residuals.append(self.update_values())
         self.curr_iteration += 1
 
+    def get_error_bound(self):
+        """
+        Get the bound on how far the current values are from the optimal
+        values, discount * residual / (1 - discount) for the last sweep
+
+        :return: The error bound, infinity if there is no bound
+        """
+        if not self.residuals:
+            return float('inf')
+        if self.residuals[-1] == 0.0:
+            return 0.0
+        if self.discount >= 1.0:
+            # the bound only holds for discounted grids
+            return float('inf')
+        return self.discount * self.residuals[-1] / (1.0 - self.discount)
+
+    def has_converged(self):
+        """
+        Check if the values are within the tolerance of the optimal values
+
+        :return: True if the values have converged, false otherwise
+        """
+        if self.tolerance is None or not self.residuals or self.replanned:
+            return False
+        if self.schedule == 'prioritized' and not self.swept_all:
+            # the backups of the queue don't bound the error of the other states
+            return False
+        if self.discount >= 1.0:
+            # without discounting stop once the values stop moving
+            return self.residuals[-1] < self.tolerance
+        return self.get_error_bound() < self.tolerance
+
+    def run(self, max_iterations, on_iteration=None):
+        """
+        Run value iteration until max_iterations is reached or, if there is a
+        tolerance, until the values have converged
+
+        :param max_iterations: The iteration count to stop at
+        :param on_iteration: Optional function called with the iteration number
+                             before each sweep, used to take query snapshots
+        """
+        while self.curr_iteration < max_iterations:
+            if on_iteration:
+                on_iteration(self.curr_iteration)
+            self.iterate_values()
+            if self.has_converged():
+                break
+
+    def sync_states(self):
+        """
+        Copy the results of the vectorized engine into the grid's states so
+        they can be read by the visualizer and the queries
+        """
+        if self.states_stale:
+            self.vectorized_engine.write_back()
+            self.states_stale = False
+
+    def load_tables(self, values, q_table, best_actions):
+        """
+        Warm start from saved tables (see checkpoint.py), learning continues
+        from them instead of from zero. Q values the tables don't have (NaN)
+        are left as they are
+
+        :param values: The value of each cell
+        :param q_table: (num_cells, 5) q values, columns are Q_ACTIONS
+        :param best_actions: Column of the best action per cell
+        """
+        if self.vectorized_engine is not None:
+            self.vectorized_engine.load_tables(values, q_table, best_actions)
+            self.states_stale = True
+            return
+        restore_tables(self.grid, values, q_table, best_actions)
+
+    def snapshot(self, cells=None):
+        """
+        Take a compact snapshot of the current values, q values and policy
+        for answering queries; read from the vectorized engine when there
+        is one, so its values don't have to be written into the states
+
+        :param cells: Sorted array of the cells to take, None for every cell
+        :return: The AgentSnapshot
+        """
+        if self.vectorized_engine is not None:
+            return AgentSnapshot.from_model(self, self.vectorized_engine, cells)
+        return AgentSnapshot.from_states(self, True, cells)
+
     def get_display_index(self):
         """
         Getting the index to display in GUI
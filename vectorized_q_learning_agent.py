@@ -0,0 +1,287 @@
+"""
+    File name: vectorized_q_learning_agent.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the VectorizedQLearningAgent class used to run q
+    learning with many robots at once on a shared, array backed q table.
+"""
+import numpy as np
+from grid import Grid
+from vectorized_value_iteration import VectorizedValueIteration, Q_ACTIONS, EXIT_INDEX, NO_ACTION
+from snapshot import AgentSnapshot
+from episode_stats import EpisodeStats
+from exploration import EpsilonGreedy, exploration_from_grid, alpha_schedule_from_grid
+from environment import GridEnvironment
+
+
+class VectorizedQLearningAgent:
+    """
+    Representation of a VectorizedQLearningAgent. Every call to q_learn moves
+    all the robots one step in lockstep; when several robots update the same
+    q value in one step the last update wins. Only epsilon greedy exploration
+    is supported.
+    Attributes
+        grid                The grid that the agent will be working with when learning
+        discount            The discount value
+        noise               The likelihood the robot won't end up where it's going
+        alpha               The discount alpha, for the current episode
+        exploration         The EpsilonGreedy exploration of the robots
+        alpha_schedule      Schedule of alpha over the episodes
+        max_display_val     keeps track of the maximum terminal value for
+                            darker/lighter GUI colors
+        curr_episode        The number of episodes finished by all the robots
+        num_robots          The number of robots learning at once
+        rng                 numpy random generator used for exploration
+        environment         The GridEnvironment the robots move in, its moves
+                            slip with the grid's noise
+        model               VectorizedValueIteration holding the transition
+                            structure of the grid as arrays
+        q_table             (num_cells, 5) q values, columns are Q_ACTIONS
+        valid_actions       (num_cells, 5) True for the actions a cell can take
+        robot_cells         The cell each robot is currently at
+        states_stale        True if there are q values that haven't been copied
+                            into the grid's states yet
+        stats               EpisodeStats of the finished episodes, in the order
+                            they finished
+        robot_steps         The number of steps each robot took in its current episode
+        robot_returns       The rewards each robot received so far in its current episode
+        robot_td_errors     The absolute TD errors so far in each robot's current episode
+    """
+
+    def __init__(self, input_grid: Grid, num_robots=1, seed=None, exploration=None,
+                 alpha_schedule=None, environment=None):
+        """
+        Init function for the VectorizedQLearningAgent class
+
+        :param input_grid: The grid that the agent will be working with when learning
+        :param num_robots: The number of robots learning at once
+        :param seed: Seed of the random generators, None for a random seed
+        :param exploration: The EpsilonGreedy exploration, None for the one
+                            set in the grid's settings
+        :param alpha_schedule: Schedule of alpha, None for the one set in the
+                               grid's settings
+        :param environment: The GridEnvironment of the grid, None to create
+                            one seeded from the random generator
+        """
+        self.grid = input_grid
+        self.discount = input_grid.discount
+        self.noise = input_grid.noise
+        self.exploration = exploration or exploration_from_grid(input_grid)
+        if not isinstance(self.exploration, EpsilonGreedy):
+            raise ValueError("Unknown exploration '{}' for the vectorized agent, expected one of {}".format(
+                type(self.exploration).__name__, ['epsilon_greedy']))
+        self.alpha_schedule = alpha_schedule or alpha_schedule_from_grid(input_grid)
+        self.alpha = self.alpha_schedule.value(0)
+        self.max_display_val = self.grid.max_terminal_val
+        self.curr_episode = 0
+        self.num_robots = num_robots
+        self.rng = np.random.default_rng(seed)
+        if environment is None:
+            environment = GridEnvironment(input_grid, seed=int(self.rng.integers(2 ** 32)))
+        self.environment = environment
+        self.model = VectorizedValueIteration(input_grid)
+
+        num_cells = len(self.model.values)
+        self.q_table = np.zeros((num_cells, len(Q_ACTIONS)))
+        self.valid_actions = np.zeros((num_cells, len(Q_ACTIONS)), dtype=bool)
+        self.valid_actions[self.model.is_movable, :EXIT_INDEX] = True
+        self.valid_actions[self.model.is_terminal, EXIT_INDEX] = True
+
+        self.robot_cells = environment.reset_batch(num_robots)
+        self.states_stale = False
+
+        self.stats = EpisodeStats()
+        self.robot_steps = np.zeros(num_robots, dtype=np.int64)
+        self.robot_returns = np.zeros(num_robots)
+        self.robot_td_errors = np.zeros(num_robots)
+
+    def max_q_values(self, cells):
+        """
+        Get the highest q value of the given cells
+
+        :param cells: Array of cell indexes
+        :return: Array of the max q values, 0 for cells without actions
+        """
+        masked = np.where(self.valid_actions[cells], self.q_table[cells], -np.inf)
+        max_q = masked.max(axis=1)
+        return np.where(np.isfinite(max_q), max_q, 0.0)
+
+    def find_max_q_value(self, row, col):
+        """
+        Get the highest q value for a given state
+
+        :param row: The row of the state to check
+        :param col: The column of the state to check
+        :return: The max q value and the action to take to get it
+        """
+        cell = row * self.grid.num_cols + col
+        valid = np.flatnonzero(self.valid_actions[cell])
+        if len(valid) == 0:
+            return 0.0, None
+        best = valid[self.q_table[cell, valid].argmax()]
+        return float(self.q_table[cell, best]), Q_ACTIONS[best]
+
+    def get_policy(self):
+        """
+        Get the action each robot takes, a random valid action with probability
+        epsilon and otherwise one of the best actions picked at random
+
+        :return: Array of the column in Q_ACTIONS each robot takes
+        """
+        cells = self.robot_cells
+        valid = self.valid_actions[cells]
+        masked = np.where(valid, self.q_table[cells], -np.inf)
+        is_best = masked == masked.max(axis=1, keepdims=True)
+        # the largest random number out of the candidates picks one of them
+        # uniformly at random
+        best_actions = (self.rng.random(is_best.shape) * is_best).argmax(axis=1)
+        random_actions = (self.rng.random(valid.shape) * valid).argmax(axis=1)
+
+        explore = self.rng.random(len(cells)) < self.exploration.epsilon
+        return np.where(explore, random_actions, best_actions)
+
+    def q_learn(self):
+        """
+        Move every robot one step in the environment, updating the q values
+        of the actions they took. Robots that take the exit action finish an
+        episode and go back to the start cell.
+        """
+        self.run_steps(1)
+
+    def run_steps(self, num_steps=None, on_episode=None, max_episode_steps=None,
+                  num_episodes=None):
+        """
+        Run steps of q learning, each moving every robot once
+
+        :param num_steps: The number of steps to run, None for no limit
+        :param on_episode: Optional function called with the episode number
+                           right before the step that finishes the episode,
+                           and once at the end of the run, so it sees the last
+                           values of every episode number. Episode numbers
+                           skipped over by robots finishing in the same step
+                           are passed right after that step. Used to take
+                           query snapshots
+        :param max_episode_steps: Cut episodes off after this many steps and
+                                  start a new one, None to never cut them off
+        :param num_episodes: Stop once this many more episodes are finished,
+                             None for no limit
+        :return: The number of steps run
+        """
+        step_batch = self.environment.step_batch
+        start_cell = self.environment.start_cell
+        discount = self.discount
+        self.exploration.start_episode(self.curr_episode)
+        alpha = self.alpha = self.alpha_schedule.value(self.curr_episode)
+        stop_episode = None if num_episodes is None else self.curr_episode + num_episodes
+        steps = 0
+
+        while (num_steps is None or steps < num_steps) and \
+                (stop_episode is None or self.curr_episode < stop_episode):
+            cells = self.robot_cells
+            actions = self.get_policy()
+            next_cells, step_rewards, exited = step_batch(cells, actions)
+            self.robot_steps += 1
+            finished = exited
+            if max_episode_steps is not None:
+                finished = exited | (self.robot_steps >= max_episode_steps)
+            previous_episode = self.curr_episode
+            if on_episode and finished.any():
+                on_episode(previous_episode)
+
+            samples = np.where(
+                exited, step_rewards,
+                step_rewards + discount * self.max_q_values(next_cells))
+            q_values = self.q_table[cells, actions]
+            self.q_table[cells, actions] = (1 - alpha) * q_values + alpha * samples
+            self.robot_returns += step_rewards
+            self.robot_td_errors += np.abs(samples - q_values)
+
+            if finished.any():
+                for robot in np.flatnonzero(finished):
+                    self.stats.record(int(self.robot_steps[robot]), float(self.robot_returns[robot]),
+                                      float(self.robot_td_errors[robot]), not exited[robot])
+                self.robot_steps[finished] = 0
+                self.robot_returns[finished] = 0.0
+                self.robot_td_errors[finished] = 0.0
+                # cut off robots start over too
+                next_cells[finished] = start_cell
+                self.curr_episode += int(finished.sum())
+                self.exploration.start_episode(self.curr_episode)
+                alpha = self.alpha = self.alpha_schedule.value(self.curr_episode)
+                if on_episode:
+                    for episode in range(previous_episode + 1, self.curr_episode):
+                        on_episode(episode)
+
+            self.robot_cells = next_cells
+            steps += 1
+        self.states_stale = True
+
+        if on_episode:
+            on_episode(self.curr_episode)
+        return steps
+
+    def run_episodes(self, num_episodes, on_episode=None, max_episode_steps=None):
+        """
+        Run q learning until num_episodes more episodes are finished
+
+        :param num_episodes: The number of episodes to run
+        :param on_episode: Optional function called with the episode number,
+                           see run_steps
+        :param max_episode_steps: Cut episodes off after this many steps, see
+                                  run_steps
+        :return: The number of steps run
+        """
+        return self.run_steps(None, on_episode, max_episode_steps, num_episodes)
+
+    def sync_states(self):
+        """
+        Copy the q values into the grid's states so they can be read by the
+        visualizer and the queries
+        """
+        if not self.states_stale:
+            return
+        num_cols = self.grid.num_cols
+        for i, row in enumerate(self.grid.states):
+            for j, state in enumerate(row):
+                cell = i * num_cols + j
+                for action in state.q_values:
+                    state.q_values[action] = float(
+                        self.q_table[cell, Q_ACTIONS.index(action)])
+        self.states_stale = False
+
+    def load_tables(self, values, q_table, best_actions):
+        """
+        Warm start from saved tables (see checkpoint.py), learning continues
+        from them instead of from zero. Q values the tables don't have (NaN)
+        are left as they are
+
+        :param values: The value of each cell
+        :param q_table: (num_cells, 5) q values, columns are Q_ACTIONS
+        :param best_actions: Column of the best action per cell
+        """
+        self.q_table[:] = np.where(self.valid_actions & np.isfinite(q_table), q_table, self.q_table)
+        self.states_stale = True
+
+    def snapshot(self, cells=None):
+        """
+        Take a compact snapshot of the current q values for answering
+        queries; read straight from the q table
+
+        :param cells: Sorted array of the cells to take, None for every cell
+        :return: The AgentSnapshot
+        """
+        taken = np.arange(len(self.q_table)) if cells is None else cells
+        valid_actions = self.valid_actions[taken]
+        masked = np.where(valid_actions, self.q_table[taken], -np.inf)
+        best_actions = masked.argmax(axis=1).astype(np.int8)
+        best_actions[~valid_actions.any(axis=1)] = NO_ACTION
+        q_table = np.where(valid_actions, self.q_table[taken], np.nan)
+        return AgentSnapshot(self, False, self.max_q_values(taken), q_table, best_actions, cells)
+
+    def get_display_index(self):
+        """
+        Getting the index to display in GUI
+        """
+        return self.curr_episode
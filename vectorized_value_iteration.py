@@ -0,0 +1,200 @@
+"""
+    File name: vectorized_value_iteration.py
+    Author: Arsh Khokhar, Kiernan Wiese
+    Date last modified: 17 October, 2026
+    Python Version: 3.8
+
+    This script contains the VectorizedValueIteration class, an array backed
+    engine that runs value iteration sweeps as whole-array numpy operations.
+"""
+import numpy as np
+from grid import Grid, Action, MOVE_ACTIONS, Q_ACTIONS, EXIT_INDEX, NO_ACTION
+
+
+class VectorizedValueIteration:
+    """
+    Array backed value iteration engine. The transition structure of the grid
+    is computed once, after which each sweep is a handful of array operations.
+    Cells are indexed by row * num_cols + col.
+    Attributes
+        grid                The grid the engine was built from
+        discount            The discount value
+        noise               The likelihood the robot won't end up where it's going
+        rewards             Reward for visiting each cell
+        terminal_rewards    Reward for exiting the game from each cell
+        is_terminal         True for the terminal cells
+        is_movable          True for the cells that are neither terminal nor
+                            boulders (the ones that use the move actions)
+        destinations        (num_cells, 4) cell each move action leads to, the
+                            grid's successor table
+        drift_first         (num_cells, 4) first cell the robot can drift to
+        drift_second        (num_cells, 4) second cell the robot can drift to
+        values              The max q value of each cell
+        q_table             (num_cells, 4) q values of the move actions
+        best_actions        Column of the best action per cell, EXIT_INDEX for
+                            terminals and NO_ACTION for boulders
+    """
+
+    def __init__(self, input_grid: Grid):
+        """
+        Init function for the VectorizedValueIteration class
+
+        :param input_grid: The grid that the engine will be working with
+        """
+        self.grid = input_grid
+        self.discount = input_grid.discount
+        self.noise = input_grid.noise
+        num_cells = input_grid.num_rows * input_grid.num_cols
+
+        self.rewards = np.zeros(num_cells)
+        self.terminal_rewards = np.zeros(num_cells)
+        self.is_terminal = np.zeros(num_cells, dtype=bool)
+        self.is_movable = np.zeros(num_cells, dtype=bool)
+        self.destinations = None
+        self.drift_first = None
+        self.drift_second = None
+        self.read_grid()
+
+        self.values = np.zeros(num_cells)
+        self.q_table = np.zeros((num_cells, len(MOVE_ACTIONS)))
+        self.best_actions = np.full(num_cells, NO_ACTION, dtype=np.int8)
+
+    def read_grid(self, cells=None):
+        """
+        Read the rewards and layout of the grid's cells
+
+        :param cells: Array of the cells to read again after they were
+                      edited, None to read every cell
+        """
+        grid = self.grid
+        if cells is None:
+            cells = np.arange(len(self.rewards))
+            # the grid's successor table, shared rather than copied. Edits
+            # update it in place, only a rebuild replaces it
+            self.destinations = grid.destinations
+            self.drift_first = grid.drift_first
+            self.drift_second = grid.drift_second
+
+        if grid.storage == 'arrays':
+            self.rewards[cells] = grid.cell_rewards[cells]
+            self.terminal_rewards[cells] = grid.cell_terminal_rewards[cells]
+            self.is_terminal[cells] = grid.cell_is_terminal[cells]
+        else:
+            for index in cells.tolist():
+                state = grid.states[index // grid.num_cols][index % grid.num_cols]
+                self.rewards[index] = state.reward
+                self.terminal_rewards[index] = state.terminal_reward
+                self.is_terminal[index] = state.is_terminal
+        self.is_movable[cells] = ~(self.is_terminal[cells] | grid.boulder_mask()[cells])
+
+    def find_q_values(self):
+        """
+        Compute the q values of the move actions of every cell from the
+        current values
+
+        :return: (num_cells, 4) q values, only meaningful for movable cells
+        """
+        # reward plus discounted value of landing in each cell, the terms are
+        # combined in the same order as ValueIterationAgent.iterate_value so
+        # both engines give identical results
+        targets = self.rewards + self.discount * self.values
+        q_table = (1.0 - self.noise) * targets[self.destinations]
+        q_table += (self.noise / 2.0) * targets[self.drift_first]
+        q_table += (self.noise / 2.0) * targets[self.drift_second]
+        return q_table
+
+    def sweep(self):
+        """
+        Run through 1 synchronous step of value iteration over all the cells
+
+        :return: The max absolute change of a cell's value
+        """
+        q_table = self.find_q_values()
+        previous_values = self.values.copy()
+        movable = self.is_movable
+        self.q_table[movable] = q_table[movable]
+        self.values[movable] = q_table[movable].max(axis=1)
+        self.best_actions[movable] = q_table[movable].argmax(axis=1)
+
+        self.values[self.is_terminal] = self.terminal_rewards[self.is_terminal]
+        self.best_actions[self.is_terminal] = EXIT_INDEX
+        return float(np.abs(self.values - previous_values).max(initial=0.0))
+
+    def repair(self, cells, threshold):
+        """
+        Bring the values up to date after some cells were edited, starting
+        from the current values. Each sweep backs up only the active cells,
+        starting with the edited ones, and the next sweep the cells next to
+        those whose value changed by more than threshold, so the changes
+        spread outwards until they die down
+
+        :param cells: Array of the cells that were edited (see read_grid)
+        :param threshold: Changes of a value up to this much aren't spread
+        :return: The number of cells backed up
+        """
+        backups = 0
+        active = np.asarray(cells, dtype=np.intp)
+        while len(active):
+            # the same terms in the same order as sweep
+            landings = [table[active] for table in
+                        (self.destinations, self.drift_first, self.drift_second)]
+            targets = [self.rewards[dest] + self.discount * self.values[dest] for dest in landings]
+            q_table = (1.0 - self.noise) * targets[0]
+            q_table += (self.noise / 2.0) * targets[1]
+            q_table += (self.noise / 2.0) * targets[2]
+
+            movable = self.is_movable[active]
+            terminal = self.is_terminal[active]
+            new_values = np.where(terminal, self.terminal_rewards[active], 0.0)
+            new_values[movable] = q_table[movable].max(axis=1)
+            changed = active[np.abs(new_values - self.values[active]) > threshold]
+
+            self.values[active] = new_values
+            self.q_table[active[movable]] = q_table[movable]
+            self.best_actions[active] = NO_ACTION
+            self.best_actions[active[movable]] = q_table[movable].argmax(axis=1)
+            self.best_actions[active[terminal]] = EXIT_INDEX
+            backups += int(movable.sum() + terminal.sum())
+            active = self.grid.neighbourhood(changed)
+        return backups
+
+    def load_tables(self, values, q_table, best_actions):
+        """
+        Warm start from saved tables, the next sweeps continue from them.
+        Cells are matched by index, q values the tables don't have (NaN) are
+        left as they are and the best actions are taken from the q values
+
+        :param values: The value of each cell
+        :param q_table: (num_cells, 5) q values, columns are Q_ACTIONS
+        :param best_actions: Column of the best action per cell
+        """
+        movable = self.is_movable
+        self.values[:] = np.where(movable | self.is_terminal, values, 0.0)
+        moves = q_table[:, :EXIT_INDEX]
+        self.q_table[:] = np.where(np.isfinite(moves) & movable[:, None], moves, self.q_table)
+        self.best_actions[:] = NO_ACTION
+        self.best_actions[movable] = self.q_table[movable].argmax(axis=1)
+        # terminals that were backed up already hold their terminal reward
+        self.best_actions[self.is_terminal & (best_actions == EXIT_INDEX)] = EXIT_INDEX
+
+    def write_back(self):
+        """
+        Copy the values, best actions and q values into the grid's states
+        """
+        num_cols = self.grid.num_cols
+        for i, row in enumerate(self.grid.states):
+            for j, state in enumerate(row):
+                index = i * num_cols + j
+                if state.is_boulder:
+                    continue
+                state.max_q_value = float(self.values[index])
+                if state.is_terminal:
+                    if self.best_actions[index] == EXIT_INDEX:
+                        state.q_values[Action.exit_game] = \
+                            float(self.terminal_rewards[index])
+                        state.best_action = Action.exit_game
+                    continue
+                for k, action in enumerate(MOVE_ACTIONS):
+                    state.q_values[action] = float(self.q_table[index, k])
+                if self.best_actions[index] != NO_ACTION:
+                    state.best_action = MOVE_ACTIONS[self.best_actions[index]]
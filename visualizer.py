@@ -1,7 +1,7 @@
 """
     File name: visualizer.py
     Author: Arsh Khokhar, Kiernan Wiese
-    Date last modified: 15 April, 2021
+    Date last modified: 17 October, 2026
     Python Version: 3.8
 
     This script contains the Visualizer class for GUI
@@ -12,8 +12,20 @@ import pygame
 from enum import Enum
 from pygame.locals import *
 from grid import Action
-from value_iteration_agent import ValueIterationAgent
-from q_learning_agent import QLearningAgent
+from queries import answer_query, format_answer, is_value_agent, MAP_QUERIES
+from trainer import Trainer
+
+# number of rendered texts kept before the text cache is emptied
+TEXT_CACHE_SIZE = 4096
+
+# default cap on the frames drawn per second
+DEFAULT_FPS = 30
+
+# keys that make the interactive agents learn or move the robot
+AGENT_KEYS = [K_w, K_s, K_d, K_a, K_e, K_v, K_q]
+
+# keys that control the background training
+TRAINER_KEYS = [K_r, K_UP, K_DOWN]
 
 
 class GridColours(Enum):
@@ -28,31 +40,63 @@ class GridColours(Enum):
 
 class Visualizer:
     """
-    Visualizer for Grid world
+    Visualizer for Grid world. The grid is drawn upside down on grid_rect and
+    shown flipped, so (0,0) is in the bottom left corner. Only the cells whose
+    values changed since the last frame are redrawn and updated on screen, and
+    frames are only drawn when the agent or the displayed mode changes, at
+    most fps times a second. In between the loop sleeps until the next event.
+    Interactive windows can also train the agent continuously in a background
+    thread, showing its latest snapshot every frame.
     Attributes
-        agent               The learning agent (value iteration or q-learning)
+        agent               The agent being shown, a snapshot of learner while
+                            it trains in the background
+        learner             The learning agent (value iteration or q-learning)
+        trainer             Trains the learner in the background, only for
+                            interactive windows
         is_interactive      Indicates if the visualizer is interactive
+        fps                 The most frames to draw per second
+        fonts               The fonts created so far, keyed by size
+        text_cache          Rendered text surfaces, keyed by text, size, color
+                            and whether they are flipped
+        static_layer        Transparent surface with the parts of the grid that
+                            never change (cell borders, boulders, terminal
+                            borders and the highlighted cell), drawn over the cells
+        drawn_cells         What was last drawn in each (row, col) cell
+        robot_cell          The (row, col) cell the robot was last drawn in
+        panel_texts         The texts last drawn under the grid
+        full_update         True if the whole window has to be redrawn
     """
 
-    def __init__(self, agent, is_interactive=False):
+    def __init__(self, agent, is_interactive=False, fps=DEFAULT_FPS, size=None):
         """
         Init function for the Visualizer class
 
         :param agent: The learning agent (value iteration or q-learning)
         :param is_interactive: Indicates if the visualizer is interactive
+        :param fps: The most frames to draw per second
+        :param size: (width, height) of the grid in pixels, None to fit it in
+                     65% of the screen
         """
         pygame.display.set_caption('Grid world')
         self.is_interactive = is_interactive
+        self.fps = fps
         self.agent = agent
-        self.is_value_iter_agent = True if type(
-            agent) is ValueIterationAgent else False
+        self.learner = agent
+        self.trainer = None
+        # policy iteration is displayed the same way as value iteration
+        self.is_value_iter_agent = is_value_agent(agent)
         self.num_rows = agent.grid.num_rows
         self.num_cols = agent.grid.num_cols
 
         self.font = 'courier new'
+        self.fonts = {}
+        self.text_cache = {}
 
         pygame.display.init()
-        w, h = pygame.display.Info().current_w*0.65, pygame.display.Info().current_h*0.65
+        if size:
+            w, h = size
+        else:
+            w, h = pygame.display.Info().current_w*0.65, pygame.display.Info().current_h*0.65
         self.cell_width = int(w // self.num_cols)
         self.cell_size = int(h // self.num_rows)
 
@@ -61,108 +105,205 @@ class Visualizer:
         self.grid_width = self.cell_width * self.num_cols
         self.grid_height = self.cell_size * self.num_rows
         self.window_width = int(self.grid_width*1.1)
-        self.window_height = int(self.grid_height*1.35)
+        self.grid_left = self.window_width // 2 - self.grid_width // 2
+        self.grid_top = 50
+        # room for the lines of text under the grid
+        self.window_height = max(int(self.grid_height*1.35),
+                                 self.grid_top + self.grid_height + 25 + 18*5)
 
         # grid drawing surface
         self.grid_rect = pygame.Surface(
             (self.grid_width, self.grid_height))
         self.grid_rect.get_rect().center = (self.window_width // 2, 0)
+        self.static_layer = None
 
         # background drawing surface
         self.background = pygame.display.set_mode(
             (self.window_width, self.window_height))
 
+        self.drawn_cells = {}
+        self.robot_cell = None
+        self.panel_texts = None
+        self.full_update = True
+
+    def get_font(self, size):
+        """
+        Get the bold GUI font of a given size, creating it on first use
+
+        :param size: The size of the font
+        :return: The pygame font
+        """
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.SysFont(self.font, size, bold=True)
+        return self.fonts[size]
+
+    def render_text(self, text, size, color, flipped=True):
+        """
+        Render a text, reusing the surface if it was rendered before
+
+        :param text: The text to render
+        :param size: The size of the font
+        :param color: The color of the text
+        :param flipped: True to flip the text upside down, for drawing on grid_rect
+        :return: The text surface
+        """
+        key = (text, size, color, flipped)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            surface = self.get_font(size).render(text, True, color)
+            if flipped:
+                surface = pygame.transform.flip(surface, False, True)
+            self.text_cache[key] = surface
+        return surface
+
     def clear(self):
         """
-        Clear the drawing surfaces
+        Clear the drawing surfaces, everything is redrawn on the next frame
         """
         self.background.fill(GridColours.black.value)
         self.grid_rect.fill(GridColours.black.value)
+        self.drawn_cells = {}
+        self.panel_texts = None
+        self.full_update = True
 
-    def draw_values(self):
+    def cell_rect(self, row, col):
         """
-        Draw the grid with values
+        :param row: The row of the cell
+        :param col: The column of the cell
+        :return: The rect of the cell on grid_rect
         """
-        font = pygame.font.SysFont(
-            self.font, self.font_size, bold=True)
-        for j, row in enumerate(self.agent.grid.states):
-            for i, state in enumerate(row):
-                rect = pygame.Rect(
-                    i*self.cell_width, j*self.cell_size, self.cell_width, self.cell_size)
-                normalized = int(180*abs(state.max_q_value) /
-                                 self.agent.max_display_val)
-                # clamping the normalized value
-                normalized = min(max(normalized, 0), 255)
+        return pygame.Rect(col*self.cell_width, row*self.cell_size, self.cell_width, self.cell_size)
 
-                # setting red/green color based on positive/negative values
-                color = (normalized, 0, 0) if state.max_q_value < 0 else (
-                    0, normalized, 0)
-                pygame.draw.rect(self.grid_rect, color, rect)
-                pygame.draw.rect(
-                    self.grid_rect, GridColours.white.value, rect, 1)
+    def build_static_layer(self, to_draw_ptr, highlight_cell=None):
+        """
+        Draw the parts of the grid that don't change onto the static layer
 
+        :param to_draw_ptr: draw_values or draw_q_values, the mode being shown
+        :param highlight_cell: cell to highlight in the grid based on a query
+        """
+        self.static_layer = pygame.Surface(
+            (self.grid_width, self.grid_height), pygame.SRCALPHA)
+        for j, row in enumerate(self.agent.grid.states):
+            for i, state in enumerate(row):
+                rect = self.cell_rect(j, i)
                 if state.is_boulder:
                     pygame.draw.rect(
-                        self.grid_rect, GridColours.grey.value, rect)
+                        self.static_layer, GridColours.grey.value, rect)
                     continue
-
+                if to_draw_ptr == self.draw_values:
+                    pygame.draw.rect(
+                        self.static_layer, GridColours.white.value, rect, 1)
                 if state.is_terminal:
                     inner_rect = pygame.Rect(
                         i*self.cell_width + self.cell_width*0.1,
                         j*self.cell_size + self.cell_size*0.1,
                         self.cell_width*0.8, self.cell_size*0.8)
                     pygame.draw.rect(
-                        self.grid_rect, GridColours.white.value, inner_rect, 1)
+                        self.static_layer, GridColours.white.value, inner_rect, 1)
 
-                value_text = font.render('{:.2f}'.format(state.max_q_value),
-                                         True, GridColours.white.value)
-                value_rect = value_text.get_rect()
-                value_rect.center = (i*self.cell_width + self.cell_width // 2,
-                                     j*self.cell_size + self.cell_size // 2)
-                value_text = pygame.transform.flip(value_text, False, True)
-                self.grid_rect.blit(value_text, value_rect)
+        if highlight_cell:
+            # cell to highlight for the query
+            pygame.draw.rect(
+                self.static_layer, GridColours.blue.value,
+                self.cell_rect(highlight_cell[0], highlight_cell[1]), 4)
 
-                if state.is_terminal:
+    def draw_cells(self, draw_cell, cell_key):
+        """
+        Redraw the cells whose values changed since they were last drawn
+
+        :param draw_cell: Function drawing a single cell
+        :param cell_key: Function returning what a cell's drawing depends on
+        :return: The list of (row, col) cells that were redrawn
+        """
+        dirty = []
+        for j, row in enumerate(self.agent.grid.states):
+            for i, state in enumerate(row):
+                key = cell_key(state)
+                if self.drawn_cells.get((j, i)) == key:
                     continue
+                self.drawn_cells[(j, i)] = key
+                rect = self.cell_rect(j, i)
+                self.grid_rect.fill(GridColours.black.value, rect)
+                if not state.is_boulder:
+                    draw_cell(i, j, state)
+                self.grid_rect.blit(self.static_layer, rect, rect)
+                dirty.append((j, i))
+        return dirty
 
-                dir_text = None
-                dir_center = None
-
-                if state.best_action == Action.north:
-                    dir_text = '▲'
-                    dir_center = (i + 0.5)*self.cell_width, (j+1) * \
-                        self.cell_size - self.font_size*0.5
-
-                elif state.best_action == Action.east:
-                    dir_text = '►'
-                    dir_center = (i+1)*self.cell_width - \
-                        self.font_size*0.5, (j+0.5)*self.cell_size
-
-                elif state.best_action == Action.west:
-                    dir_text = '◄'
-                    dir_center = i*self.cell_width + \
-                        self.font_size*0.5, (j+0.5)*self.cell_size
-
-                elif state.best_action == Action.south:
-                    dir_text = '▼'
-                    dir_center = (i+0.5)*self.cell_width, j * \
-                        self.cell_size + self.font_size*0.5
-
-                if dir_text and dir_center:
-                    dir_render_text = font.render(
-                        dir_text, True, GridColours.white.value)
-                    dir_rect = dir_render_text.get_rect()
-                    dir_render_text = pygame.transform.flip(
-                        dir_render_text, False, True)
-                    dir_rect.center = (dir_center[0], dir_center[1])
-                    self.grid_rect.blit(dir_render_text, dir_rect)
+    def draw_values(self):
+        """
+        Draw the grid with values
+
+        :return: The list of (row, col) cells that were redrawn
+        """
+        return self.draw_cells(self.draw_value_cell,
+                               lambda state: (state.max_q_value, state.best_action))
+
+    def draw_value_cell(self, i, j, state):
+        """
+        Draw the value and best action of a cell
+
+        :param i: The column of the cell
+        :param j: The row of the cell
+        :param state: The state of the cell
+        """
+        rect = self.cell_rect(j, i)
+        normalized = int(180*abs(state.max_q_value) /
+                         self.agent.max_display_val)
+        # clamping the normalized value
+        normalized = min(max(normalized, 0), 255)
+
+        # setting red/green color based on positive/negative values
+        color = (normalized, 0, 0) if state.max_q_value < 0 else (
+            0, normalized, 0)
+        pygame.draw.rect(self.grid_rect, color, rect)
+
+        value_text = self.render_text('{:.2f}'.format(state.max_q_value),
+                                      self.font_size, GridColours.white.value)
+        value_rect = value_text.get_rect()
+        value_rect.center = (i*self.cell_width + self.cell_width // 2,
+                             j*self.cell_size + self.cell_size // 2)
+        self.grid_rect.blit(value_text, value_rect)
+
+        if state.is_terminal:
+            return
+
+        dir_text = None
+        dir_center = None
+
+        if state.best_action == Action.north:
+            dir_text = '▲'
+            dir_center = (i + 0.5)*self.cell_width, (j+1) * \
+                self.cell_size - self.font_size*0.5
+
+        elif state.best_action == Action.east:
+            dir_text = '►'
+            dir_center = (i+1)*self.cell_width - \
+                self.font_size*0.5, (j+0.5)*self.cell_size
+
+        elif state.best_action == Action.west:
+            dir_text = '◄'
+            dir_center = i*self.cell_width + \
+                self.font_size*0.5, (j+0.5)*self.cell_size
+
+        elif state.best_action == Action.south:
+            dir_text = '▼'
+            dir_center = (i+0.5)*self.cell_width, j * \
+                self.cell_size + self.font_size*0.5
+
+        if dir_text and dir_center:
+            dir_render_text = self.render_text(
+                dir_text, self.font_size, GridColours.white.value)
+            dir_rect = dir_render_text.get_rect()
+            dir_rect.center = (dir_center[0], dir_center[1])
+            self.grid_rect.blit(dir_render_text, dir_rect)
 
     def draw_q_val_triangle(self, points, value, centers, text_color):
         """
         Draw a Q-value triangle
         """
-        font = pygame.font.SysFont(
-            self.font, int(self.font_size*0.65), bold=True)
         normalized = int(180*abs(value) / self.agent.max_display_val)
 
         # clamping the normalized value
@@ -176,87 +317,139 @@ class Visualizer:
         # triangle border
         pygame.draw.polygon(
             self.grid_rect, GridColours.white.value, points, 1)
-        q_val_text = font.render('{:.2f}'.format(
-            value), True, text_color)
+        q_val_text = self.render_text('{:.2f}'.format(
+            value), int(self.font_size*0.65), text_color)
         q_val_rect = q_val_text.get_rect()
-        q_val_text = pygame.transform.flip(q_val_text, False, True)
         q_val_rect.center = (centers[0], centers[1])
         self.grid_rect.blit(q_val_text, q_val_rect)
 
     def draw_q_values(self):
         """
         Draw the grid with q-values
+
+        :return: The list of (row, col) cells that were redrawn
         """
-        for j, row in enumerate(self.agent.grid.states):
-            for i, state in enumerate(row):
-                rect = pygame.Rect(
-                    i*self.cell_width, j*self.cell_size, self.cell_width, self.cell_size)
+        return self.draw_cells(self.draw_q_value_cell,
+                               lambda state: (tuple(state.q_values.values()), state.best_action))
 
-                if state.is_boulder:
-                    pygame.draw.rect(
-                        self.grid_rect, GridColours.grey.value, rect)
-                    continue
+    def draw_q_value_cell(self, i, j, state):
+        """
+        Draw the q values of a cell
 
-                # getting the necessary points for triangles
-                top_left = (i*self.cell_width, j*self.cell_size)
-                top_right = ((i+1)*self.cell_width, j*self.cell_size)
-                bottom_left = (i*self.cell_width, (j+1)*self.cell_size)
-                bottom_right = ((i+1)*self.cell_width, (j+1)*self.cell_size)
-                mid = ((i + 0.5)*self.cell_width, (j + 0.5)*self.cell_size)
-
-                for q_value_key in state.q_values:
-                    q_value = state.q_values[q_value_key]
-                    text_color = GridColours.white.value if q_value_key == state.best_action or not self.is_value_iter_agent \
-                        else GridColours.grey.value
-
-                    if q_value_key == Action.south:
-                        self.draw_q_val_triangle(
-                            [top_left, top_right, mid], q_value,
-                            [mid[0], top_left[1] + self.font_size // 2], text_color)
-
-                    elif q_value_key == Action.east:
-                        self.draw_q_val_triangle(
-                            [top_right, bottom_right, mid], q_value,
-                            [bottom_right[0] - self.font_size, mid[1]], text_color)
-
-                    elif q_value_key == Action.west:
-                        self.draw_q_val_triangle(
-                            [top_left, bottom_left, mid], q_value,
-                            [bottom_left[0] + self.font_size, mid[1]], text_color)
-
-                    if q_value_key == Action.north:
-                        self.draw_q_val_triangle(
-                            [bottom_left, bottom_right, mid], q_value,
-                            [mid[0], bottom_left[1] - self.font_size // 2], text_color)
-
-                    if q_value_key == Action.exit_game:
-                        font = pygame.font.SysFont(
-                            self.font, self.font_size, bold=True)
-                        normalized = int(180*abs(q_value) /
-                                         self.agent.max_display_val)
-                        # clamping the normalized value
-                        normalized = min(max(normalized, 0), 255)
-
-                        # setting red/green color based on positive/negative values
-                        color = (normalized, 0, 0) if q_value < 0 else (
-                            0, normalized, 0)
-                        q_val_text = font.render('{:.2f}'.format(
-                            q_value), True, GridColours.white.value)
-                        q_val_rect = q_val_text.get_rect()
-                        q_val_rect.center = (mid[0], mid[1])
-                        q_val_text = pygame.transform.flip(
-                            q_val_text, False, True)
-                        pygame.draw.rect(
-                            self.grid_rect, color, rect)
-                        self.grid_rect.blit(q_val_text, q_val_rect)
-                        inner_rect = pygame.Rect(
-                            i*self.cell_width + self.cell_width*0.1, j*self.cell_size + self.cell_size*0.1,
-                            self.cell_width*0.8, self.cell_size*0.8)
-                        pygame.draw.rect(
-                            self.grid_rect, GridColours.white.value, inner_rect, 1)
+        :param i: The column of the cell
+        :param j: The row of the cell
+        :param state: The state of the cell
+        """
+        rect = self.cell_rect(j, i)
+
+        # getting the necessary points for triangles
+        top_left = (i*self.cell_width, j*self.cell_size)
+        top_right = ((i+1)*self.cell_width, j*self.cell_size)
+        bottom_left = (i*self.cell_width, (j+1)*self.cell_size)
+        bottom_right = ((i+1)*self.cell_width, (j+1)*self.cell_size)
+        mid = ((i + 0.5)*self.cell_width, (j + 0.5)*self.cell_size)
+
+        for q_value_key in state.q_values:
+            q_value = state.q_values[q_value_key]
+            text_color = GridColours.white.value if q_value_key == state.best_action or not self.is_value_iter_agent \
+                else GridColours.grey.value
+
+            if q_value_key == Action.south:
+                self.draw_q_val_triangle(
+                    [top_left, top_right, mid], q_value,
+                    [mid[0], top_left[1] + self.font_size // 2], text_color)
+
+            elif q_value_key == Action.east:
+                self.draw_q_val_triangle(
+                    [top_right, bottom_right, mid], q_value,
+                    [bottom_right[0] - self.font_size, mid[1]], text_color)
+
+            elif q_value_key == Action.west:
+                self.draw_q_val_triangle(
+                    [top_left, bottom_left, mid], q_value,
+                    [bottom_left[0] + self.font_size, mid[1]], text_color)
+
+            if q_value_key == Action.north:
+                self.draw_q_val_triangle(
+                    [bottom_left, bottom_right, mid], q_value,
+                    [mid[0], bottom_left[1] - self.font_size // 2], text_color)
+
+            if q_value_key == Action.exit_game:
+                normalized = int(180*abs(q_value) /
+                                 self.agent.max_display_val)
+                # clamping the normalized value
+                normalized = min(max(normalized, 0), 255)
 
+                # setting red/green color based on positive/negative values
+                color = (normalized, 0, 0) if q_value < 0 else (
+                    0, normalized, 0)
+                q_val_text = self.render_text('{:.2f}'.format(
+                    q_value), self.font_size, GridColours.white.value)
+                q_val_rect = q_val_text.get_rect()
+                q_val_rect.center = (mid[0], mid[1])
                 pygame.draw.rect(
-                    self.grid_rect, GridColours.white.value, rect, 1)
+                    self.grid_rect, color, rect)
+                self.grid_rect.blit(q_val_text, q_val_rect)
+
+    def draw_robot(self, row, col):
+        """
+        Draw the robot for the interactive q-learning GUI
+
+        :param row: The row the robot is in
+        :param col: The column the robot is in
+        """
+        pygame.draw.circle(self.grid_rect, GridColours.blue.value,
+                           ((col+0.5)*self.cell_width,
+                            (row+0.5)*self.cell_size),
+                           0.125*self.cell_size)
+
+    def show_cells(self, cells):
+        """
+        Copy cells of grid_rect onto the window, flipping them so (0,0) is in
+        the bottom left corner
+
+        :param cells: The list of (row, col) cells to copy
+        :return: The list of window rects that changed
+        """
+        if self.full_update:
+            # flipping to set (0,0)  in the bottom left corner
+            flipped = pygame.transform.flip(self.grid_rect, False, True)
+            self.background.blit(flipped, (self.grid_left, self.grid_top))
+            return []
+
+        rects = []
+        for row, col in cells:
+            rect = self.cell_rect(row, col)
+            flipped = pygame.transform.flip(
+                self.grid_rect.subsurface(rect), False, True)
+            window_rect = pygame.Rect(
+                self.grid_left + rect.x, self.grid_top + self.grid_height - rect.bottom,
+                rect.width, rect.height)
+            self.background.blit(flipped, window_rect)
+            rects.append(window_rect)
+        return rects
+
+    def draw_panel(self, texts):
+        """
+        Draw the texts under the grid if they changed
+
+        :param texts: List of (text, color) to draw, one per line
+        :return: The list of window rects that changed
+        """
+        if texts == self.panel_texts:
+            return []
+        self.panel_texts = texts
+        panel_rect = pygame.Rect(
+            0, self.grid_top + self.grid_height, self.window_width,
+            self.window_height - self.grid_top - self.grid_height)
+        self.background.fill(GridColours.black.value, panel_rect)
+        for k, (text, color) in enumerate(texts):
+            text_surface = self.render_text(text, 20, color, flipped=False)
+            text_rect = text_surface.get_rect()
+            text_rect.center = (
+                self.window_width // 2, self.grid_top + self.grid_height + 25 + 18*k)
+            self.background.blit(text_surface, text_rect)
+        return [panel_rect]
 
     def get_text_to_show(self, arg_num, func_ptr):
         """
@@ -272,6 +465,71 @@ class Visualizer:
         else:
             return "Q-VALUES AFTER {} EPISODES".format(arg_num)
 
+    def get_training_text(self):
+        """
+        :return: The controls and the state of the background training, empty
+                 if the window isn't interactive
+        """
+        if not self.trainer:
+            return ""
+        unit = "sweeps" if self.is_value_iter_agent else "steps"
+        steps_per_frame = self.trainer.steps_per_frame or "all"
+        if self.trainer.is_running:
+            return "R: pause, UP/DOWN: speed. Training: {:,.0f} {}/s, {} {} per frame".format(
+                self.trainer.steps_per_second, unit, steps_per_frame, unit)
+        return "R: train continuously, UP/DOWN: speed ({} {} per frame)".format(
+            steps_per_frame, unit)
+
+    def get_panel_texts(self, to_draw_ptr, query_text_to_show):
+        """
+        :param to_draw_ptr: draw_values or draw_q_values, the mode being shown
+        :param query_text_to_show: The query answer or controls to show
+        :return: List of (text, color) to draw under the grid, one per line
+        """
+        param_str = "Discount: {} Transition cost: {}".format(
+            self.agent.grid.discount, self.agent.grid.transition_cost)
+        param_str2 = "Noise: {}".format(self.agent.grid.noise)
+        param_str2 += " Alpha: {}".format(
+            self.agent.grid.alpha) if not self.is_value_iter_agent else ""
+        return [(self.get_text_to_show(self.agent.get_display_index(), to_draw_ptr),
+                 GridColours.white.value),
+                (param_str, GridColours.white.value),
+                (param_str2, GridColours.white.value),
+                (query_text_to_show, GridColours.blue.value),
+                (self.get_training_text(), GridColours.white.value)]
+
+    def draw_frame(self, to_draw_ptr, query_text_to_show=""):
+        """
+        Draw the agent's current values onto the window surface, redrawing
+        only what changed since the last frame. The window isn't updated
+
+        :param to_draw_ptr: draw_values or draw_q_values, the mode to show
+        :param query_text_to_show: The query answer or controls to show
+        :return: The list of window rects that changed
+        """
+        if self.static_layer is None:
+            self.clear()
+            self.build_static_layer(to_draw_ptr)
+
+        self.agent.sync_states()
+        robot_cell = None
+        if not self.is_value_iter_agent and self.is_interactive:
+            # robot is only drawn when interactive, the cells it leaves
+            # and enters are redrawn
+            robot_cell = tuple(self.agent.grid.robot_curr_location)
+            if robot_cell != self.robot_cell:
+                self.drawn_cells.pop(self.robot_cell, None)
+                self.drawn_cells.pop(robot_cell, None)
+                self.robot_cell = robot_cell
+
+        dirty = to_draw_ptr()
+        if robot_cell in dirty:
+            self.draw_robot(*robot_cell)
+
+        rects = self.show_cells(dirty)
+        rects += self.draw_panel(self.get_panel_texts(to_draw_ptr, query_text_to_show))
+        return rects
+
     def display(self, highlight_cell=None, query=None):
         """
         Display the GUI
@@ -280,134 +538,133 @@ class Visualizer:
         :param query: query related to the grid based on a query
         """
         pygame.init()
-        param_str = "Discount: {} Transition cost: {}".format(
-            self.agent.grid.discount, self.agent.grid.transition_cost)
-        param_str2 = "Noise: {}".format(self.agent.grid.noise)
-        param_str2 += " Alpha: {}".format(
-            self.agent.grid.alpha) if not self.is_value_iter_agent else ""
         to_draw_ptr = self.draw_values if self.is_value_iter_agent else self.draw_q_values
 
+        self.agent.sync_states()
+        query_text_to_show = ""
+        if query in MAP_QUERIES:
+            # the answer about every cell is the grid itself
+            query_text_to_show = "Query: {} (shown in the grid)".format(query)
+        elif query:
+            answer = answer_query(
+                self.agent, highlight_cell[0], highlight_cell[1], query)
+            if query == 'bestPolicy':
+                answer_text = answer
+            elif query == 'qValues':
+                answer_text = ", ".join("{}: {:.2f}".format(action, q_value) for action, q_value
+                                        in format_answer(query, answer).items())
+            else:
+                answer_text = "{:.2f}".format(answer)
+            query_text_to_show = "Query: {},{},{} = {}".format(
+                highlight_cell[0], highlight_cell[1], query, answer_text)
+
+        elif self.is_interactive:
+            # show controls if interactive
+            self.trainer = Trainer(self.learner, self.is_value_iter_agent)
+            if self.is_value_iter_agent:
+                query_text_to_show = "Controls: V: iterate values, SPACE: toggle Values and Q-Values"
+            else:
+                query_text_to_show = "W: move up, S: move down, A: move left, D: move right, E: take exit action"
+
+        self.clear()
+        self.build_static_layer(to_draw_ptr, highlight_cell)
+        clock = pygame.time.Clock()
+        # (display index, mode) last drawn, None to draw the next frame
+        shown = None
+
         while True:
-            if self.is_interactive:
-                # robot is only drawn when interactive
-                robot_row = self.agent.grid.robot_curr_location[0]
-                robot_col = self.agent.grid.robot_curr_location[1]
-            self.clear()
-            to_draw_ptr()
-            for event in pygame.event.get():
+            if shown is None or (self.trainer and self.trainer.is_running):
+                events = pygame.event.get()
+            else:
+                # nothing changed since the last frame, sleep until something happens
+                events = [pygame.event.wait()] + pygame.event.get()
+
+            for event in events:
                 if event.type == QUIT:
+                    if self.trainer:
+                        self.trainer.stop()
                     pygame.display.quit()
                     pygame.quit()
                     return
 
+                if event.type == VIDEOEXPOSE:
+                    # the window was uncovered, its contents have to be shown again
+                    self.full_update = True
+                    shown = None
+
                 if event.type == KEYDOWN:
-                    if event.key == K_w and self.is_interactive and not self.is_value_iter_agent:
+                    # the agent can only be stepped by hand while the training is paused
+                    is_manual = self.is_interactive and not self.trainer.is_running
+                    if is_manual:
+                        robot_row = self.learner.grid.robot_curr_location[0]
+                        robot_col = self.learner.grid.robot_curr_location[1]
+                        if event.key in AGENT_KEYS:
+                            # the robot moved or the values changed
+                            shown = None
+
+                    if event.key in TRAINER_KEYS and self.is_interactive:
+                        if event.key == K_r:
+                            self.trainer.toggle()
+                            if not self.trainer.is_running:
+                                # show the agent itself again, it is no longer changing
+                                self.agent = self.learner
+                        else:
+                            self.trainer.change_speed(event.key == K_UP)
+                        shown = None
+
+                    if event.key == K_w and is_manual and not self.is_value_iter_agent:
                         action = Action.north
-                        self.agent.update(robot_row, robot_col, action,
-                                          robot_row + 1, robot_col)
+                        self.learner.update(robot_row, robot_col, action,
+                                            robot_row + 1, robot_col)
 
-                    if event.key == K_s and self.is_interactive and not self.is_value_iter_agent:
+                    if event.key == K_s and is_manual and not self.is_value_iter_agent:
                         action = Action.south
-                        self.agent.update(robot_row, robot_col, action,
-                                          robot_row - 1, robot_col)
+                        self.learner.update(robot_row, robot_col, action,
+                                            robot_row - 1, robot_col)
 
-                    if event.key == K_d and self.is_interactive and not self.is_value_iter_agent:
+                    if event.key == K_d and is_manual and not self.is_value_iter_agent:
                         action = Action.east
-                        self.agent.update(robot_row, robot_col, action,
-                                          robot_row, robot_col + 1)
+                        self.learner.update(robot_row, robot_col, action,
+                                            robot_row, robot_col + 1)
 
-                    if event.key == K_a and self.is_interactive and not self.is_value_iter_agent:
+                    if event.key == K_a and is_manual and not self.is_value_iter_agent:
                         action = Action.west
-                        self.agent.update(robot_row, robot_col, action,
-                                          robot_row, robot_col-1)
+                        self.learner.update(robot_row, robot_col, action,
+                                            robot_row, robot_col-1)
 
-                    if event.key == K_e and self.is_interactive and not self.is_value_iter_agent:
+                    if event.key == K_e and is_manual and not self.is_value_iter_agent:
                         action = Action.exit_game
-                        self.agent.update(robot_row, robot_col, action,
-                                          robot_row, robot_col)
+                        self.learner.update(robot_row, robot_col, action,
+                                            robot_row, robot_col)
 
-                    if event.key == K_v and self.is_interactive and self.is_value_iter_agent:
-                        self.agent.iterate_values()
+                    if event.key == K_v and is_manual and self.is_value_iter_agent:
+                        self.learner.iterate_values()
 
-                    if event.key == K_q and not self.is_value_iter_agent:
-                        self.agent.q_learn()
+                    if event.key == K_q and is_manual and not self.is_value_iter_agent:
+                        self.learner.q_learn()
 
                     if event.key == K_SPACE and self.is_value_iter_agent:
                         to_draw_ptr = self.draw_q_values if to_draw_ptr == self.draw_values else self.draw_values
-
-            if not self.is_value_iter_agent and self.is_interactive:
-                # draw the robot for interactive q-learning GUI
-                pygame.draw.circle(self.grid_rect, GridColours.blue.value,
-                                   ((robot_col+0.5)*self.cell_width,
-                                    (robot_row+0.5)*self.cell_size),
-                                   0.125*self.cell_size)
-            font = pygame.font.SysFont(
-                self.font, 20, bold=True)
-            iteration_text = font.render(self.get_text_to_show(
-                self.agent.get_display_index(), to_draw_ptr), True, GridColours.white.value)
-            iteration_rect = iteration_text.get_rect()
-            iteration_rect.center = (
-                self.window_width // 2, self.grid_height*1.125)
-
-            param_text = font.render(param_str, True, GridColours.white.value)
-            param_text2 = font.render(
-                param_str2, True, GridColours.white.value)
-            param_rect = param_text.get_rect()
-            param_rect2 = param_text2.get_rect()
-
-            param_rect.center = (
-                self.window_width // 2, self.grid_height*1.125 + 18)
-            param_rect2.center = (
-                self.window_width // 2, self.grid_height*1.125 + 36)
-
-            if highlight_cell:
-                # cell to highlight for the query
-                highlight_rect = pygame.Rect(
-                    highlight_cell[1] *
-                    self.cell_width, highlight_cell[0]*self.cell_size,
-                    self.cell_width, self.cell_size)
-                pygame.draw.rect(
-                    self.grid_rect, GridColours.blue.value, highlight_rect, 4)
-
-            if query:
-                if query == 'stateValue':
-                    query_text_to_show = "Query: {},{},{} = {:.2f}".format(
-                        highlight_cell[0], highlight_cell[1], query,
-                        self.agent.grid.states[highlight_cell[0]][highlight_cell[1]].max_q_value)
-                elif query == 'bestQValue':
-                    query_text_to_show = "Query: {},{},{} = {:.2f}".format(
-                        highlight_cell[0], highlight_cell[1], query,
-                        self.agent.find_max_q_value(highlight_cell[0], highlight_cell[1])[0])
-                elif query == 'bestPolicy' and type(self.agent) is ValueIterationAgent:
-                    query_text_to_show = "Query: {},{},{} = {}".format(
-                        highlight_cell[0], highlight_cell[1], query,
-                        self.agent.grid.states[highlight_cell[0]][highlight_cell[1]].best_action)
-                elif query == 'bestPolicy' and type(self.agent) is QLearningAgent:
-                    query_text_to_show = "Query: {},{},{} = {}".format(
-                        highlight_cell[0], highlight_cell[1], query,
-                        self.agent.find_max_q_value(highlight_cell[0], highlight_cell[1])[1])
-
-            elif self.is_interactive:
-                # show controls if interactive
-                if self.is_value_iter_agent:
-                    query_text_to_show = "Controls: V: iterate values, SPACE: toggle Values and Q-Values"
-                else:
-                    query_text_to_show = "W: move up, S: move down, A: move left, D: move right, E: take exit action"
-
-            query_text = font.render(
-                query_text_to_show, True, GridColours.blue.value)
-            query_rect = query_text.get_rect()
-            query_rect.center = (
-                self.window_width // 2, self.grid_height*1.125+54)
-            self.background.blit(query_text, query_rect)
-
-            # flipping to set (0,0)  in the bottom left corner
-            flipped = pygame.transform.flip(self.grid_rect, False, True)
-
-            # drawing all the components on the background
-            self.background.blit(
-                flipped, (self.window_width // 2 - self.grid_width // 2, 50))
-            self.background.blit(iteration_text, iteration_rect)
-            self.background.blit(param_text, param_rect)
-            self.background.blit(param_text2, param_rect2)
-            pygame.display.update()
+                        self.clear()
+                        self.build_static_layer(to_draw_ptr, highlight_cell)
+
+            if self.trainer and self.trainer.is_running:
+                sample = self.trainer.sample()
+                if sample:
+                    self.agent, robot_location = sample
+                    self.agent.grid.robot_curr_location = list(robot_location)
+                # the values and the speed change every frame
+                shown = None
+
+            if shown == (self.agent.get_display_index(), to_draw_ptr):
+                continue
+            shown = (self.agent.get_display_index(), to_draw_ptr)
+
+            rects = self.draw_frame(to_draw_ptr, query_text_to_show)
+            if self.full_update:
+                pygame.display.update()
+                self.full_update = False
+            elif rects:
+                pygame.display.update(rects)
+            # caps the frame rate when the agent changes faster than it can be shown
+            clock.tick(self.fps)